@@ -0,0 +1,101 @@
+"""
+位块传输渲染基准
+
+模拟拖动滑块：按参数序列逐帧渲染 PNG，比较三种路径的每帧延迟：
+- A（完整重绘）：每帧新建图形，savefig(bbox_inches="tight")
+- B（模板池）：复用模板图形，只更新数据，仍然完整重绘
+- C（位块传输）：复用模板图形，恢复缓存的静态背景，只重绘动态部分
+
+C 另外列出"重绘动态部分"与"PNG 编码"两个阶段的耗时。
+三种路径都按默认输出策略编码（调色板 PNG，见 image_output）。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_blit
+    python -m benchmarks.bench_blit --dpi 100
+"""
+import argparse
+import dataclasses
+import statistics
+import time
+import warnings
+
+import matplotlib
+matplotlib.use("Agg")
+from streamlit import logger as streamlit_logger
+
+from src.components.angle_drawer import ANGLE
+from src.pages.geometry.curtain_model import CURTAIN_MODEL
+from src.utils.blit_renderer import get_blit_renderer
+from src.utils.figure_cache import DEFAULT_DPI, figure_to_bytes
+from src.utils.image_output import get_image_stats
+from src.utils.visualization import get_template_figure
+
+def scratch_figure(template, *args):
+    """A：每帧新建图形"""
+    fig, artists = template.build()
+    template.update(artists, *args)
+    return fig
+
+def encode_ms_total():
+    return sum(stats.encode_ms for stats in get_image_stats().values())
+
+def frame_times(path, template, frames, dpi):
+    """逐帧渲染，返回每帧耗时（毫秒）与位块传输各阶段耗时"""
+    times, stages = [], []
+    for args in frames:
+        encoded = encode_ms_total()
+        start = time.perf_counter()
+        fig = path(template, *args)
+        figure_to_bytes(fig, dpi=dpi)
+        times.append((time.perf_counter() - start) * 1000)
+        renderer = get_blit_renderer(fig)
+        if renderer is not None:
+            stages.append(dict(renderer.timings, encode_ms=encode_ms_total() - encoded))
+    return times, stages
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def bench_sweep(name, template, frames, dpi):
+    # 不启用位块传输的同名模板，作为 B
+    pooled = dataclasses.replace(template, name=f"{template.name}_no_blit", blit=False)
+    # 预热：字体加载、模板创建与背景栅格化不计入每帧延迟
+    figure_to_bytes(get_template_figure(template, *frames[0]), dpi=dpi)
+    figure_to_bytes(get_template_figure(pooled, *frames[0]), dpi=dpi)
+
+    results = [
+        ("A 完整重绘", frame_times(scratch_figure, template, frames, dpi)[0]),
+        ("B 模板池", frame_times(get_template_figure, pooled, frames, dpi)[0]),
+    ]
+    blit_times, stages = frame_times(get_template_figure, template, frames, dpi)
+    results.append(("C 位块传输", blit_times))
+
+    print(f"\n{name}（{len(frames)} 帧，{dpi} DPI）")
+    print(f"{'路径':<12}{'中位数(ms)':>12}{'P95(ms)':>10}{'帧率':>8}")
+    baseline = statistics.median(results[0][1])
+    for label, times in results:
+        median = statistics.median(times)
+        print(f"{label:<12}{median:>12.1f}{percentile(times, 0.95):>10.1f}{1000 / median:>8.1f}"
+              f"  {baseline / median:5.1f}x")
+    draw = statistics.median(stage["draw_ms"] for stage in stages)
+    encode = statistics.median(stage["encode_ms"] for stage in stages)
+    print(f"C 各阶段中位数：重绘动态部分 {draw:.2f} ms，PNG 编码 {encode:.1f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="比较完整重绘与位块传输的逐帧延迟")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI, help="输出分辨率")
+    args = parser.parse_args(argv)
+
+    bench_sweep("角度滑块 -360..360", ANGLE, [(angle,) for angle in range(-360, 361, 15)], args.dpi)
+    bench_sweep("窗帘模型三个滑块", CURTAIN_MODEL, [
+        (round(0.1 * i, 1), direction, shape)
+        for i in range(1, 31, 2)
+        for direction, shape in (('vertical', 'rectangle'), ('horizontal', 'rectangle'), ('vertical', 'circle'))
+    ], args.dpi)
+
+if __name__ == "__main__":
+    # 缺少中文字体时 Matplotlib 会对每个字形告警；脱离 streamlit run 时会话状态会告警，均不影响计时
+    warnings.filterwarnings("ignore")
+    streamlit_logger.set_log_level("error")
+    main()
@@ -0,0 +1,200 @@
+"""
+冷启动基准
+
+每轮启动一个新的 Python 进程，启用启动分析后用 Streamlit AppTest 运行 main.py，
+依次切换到各个页面，记录：
+- 从进程启动到首页渲染完成的时间（冷启动）
+- 每次切换页面（首次渲染）的耗时
+- 每个模块的导入耗时与常驻内存
+
+多轮取中位数，结果打印为表格并可写出 JSON，供 CI 比较或设置预算。
+不依赖图形界面与浏览器，普通 Linux 机器即可运行。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_cold_start
+    python -m benchmarks.bench_cold_start --repeat 10 --output cold_start.json --budget-ms 4000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_SCRIPT = os.path.join(PROJECT_ROOT, "main.py")
+
+def run_child(report_path, launched_at, page_ids):
+    """子进程：启用分析，运行主程序并依次访问页面，写出报告"""
+    from src.utils import startup_profiler
+    # 报告由本函数在最后统一写出
+    profiler = startup_profiler.install(report_path=None)
+
+    with startup_profiler.section("streamlit", kind="startup_import"):
+        from streamlit.testing.v1 import AppTest
+    from src.utils.page_config import PAGES, PageID
+
+    runs = []
+    app = AppTest.from_file(MAIN_SCRIPT, default_timeout=600)
+
+    def timed_run(page):
+        start = time.perf_counter()
+        app.run()
+        runs.append({
+            "page": page,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+            "exceptions": [exception.value for exception in app.exception],
+        })
+
+    timed_run(PageID.HOME.value)
+    cold_start_ms = (time.time() - launched_at) * 1000
+    for page_id in page_ids:
+        if page_id == PageID.HOME.value:
+            continue
+        app.sidebar.selectbox[0].set_value(PAGES[PageID(page_id)].display_name)
+        timed_run(page_id)
+
+    report = profiler.get_report()
+    report["benchmark"] = {"cold_start_ms": round(cold_start_ms, 3), "script_runs": runs}
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+
+def run_once(page_ids, warm_cache=False):
+    """启动一个子进程完成一轮测量，返回其报告
+
+    默认给子进程一个空的图形缓存目录，使每轮都从零开始渲染。
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = os.path.join(tmp, "report.json")
+        env = dict(os.environ)
+        if not warm_cache:
+            env["STREAMLIT_MATH_CACHE_DIR"] = os.path.join(tmp, "cache")
+        command = [sys.executable, "-m", "benchmarks.bench_cold_start", "--child", report_path,
+                   "--launched-at", repr(time.time()), "--pages", *page_ids]
+        start = time.perf_counter()
+        completed = subprocess.run(command, cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+        process_ms = (time.perf_counter() - start) * 1000
+        if completed.returncode != 0 or not os.path.exists(report_path):
+            raise RuntimeError(f"子进程失败：\n{completed.stderr[-2000:]}")
+        with open(report_path, encoding="utf-8") as f:
+            report = json.load(f)
+    report["benchmark"]["process_ms"] = round(process_ms, 3)
+    return report
+
+def summarize(reports, top=15):
+    """汇总多轮报告，各项取中位数"""
+    def median(values):
+        return round(statistics.median(values), 3) if values else None
+
+    pages = {}
+    for report in reports:
+        for run in report["benchmark"]["script_runs"]:
+            entry = pages.setdefault(run["page"], {"elapsed_ms": [], "exceptions": set()})
+            entry["elapsed_ms"].append(run["elapsed_ms"])
+            entry["exceptions"].update(run["exceptions"])
+
+    modules = {}
+    for report in reports:
+        for record in report["imports"]:
+            entry = modules.setdefault(record["module"], {"self_ms": [], "cumulative_ms": [], "rss_delta_kb": []})
+            for field in entry:
+                entry[field].append(record[field])
+    slowest = sorted(modules.items(), key=lambda item: statistics.median(item[1]["self_ms"]), reverse=True)
+
+    setup_calls = [
+        [section["elapsed_ms"] for section in report["sections"] if section["kind"] == "setup"]
+        for report in reports
+    ]
+
+    return {
+        "runs": len(reports),
+        "cold_start_ms": median([r["benchmark"]["cold_start_ms"] for r in reports]),
+        "process_ms": median([r["benchmark"]["process_ms"] for r in reports]),
+        "import_ms": median([r["summary"]["import_ms"] for r in reports]),
+        "modules": median([r["summary"]["modules"] for r in reports]),
+        "rss_mb": median([r["rss_kb"] / 1024 for r in reports]),
+        "setup": {
+            "calls": median([len(calls) for calls in setup_calls]),
+            "first_call_ms": median([calls[0] for calls in setup_calls if calls]),
+            "total_ms": median([sum(calls) for calls in setup_calls]),
+        },
+        "pages": {
+            page: {"elapsed_ms": median(entry["elapsed_ms"]), "exceptions": sorted(entry["exceptions"])}
+            for page, entry in pages.items()
+        },
+        "slowest_imports": [
+            {
+                "module": name,
+                "self_ms": median(entry["self_ms"]),
+                "cumulative_ms": median(entry["cumulative_ms"]),
+                "rss_delta_kb": median(entry["rss_delta_kb"]),
+            }
+            for name, entry in slowest[:top]
+        ],
+    }
+
+def print_summary(summary):
+    """以表格形式打印汇总结果"""
+    print(f"冷启动（{summary['runs']} 轮中位数）")
+    print(f"  进程启动到首页渲染完成  {summary['cold_start_ms']:10.1f} ms")
+    print(f"  子进程总耗时            {summary['process_ms']:10.1f} ms")
+    print(f"  模块导入（顶层累计）    {summary['import_ms']:10.1f} ms，{summary['modules']:.0f} 个模块")
+    print(f"  常驻内存                {summary['rss_mb']:10.1f} MB")
+    setup = summary["setup"]
+    if setup["first_call_ms"] is not None:
+        print(f"  configure_matplotlib_defaults  {setup['calls']:.0f} 次调用，"
+              f"首次 {setup['first_call_ms']:.1f} ms，合计 {setup['total_ms']:.1f} ms")
+
+    print(f"\n{'页面':<22}{'首次渲染(ms)':>14}  异常")
+    for page, entry in summary["pages"].items():
+        errors = "; ".join(entry["exceptions"])[:60]
+        print(f"{page:<22}{entry['elapsed_ms']:>14.1f}  {errors}")
+
+    print(f"\n{'模块':<44}{'自身(ms)':>10}{'累计(ms)':>10}{'内存(KB)':>10}")
+    for record in summary["slowest_imports"]:
+        print(f"{record['module']:<44}{record['self_ms']:>10.1f}{record['cumulative_ms']:>10.1f}"
+              f"{record['rss_delta_kb']:>10.0f}")
+
+def main(argv=None):
+    """命令行入口"""
+    from src.utils.page_config import PAGES
+
+    parser = argparse.ArgumentParser(description="测量 main.py 的冷启动与各页面首次渲染耗时")
+    parser.add_argument("--repeat", type=int, default=5, help="轮数，取中位数")
+    parser.add_argument("--pages", nargs="*", default=[page_id.value for page_id in PAGES],
+                        help="依次访问的页面ID，默认全部")
+    parser.add_argument("--top", type=int, default=15, help="列出自身耗时最长的模块数")
+    parser.add_argument("--output", default=None, help="写出汇总 JSON 的路径")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="冷启动预算，中位数超出时以非零状态退出")
+    parser.add_argument("--warm-cache", action="store_true", help="使用现有的磁盘图形缓存")
+    parser.add_argument("--fail-on-error", action="store_true", help="任一页面渲染出错时以非零状态退出")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--launched-at", type=float, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        warnings.filterwarnings("ignore")
+        run_child(args.child, args.launched_at, args.pages)
+        return 0
+
+    reports = [run_once(args.pages, args.warm_cache) for _ in range(args.repeat)]
+    summary = summarize(reports, top=args.top)
+    print_summary(summary)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=1)
+
+    status = 0
+    if args.budget_ms is not None and summary["cold_start_ms"] > args.budget_ms:
+        print(f"\n冷启动 {summary['cold_start_ms']:.1f} ms 超出预算 {args.budget_ms:.1f} ms")
+        status = 1
+    if args.fail_on_error and any(entry["exceptions"] for entry in summary["pages"].values()):
+        status = 1
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+图形模板池 A/B 基准
+
+对比两种绘图路径在滑块连续变化时的耗时：
+- A（重新创建）：每次调用 build() 新建 Figure、Axes、刻度与文字，再 update() 填入数据
+- B（模板池）：get_template_figure() 复用同一个图形，只调用 update()
+
+分别测量"只绘图"（得到可渲染的 Figure 为止）与"绘图 + 渲染 PNG"两种口径。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_figure_pool
+"""
+import statistics
+import time
+import warnings
+
+import matplotlib
+matplotlib.use("Agg")
+from streamlit import logger as streamlit_logger
+
+from src.pages.geometry.circles import CIRCLE_CALCULATOR, CONCENTRIC_CIRCLES
+from src.utils.figure_cache import DEFAULT_DPI, figure_to_bytes
+from src.utils.visualization import get_template_figure, release_figure
+
+def scratch_figure(template, *args):
+    """A：每次重新创建图形"""
+    fig, artists = template.build()
+    template.update(artists, *args)
+    return fig
+
+def median_ms(path, template, params, render, dpi):
+    """按参数序列依次绘图（模拟拖动滑块），返回每次的中位耗时（毫秒）"""
+    times = []
+    for args in params:
+        start = time.perf_counter()
+        fig = path(template, *args)
+        if render:
+            figure_to_bytes(fig, dpi=dpi)
+        else:
+            # 与渲染路径一致：用完即释放（模板池中的图形归还模板池，不清空）
+            release_figure(fig)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def bench_template(name, template, params, dpi=DEFAULT_DPI):
+    # 先各绘制一次，排除字体加载与模板创建
+    release_figure(get_template_figure(template, *params[0]))
+    release_figure(scratch_figure(template, *params[0]))
+    draw_a = median_ms(scratch_figure, template, params, False, dpi)
+    draw_b = median_ms(get_template_figure, template, params, False, dpi)
+    full_a = median_ms(scratch_figure, template, params, True, dpi)
+    full_b = median_ms(get_template_figure, template, params, True, dpi)
+    print(f"{name:>10}  只绘图 {draw_a:7.2f} -> {draw_b:6.2f} ms（{draw_a / draw_b:5.1f}x）  "
+          f"绘图+PNG {full_a:7.1f} -> {full_b:7.1f} ms（{full_a / full_b:4.2f}x）")
+
+if __name__ == "__main__":
+    # 缺少中文字体时 Matplotlib 会对每个字形告警；脱离 streamlit run 时会话状态会告警，均不影响计时
+    warnings.filterwarnings("ignore")
+    streamlit_logger.set_log_level("error")
+    print(f"图形模板池（A 重新创建 -> B 复用模板，中位数，PNG {DEFAULT_DPI} DPI）")
+    bench_template("圆的计算", CIRCLE_CALCULATOR, [(round(0.1 * i, 1),) for i in range(5, 65)])
+    bench_template("同心圆", CONCENTRIC_CIRCLES,
+                   [(round(0.1 * i, 1), round(0.05 * i, 2)) for i in range(5, 50)])
@@ -0,0 +1,134 @@
+"""
+图形泄漏浸泡测试
+
+在同一个进程中用 Streamlit AppTest 反复运行 main.py，轮流切换各个页面，
+每隔若干次运行回收垃圾并记录常驻内存与存活的 Figure 对象数。
+预热之后内存应保持平稳：增长超过预算，或存活图形数不为零时以非零状态退出。
+
+默认关闭内存与磁盘图形缓存，使每次运行都真正创建并渲染图形。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_figure_soak
+    python -m benchmarks.bench_figure_soak --reruns 5000 --max-growth-mb 10
+"""
+import argparse
+import ctypes
+import ctypes.util
+import gc
+import os
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_SCRIPT = os.path.join(PROJECT_ROOT, "main.py")
+
+# 依赖未安装的页面，不参与浸泡
+SKIPPED_PAGES = {"manim_examples"}
+
+def count_live_figures():
+    """回收垃圾后统计进程中存活的 Figure 对象"""
+    from matplotlib.figure import Figure
+    gc.collect()
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, Figure))
+
+def trim_heap():
+    """让 glibc 把空闲内存还给系统，使常驻内存反映实际占用（其他平台不做任何事）"""
+    libc_name = ctypes.util.find_library("c")
+    if sys.platform.startswith("linux") and libc_name:
+        libc = ctypes.CDLL(libc_name)
+        if hasattr(libc, "malloc_trim"):
+            libc.malloc_trim(0)
+
+def soak(page_ids, reruns, warmup, sample_every):
+    """反复运行页面，返回采样记录 [(运行次数, 常驻内存KB, 存活图形数)]
+
+    采样间隔取页面数的整数倍，每次都在同一个页面之后采样。
+    """
+    from streamlit.testing.v1 import AppTest
+    from src.utils.page_config import PAGES, PageID
+    from src.utils.startup_profiler import _rss_kb
+
+    sample_every = max(1, round(sample_every / len(page_ids))) * len(page_ids)
+    app = AppTest.from_file(MAIN_SCRIPT, default_timeout=600)
+    app.run()
+    samples = []
+    start = time.perf_counter()
+    for run in range(1, reruns + 1):
+        page_id = page_ids[run % len(page_ids)]
+        app.sidebar.selectbox[0].set_value(PAGES[PageID(page_id)].display_name)
+        app.run()
+        if app.exception:
+            raise RuntimeError(f"页面 {page_id} 出错：{app.exception[0].value}")
+        if run >= warmup and (run - warmup) % sample_every == 0:
+            live = count_live_figures()
+            trim_heap()
+            samples.append((run, _rss_kb(), live))
+            elapsed = time.perf_counter() - start
+            print(f"{run:>7} 次运行  {samples[-1][1] / 1024:8.1f} MB  存活图形 {samples[-1][2]}  "
+                  f"{elapsed:7.1f} s", flush=True)
+    return samples
+
+def growth_per_thousand(samples):
+    """按最小二乘拟合内存随运行次数的增长（MB / 1000 次运行）"""
+    if len(samples) < 2:
+        return 0.0
+    xs = [run for run, _, _ in samples]
+    ys = [rss / 1024 for _, rss, _ in samples]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    slope = (sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+             / sum((x - mean_x) ** 2 for x in xs))
+    return slope * 1000
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="反复运行页面，检查图形与内存是否泄漏")
+    parser.add_argument("--reruns", type=int, default=2000, help="运行次数")
+    parser.add_argument("--warmup", type=int, default=100, help="预热运行次数，之后才开始采样")
+    parser.add_argument("--sample-every", type=int, default=100, help="采样间隔（运行次数）")
+    parser.add_argument("--pages", nargs="*", default=None, help="轮流访问的页面ID，默认全部")
+    parser.add_argument("--max-growth-mb", type=float, default=20.0,
+                        help="预热后允许的内存增长（MB），超出时以非零状态退出")
+    parser.add_argument("--with-cache", action="store_true", help="保留图形缓存（只测缓存命中路径）")
+    args = parser.parse_args(argv)
+
+    # 环境变量需在导入项目模块之前设置
+    os.environ["STREAMLIT_MATH_FIGURE_DEBUG"] = "1"
+    cache_dir = tempfile.TemporaryDirectory()
+    os.environ["STREAMLIT_MATH_CACHE_DIR"] = cache_dir.name
+    if not args.with_cache:
+        os.environ["STREAMLIT_MATH_FIGURE_CACHE_MB"] = "0"
+        os.environ["STREAMLIT_MATH_DISK_CACHE_MB"] = "0"
+    warnings.filterwarnings("ignore")
+
+    from src.utils.page_config import PAGES
+    page_ids = args.pages or [page_id.value for page_id in PAGES if page_id.value not in SKIPPED_PAGES]
+
+    with cache_dir:
+        samples = soak(page_ids, args.reruns, args.warmup, args.sample_every)
+    if not samples:
+        print("运行次数不足，没有采样")
+        return 1
+
+    # 用前后各三分之一采样的中位数比较，单次采样受内存碎片影响波动较大
+    third = max(1, len(samples) // 3)
+    growth = (statistics.median(rss for _, rss, _ in samples[-third:])
+              - statistics.median(rss for _, rss, _ in samples[:third])) / 1024
+    live = samples[-1][2]
+    print(f"\n预热后内存增长 {growth:+.1f} MB（拟合 {growth_per_thousand(samples):+.2f} MB / 1000 次运行），"
+          f"存活图形 {live}")
+
+    status = 0
+    if growth > args.max_growth_mb:
+        print(f"内存增长超出预算 {args.max_growth_mb:.1f} MB")
+        status = 1
+    if live:
+        print("运行结束后仍有图形未释放")
+        status = 1
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
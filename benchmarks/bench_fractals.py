@@ -0,0 +1,217 @@
+"""
+分形生成性能基准
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_fractals
+"""
+import os
+import time
+import tracemalloc
+import warnings
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from src.pages.geometry.fractals import (
+    draw_fractal,
+    iter_koch_segments,
+    iter_sierpinski_triangles,
+    koch_snowflake,
+    sierpinski_chaos_game,
+    sierpinski_triangle,
+    write_chunks,
+)
+from src.utils.figure_cache import figure_to_bytes
+from src.utils.fractal_engine import (
+    ENGINE_WORKERS,
+    IFS_SYSTEMS,
+    escape_time,
+    ifs_density,
+    ifs_points,
+    pixel_spacing,
+    render_escape_time,
+    render_viewport,
+)
+
+def legacy_koch_snowflake(order, size=1):
+    """原始的递归实现，仅作对照"""
+    def koch_curve(start, end, order):
+        if order == 0:
+            return [start, end]
+        vec = end - start
+        p1 = start + vec / 3
+        p2 = start + 2 * vec / 3
+        zv = complex(vec[0], vec[1])
+        rot = zv * (0.5 + 0.8660254037844386j)  # exp(i*pi/3)
+        p_top = p1 + np.array([rot.real, rot.imag]) / 3
+        points = []
+        points.extend(koch_curve(start, p1, order-1))
+        points.extend(koch_curve(p1, p_top, order-1))
+        points.extend(koch_curve(p_top, p2, order-1))
+        points.extend(koch_curve(p2, end, order-1))
+        return points
+
+    height = size * np.sqrt(3) / 2
+    vertices = np.array([
+        [-size/2, -height/3],
+        [size/2, -height/3],
+        [0, height*2/3]
+    ])
+    points = []
+    for i in range(3):
+        points.extend(koch_curve(vertices[i], vertices[(i+1)%3], order))
+    return np.array(points)
+
+def legacy_sierpinski_triangle(order, size=1):
+    """原始的递归实现，仅作对照"""
+    def create_triangles(vertices, order):
+        if order == 0:
+            return [vertices]
+        mid_points = [
+            (vertices[0] + vertices[1]) / 2,
+            (vertices[1] + vertices[2]) / 2,
+            (vertices[2] + vertices[0]) / 2
+        ]
+        triangles = []
+        triangles.extend(create_triangles([vertices[0], mid_points[0], mid_points[2]], order-1))
+        triangles.extend(create_triangles([mid_points[0], vertices[1], mid_points[1]], order-1))
+        triangles.extend(create_triangles([mid_points[2], mid_points[1], vertices[2]], order-1))
+        return triangles
+
+    height = size * np.sqrt(3) / 2
+    initial_vertices = np.array([
+        [-size/2, -height/3],
+        [size/2, -height/3],
+        [0, height*2/3]
+    ])
+    return create_triangles(initial_vertices, order)
+
+def legacy_plot_sierpinski(order, dpi):
+    """原始实现：递归生成并逐个三角形调用 ax.plot"""
+    fig, ax = plt.subplots(figsize=(10, 10))
+    for triangle in legacy_sierpinski_triangle(order):
+        tri = np.vstack([triangle, triangle[0]])
+        ax.plot(tri[:, 0], tri[:, 1], 'b-', linewidth=1)
+    ax.set_aspect('equal')
+    ax.axis('off')
+    return figure_to_bytes(fig, dpi=dpi)
+
+def best_time(func, *args, repeat=5):
+    """多次运行取最短耗时（毫秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def bench_koch(max_legacy_order=7, max_order=10):
+    """对比递归实现与逐级向量化实现"""
+    print("科赫雪花")
+    print(f"{'阶数':>4}{'顶点数':>12}{'递归(ms)':>12}{'向量化(ms)':>12}{'加速比':>10}")
+    for order in range(max_order + 1):
+        points = koch_snowflake(order)
+        fast = best_time(koch_snowflake, order)
+        if order <= max_legacy_order:
+            # 递归实现每条线段输出 [起点, 终点]，去重后应与新实现一致
+            legacy = legacy_koch_snowflake(order)
+            assert np.allclose(legacy[::2], points[:-1]) and np.allclose(legacy[-1], points[-1])
+            slow = best_time(legacy_koch_snowflake, order, repeat=1 if order > 5 else 3)
+            print(f"{order:>4}{len(points):>12}{slow:>12.2f}{fast:>12.3f}{slow / fast:>10.1f}")
+        else:
+            print(f"{order:>4}{len(points):>12}{'-':>12}{fast:>12.3f}{'-':>10}")
+
+def bench_sierpinski(max_legacy_order=6, max_order=10):
+    """对比递归生成与批量生成"""
+    print("谢尔宾斯基三角形（生成）")
+    print(f"{'阶数':>4}{'三角形数':>12}{'递归(ms)':>12}{'向量化(ms)':>12}{'加速比':>10}")
+    for order in range(max_order + 1):
+        triangles = sierpinski_triangle(order)
+        fast = best_time(sierpinski_triangle, order)
+        if order <= max_legacy_order:
+            legacy = np.array(legacy_sierpinski_triangle(order))
+            assert np.allclose(legacy, triangles)
+            slow = best_time(legacy_sierpinski_triangle, order, repeat=3)
+            print(f"{order:>4}{len(triangles):>12}{slow:>12.2f}{fast:>12.3f}{slow / fast:>10.1f}")
+        else:
+            print(f"{order:>4}{len(triangles):>12}{'-':>12}{fast:>12.3f}{'-':>10}")
+
+    print("谢尔宾斯基点云（混沌游戏，20万点）")
+    for order in (8, 12, 16):
+        print(f"{order:>4}{best_time(sierpinski_chaos_game, order):>12.2f} ms")
+
+def bench_end_to_end(order=8, dpi=100):
+    """生成 + 绘制 + 编码 PNG 的端到端耗时"""
+    print(f"端到端（阶数 {order}，DPI {dpi}）")
+    for fractal_type in ("koch", "sierpinski", "sierpinski_points"):
+        elapsed = best_time(lambda: figure_to_bytes(draw_fractal(fractal_type, order), dpi=dpi), repeat=3)
+        print(f"{fractal_type:>20}{elapsed:>12.1f} ms")
+    if order <= 7:
+        elapsed = best_time(legacy_plot_sierpinski, order, dpi, repeat=1)
+        print(f"{'sierpinski(原实现)':>20}{elapsed:>12.1f} ms")
+
+def bench_streaming():
+    """流式导出的耗时与峰值内存"""
+    print("流式导出（二进制，写入 /dev/null）")
+    print(f"{'分形':>12}{'阶数':>6}{'个数':>12}{'耗时(s)':>10}{'峰值内存(MB)':>14}")
+    cases = [("koch", iter_koch_segments, 8), ("koch", iter_koch_segments, 10),
+             ("sierpinski", iter_sierpinski_triangles, 10), ("sierpinski", iter_sierpinski_triangles, 13)]
+    for name, generator, order in cases:
+        tracemalloc.start()
+        start = time.perf_counter()
+        with open(os.devnull, "wb") as f:
+            count = write_chunks(generator(order), f)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:>12}{order:>6}{count:>12}{elapsed:>10.2f}{peak / 1024 / 1024:>14.1f}")
+
+def bench_engine(resolution=800, max_iter=200):
+    """逃逸时间（单进程整幅 / 多进程分块）与 IFS 的耗时"""
+    print(f"逃逸时间（{resolution}x{resolution}，最大迭代 {max_iter}，{ENGINE_WORKERS} 进程）")
+    views = {"mandelbrot": ((-2.25, 0.75, -1.5, 1.5), None), "julia": ((-1.6, 1.6, -1.6, 1.6), -0.8 + 0.156j)}
+    for name, (bounds, julia_c) in views.items():
+        single = best_time(escape_time, bounds, resolution, resolution, max_iter, julia_c, repeat=1)
+        # 预热进程池；不同的 max_iter 避开视口缓存
+        render_escape_time(bounds, resolution, resolution, max_iter + 1, julia_c)
+        start = time.perf_counter()
+        render_escape_time(bounds, resolution, resolution, max_iter, julia_c)
+        tiled = (time.perf_counter() - start) * 1000
+        cached = best_time(render_escape_time, bounds, resolution, resolution, max_iter, julia_c)
+        print(f"{name:>12}  单进程 {single:8.1f} ms  分块并行 {tiled:8.1f} ms  缓存命中 {cached:6.3f} ms")
+
+    print("IFS（50万点）")
+    for name, ifs in IFS_SYSTEMS.items():
+        generate = best_time(ifs_points, ifs, 500_000, repeat=3)
+        points = ifs_points(ifs, 500_000)
+        raster = best_time(ifs_density, points, resolution, repeat=3)
+        print(f"{name:>12}  生成 {generate:8.1f} ms  栅格化 {raster:6.1f} ms")
+
+def bench_zoom(width=768, height=512):
+    """缩放浏览：首屏、平移（复用图块）与深度放大（微扰算法）的耗时"""
+    print(f"缩放浏览（视口 {width}x{height}，{ENGINE_WORKERS} 进程）")
+    # 海马谷附近的螺旋，各级别的视口中心相同
+    center = (-0.743643887037158, 0.131825904205312)
+    for zoom in (4, 16, 32, 40):
+        step = pixel_spacing(zoom)
+        center_px, center_py = int(center[0] / step), int(-center[1] / step)
+        start = time.perf_counter()
+        _, _, computed, total = render_viewport(zoom, center_px, center_py, width, height)
+        first = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        _, _, panned, _ = render_viewport(zoom, center_px + width // 4, center_py, width, height)
+        pan = (time.perf_counter() - start) * 1000
+        print(f"{zoom:>4}级  首屏 {first:9.1f} ms（{computed}/{total} 图块）  平移 {pan:9.1f} ms（{panned} 图块）")
+
+if __name__ == "__main__":
+    # 缺少中文字体时 Matplotlib 会对每个字形告警，不影响计时
+    warnings.filterwarnings("ignore")
+    bench_koch()
+    bench_sierpinski()
+    bench_end_to_end(order=6)
+    bench_end_to_end(order=8)
+    bench_streaming()
+    bench_engine()
+    bench_zoom()
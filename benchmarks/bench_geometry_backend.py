@@ -0,0 +1,73 @@
+"""
+几何页面渲染方式基准
+
+模拟拖动滑块（每帧参数不同，不命中图形缓存），比较服务器端每次交互的耗时与传输体积：
+- Matplotlib：绘图函数 + PNG 编码（几何模板已启用图形池与位块传输）
+- 浏览器渲染：场景函数 + 编译为 Vega-Lite 规格 + JSON 序列化
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_geometry_backend
+    python -m benchmarks.bench_geometry_backend --dpi 100
+"""
+import argparse
+import json
+import statistics
+import time
+import warnings
+
+import matplotlib
+matplotlib.use("Agg")
+from streamlit import logger as streamlit_logger
+
+from src.components.angle_drawer import angle_scene, draw_angle
+from src.pages.geometry.circles import circle_calculator_scene, concentric_circles_scene, draw_circle_calculator, draw_concentric_circles
+from src.pages.geometry.curtain_model import curtain_model_scene, draw_curtain_model
+from src.pages.geometry.polygons import plot_regular_polygon, regular_polygon_scene
+from src.pages.geometry.triangles import basic_triangles_scene, draw_basic_triangles
+from src.utils.figure_cache import DEFAULT_DPI, figure_to_bytes
+from src.utils.geometry_scene import scene_to_vega_lite
+
+# (名称, 绘图函数, 场景函数, 参数序列)
+CASES = [
+    ("角度", draw_angle, angle_scene, [(angle,) for angle in range(-360, 361, 30)]),
+    ("同心圆", draw_concentric_circles, concentric_circles_scene,
+     [(round(0.5 + 0.2 * i, 1), 0.3) for i in range(20)]),
+    ("圆的计算", draw_circle_calculator, circle_calculator_scene, [(round(0.1 * i, 1),) for i in range(1, 30)]),
+    ("正多边形", plot_regular_polygon, regular_polygon_scene, [(n, 1.0) for n in range(3, 27)]),
+    ("三角形", draw_basic_triangles, basic_triangles_scene, [()] * 5),
+    ("窗帘模型", draw_curtain_model, curtain_model_scene,
+     [(round(0.1 * i, 1), 'vertical', 'circle') for i in range(1, 30)]),
+]
+
+def matplotlib_frame(draw_func, scene_func, args, dpi):
+    return len(figure_to_bytes(draw_func(*args), dpi=dpi))
+
+def vega_lite_frame(draw_func, scene_func, args, dpi):
+    return len(json.dumps(scene_to_vega_lite(scene_func(*args)), ensure_ascii=False).encode("utf-8"))
+
+def frame_stats(frame, draw_func, scene_func, frames, dpi):
+    """逐帧执行，返回耗时中位数（毫秒）与平均传输体积（KB）"""
+    frame(draw_func, scene_func, frames[0], dpi)  # 预热：字体加载与模板创建不计入
+    times, sizes = [], []
+    for args in frames:
+        start = time.perf_counter()
+        sizes.append(frame(draw_func, scene_func, args, dpi))
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), statistics.mean(sizes) / 1024
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="比较 Matplotlib 与浏览器渲染的服务器端开销")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI, help="PNG 分辨率")
+    args = parser.parse_args(argv)
+
+    print(f"{'图形':<8}{'PNG(ms)':>10}{'PNG(KB)':>10}{'规格(ms)':>10}{'规格(KB)':>10}{'加速':>8}")
+    for name, draw_func, scene_func, frames in CASES:
+        png_ms, png_kb = frame_stats(matplotlib_frame, draw_func, scene_func, frames, args.dpi)
+        spec_ms, spec_kb = frame_stats(vega_lite_frame, draw_func, scene_func, frames, args.dpi)
+        print(f"{name:<8}{png_ms:>10.1f}{png_kb:>10.1f}{spec_ms:>10.2f}{spec_kb:>10.1f}{png_ms / spec_ms:>7.0f}x")
+
+if __name__ == "__main__":
+    # 缺少中文字体时 Matplotlib 会对每个字形告警；脱离 streamlit run 时会话状态会告警，均不影响计时
+    warnings.filterwarnings("ignore")
+    streamlit_logger.set_log_level("error")
+    main()
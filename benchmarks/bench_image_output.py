@@ -0,0 +1,70 @@
+"""
+图像输出格式基准
+
+对线条分形、位图分形与几何图形分别按各种输出格式编码，比较传输体积（SVG 按 base64
+内嵌计入 4/3）与编码耗时，并列出 "auto" 策略实际选择的格式。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_image_output
+    python -m benchmarks.bench_image_output --columns 2
+"""
+import argparse
+import statistics
+import time
+import warnings
+
+import matplotlib
+matplotlib.use("Agg")
+from streamlit import logger as streamlit_logger
+
+from src.pages.geometry.circles import draw_circle_with_components
+from src.pages.geometry.fractals import draw_escape_time, draw_fractal, draw_ifs
+from src.pages.geometry.polygons import plot_regular_polygon
+from src.utils.image_output import IMAGE_FORMATS, detect_format, encode_figure
+from src.utils.visualization import release_figure
+
+# (名称, 绘图函数, 参数)
+CASES = [
+    ("科赫曲线 1 阶", draw_fractal, ("koch", 1, 1)),
+    ("科赫曲线 5 阶", draw_fractal, ("koch", 5, 1)),
+    ("谢尔宾斯基 6 阶", draw_fractal, ("sierpinski", 6, 1)),
+    ("曼德博集合", draw_escape_time, ("mandelbrot", 100)),
+    ("巴恩斯利蕨", draw_ifs, ("fern", 50_000)),
+    ("正六边形", plot_regular_polygon, (6, 1.0)),
+    ("圆的组成", draw_circle_with_components, ()),
+]
+
+def encode_stats(draw_func, args, fmt, columns, repeat):
+    """返回编码耗时中位数（毫秒，含栅格化）、传输体积（KB）与输出格式"""
+    times = []
+    for _ in range(repeat):
+        fig = draw_func(*args)
+        start = time.perf_counter()
+        data = encode_figure(fig, fmt, columns=columns)
+        times.append((time.perf_counter() - start) * 1000)
+        release_figure(fig)
+    emitted = detect_format(data)
+    size = len(data) * 4 / 3 if emitted == "svg" else len(data)
+    return statistics.median(times), size / 1024, emitted
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="比较各输出格式的体积与编码耗时")
+    parser.add_argument("--columns", type=int, default=1, help="图形所在容器的列数")
+    parser.add_argument("--repeat", type=int, default=3, help="每种格式重复编码的次数")
+    args = parser.parse_args(argv)
+
+    header = "".join(f"{fmt:>16}" for fmt in IMAGE_FORMATS)
+    print(f"{'图形':<16}{header}")
+    for name, draw_func, draw_args in CASES:
+        cells = []
+        for fmt in IMAGE_FORMATS:
+            ms, kb, emitted = encode_stats(draw_func, draw_args, fmt, args.columns, args.repeat)
+            label = f"({emitted})" if fmt == "auto" else ""
+            cells.append(f"{kb:.1f}KB/{ms:.0f}ms{label}")
+        print(f"{name:<16}" + "".join(f"{cell:>16}" for cell in cells))
+
+if __name__ == "__main__":
+    # 缺少中文字体时 Matplotlib 会对每个字形告警；脱离 streamlit run 时会话状态会告警，均不影响计时
+    warnings.filterwarnings("ignore")
+    streamlit_logger.set_log_level("error")
+    main()
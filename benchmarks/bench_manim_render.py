@@ -0,0 +1,148 @@
+"""
+Manim 并行渲染基准
+
+同一组动画（函数 × 几何形状）分别按顺序渲染与经后台渲染队列并行渲染，
+比较墙钟耗时，并检查并行渲染得到的视频互不相同、大小与顺序渲染相近
+（每个任务使用独立的媒体目录，同名场景类不会互相覆盖输出文件）。
+两种方式都不读取视频缓存，Manim 自身的分段缓存也在独立目录中从零开始，耗时可以直接比较。
+
+--progressive 模式测量渐进式渲染的首帧耗时：每个动画先提交低质量预览、再提交
+最终质量，分别记录从提交到预览完成（首个画面可以显示）与最终质量完成的时间，
+并与只提交最终质量时的首帧耗时比较。
+
+--stream 模式测量流式渲染（逐帧编码为 HLS 分段）的首个分段耗时，
+与整段渲染完成的耗时比较（需要本地 ffmpeg）。
+
+用法（在项目根目录执行，需要安装 manim）：
+    python -m benchmarks.bench_manim_render
+    python -m benchmarks.bench_manim_render --workers 4 --quality medium_quality
+    python -m benchmarks.bench_manim_render --progressive --quality high_quality
+    python -m benchmarks.bench_manim_render --stream --quality high_quality
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from src.components.manim_demo import (PREVIEW_QUALITY, function_scene, geometry_scene, render_animation_job,
+                                       render_to_bytes, stream_animation_job)
+from src.utils.hls_stream import first_segment_time, read_playlist
+from src.utils.render_queue import DONE, RenderQueue
+
+# (名称, 场景函数, 参数)
+JOBS = [
+    *[(f"函数 {t}", function_scene, {"func_type": t}) for t in ("sin", "quadratic", "exponential")],
+    *[(f"几何 {t}", geometry_scene, {"shape_type": t}) for t in ("square", "circle", "triangle")],
+]
+
+def render_sequential(quality):
+    """在当前进程中依次渲染，返回 (耗时秒, {名称: 视频字节})"""
+    start = time.perf_counter()
+    videos = {name: render_to_bytes(factory(**params), quality) for name, factory, params in JOBS}
+    return time.perf_counter() - start, videos
+
+def render_parallel(quality, workers):
+    """经渲染队列并行渲染，返回 (耗时秒, {名称: 视频字节})"""
+    queue = RenderQueue(max_workers=workers, max_pending=len(JOBS))
+    try:
+        start = time.perf_counter()
+        for name, factory, params in JOBS:
+            queue.submit(name, render_animation_job, factory, params, quality)
+        while not all(queue.get(name).finished for name, _, _ in JOBS):
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - start
+        jobs = {name: queue.get(name) for name, _, _ in JOBS}
+    finally:
+        queue.shutdown()
+    failed = [f"{name}: {job.error}" for name, job in jobs.items() if job.status != DONE]
+    if failed:
+        raise RuntimeError("渲染失败：" + "; ".join(failed))
+    return elapsed, {name: job.result for name, job in jobs.items()}
+
+def finish_times(queue, keys, start):
+    """轮询直到任务全部结束，返回 {键: 从 start 起的完成时间（秒）}"""
+    times = {}
+    while len(times) < len(keys):
+        for key in keys:
+            job = queue.get(key)
+            if key not in times and job.finished:
+                if job.status != DONE:
+                    raise RuntimeError(f"渲染失败：{key}: {job.error}")
+                times[key] = time.perf_counter() - start
+        time.sleep(0.05)
+    return times
+
+def render_progressive(quality, workers, preview):
+    """提交全部动画（可选先提交预览），返回 {名称: (首帧耗时, 最终质量耗时)}"""
+    queue = RenderQueue(max_workers=workers, max_pending=2 * len(JOBS))
+    try:
+        start = time.perf_counter()
+        for name, factory, params in JOBS:
+            if preview:
+                queue.submit(f"{name}/preview", render_animation_job, factory, params, PREVIEW_QUALITY)
+            queue.submit(name, render_animation_job, factory, params, quality)
+        keys = [key for name, _, _ in JOBS for key in ([f"{name}/preview"] if preview else []) + [name]]
+        times = finish_times(queue, keys, start)
+    finally:
+        queue.shutdown()
+    return {name: (times[f"{name}/preview"] if preview else times[name], times[name]) for name, _, _ in JOBS}
+
+def main_progressive(args):
+    progressive = render_progressive(args.quality, args.workers, preview=True)
+    direct = render_progressive(args.quality, args.workers, preview=False)
+    print(f"{'动画':<16}{'首帧(s)':>10}{'最终(s)':>10}{'无预览首帧(s)':>16}")
+    for name, _, _ in JOBS:
+        first, final = progressive[name]
+        print(f"{name:<16}{first:>10.1f}{final:>10.1f}{direct[name][0]:>16.1f}")
+
+def render_streamed(quality):
+    """逐个流式渲染，返回 {名称: (首个分段耗时, 全部完成耗时, 分段数)}"""
+    queue = RenderQueue(max_workers=1, max_pending=1)
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            for name, factory, params in JOBS:
+                directory = os.path.join(root, str(len(results)))
+                submitted = time.time()
+                start = time.perf_counter()
+                queue.submit(name, stream_animation_job, factory, params, quality, directory)
+                total = finish_times(queue, [name], start)[name]
+                segments, _ = read_playlist(directory)
+                results[name] = (first_segment_time(directory) - submitted, total, len(segments))
+    finally:
+        queue.shutdown()
+    return results
+
+def main_stream(args):
+    print(f"{'动画':<16}{'首个分段(s)':>12}{'完成(s)':>10}{'分段数':>8}")
+    for name, (first, total, segments) in render_streamed(args.quality).items():
+        print(f"{name:<16}{first:>12.1f}{total:>10.1f}{segments:>8}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="比较 Manim 顺序渲染与并行渲染")
+    parser.add_argument("--quality", default="low_quality", help="渲染质量预设")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="并行渲染的进程数")
+    parser.add_argument("--progressive", action="store_true", help="测量先预览、后最终质量的首帧耗时")
+    parser.add_argument("--stream", action="store_true", help="测量流式渲染的首个分段耗时")
+    args = parser.parse_args(argv)
+    if args.stream:
+        main_stream(args)
+        return
+    if args.progressive:
+        main_progressive(args)
+        return
+
+    sequential_s, expected = render_sequential(args.quality)
+    parallel_s, videos = render_parallel(args.quality, args.workers)
+
+    print(f"{'动画':<16}{'顺序(KB)':>10}{'并行(KB)':>10}")
+    for name, _, _ in JOBS:
+        print(f"{name:<16}{len(expected[name]) / 1024:>10.1f}{len(videos[name]) / 1024:>10.1f}")
+    # 输出文件互相覆盖时，不同参数的任务会得到相同的视频
+    distinct = len(set(videos.values())) == len(JOBS)
+    print(f"并行渲染的视频互不相同: {'是' if distinct else '否'}")
+    print(f"顺序渲染: {sequential_s:.1f}s  并行渲染（{args.workers} 进程）: {parallel_s:.1f}s  "
+          f"加速: {sequential_s / parallel_s:.2f}x")
+
+if __name__ == "__main__":
+    main()
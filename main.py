@@ -1,6 +1,10 @@
 """
 主程序入口
 """
+# 启动分析需要在其他模块导入之前安装（环境变量 STREAMLIT_MATH_STARTUP_PROFILE）
+from src.utils import startup_profiler
+startup_profiler.install_from_env()
+
 import streamlit as st
 from src.utils.page_config import (
     PageID, 
@@ -8,6 +12,8 @@ from src.utils.page_config import (
     get_page_id_by_display_name,
     get_all_display_names
 )
+from src.utils.visualization import check_figure_leaks
+from src.utils.image_output import report_image_stats
 
 def set_page_config():
     """设置页面配置"""
@@ -33,7 +39,11 @@ def main():
     if page_id:
         # 获取并调用页面处理函数
         page_handler = get_page_handler(page_id)
-        page_handler()
+        with startup_profiler.section(page_id.value, kind="first_render", once=True):
+            page_handler()
+        # 调试模式（STREAMLIT_MATH_FIGURE_DEBUG）下检查图形是否泄漏，并显示图像输出统计
+        check_figure_leaks()
+        report_image_stats()
     else:
         st.markdown(f"# {page_name} 页面正在建设中...")
 
@@ -1,13 +1,17 @@
 import streamlit as st
-import matplotlib.pyplot as plt
 import numpy as np
-from ..utils.visualization import create_figure, setup_coordinate_system
+from ..utils.visualization import (
+    FigureTemplate,
+    create_figure,
+    get_template_figure,
+    managed_figure,
+    setup_coordinate_system,
+)
 from ..utils.plot_utils import configure_matplotlib_defaults
+from ..utils.geometry_scene import Scene, show_geometry
+from ..utils.image_output import displayed_in_columns, emit_figure
 from ..i18n.language_manager import get_text
 
-# 配置matplotlib并获取中文字体
-chinese_font = configure_matplotlib_defaults()
-
 def calculate_angle_points(angle_deg, radius=5, num_points=100):
     """计算角的边的点坐标
     
@@ -41,26 +45,18 @@ def calculate_angle_points(angle_deg, radius=5, num_points=100):
     
     return (x_start, y_start), (x_end, y_end), (x_arc, y_arc)
 
-def draw_angle(angle_deg):
-    """绘制角度"""
-    fig, ax = plt.subplots(figsize=(6, 6))
-    
-    # 计算角的点
-    (x_start, y_start), (x_end, y_end), (x_arc, y_arc) = calculate_angle_points(angle_deg)
+def _build_angle():
+    """角度模板：起始射线、坐标轴等静态部分，以及终止射线、弧线、标注与图例"""
+    chinese_font = configure_matplotlib_defaults()
+    fig, ax = create_figure(figsize=(6, 6))
     
-    # 绘制射线
+    # 起始射线固定为水平方向
+    (x_start, y_start), _, _ = calculate_angle_points(0)
     ax.plot(x_start, y_start, 'b-', linewidth=2, label=get_text('start_side'))
-    ax.plot(x_end, y_end, 'r-', linewidth=2, label=get_text('end_side'))
-    
-    # 绘制弧线
-    ax.plot(x_arc, y_arc, 'g-', linewidth=2)
-    
-    # 添加角度标注
-    arc_center_idx = len(x_arc) // 2
-    arc_center_x = x_arc[arc_center_idx] * 1.5
-    arc_center_y = y_arc[arc_center_idx] * 1.5
-    ax.text(arc_center_x, arc_center_y, f'{abs(angle_deg)}°',
-            fontproperties=chinese_font, fontsize=12)
+    # 终止射线与弧线（数据由 _update_angle 填入）
+    end_side, = ax.plot([], [], 'r-', linewidth=2, label=get_text('end_side'))
+    arc, = ax.plot([], [], 'g-', linewidth=2)
+    label = ax.text(0, 0, '', fontproperties=chinese_font, fontsize=12)
     
     # 设置图形属性
     ax.set_aspect('equal')
@@ -70,12 +66,47 @@ def draw_angle(angle_deg):
     ax.set_title(get_text('angle_visualization'), fontproperties=chinese_font)
     ax.set_xlabel('x', fontproperties=chinese_font)
     ax.set_ylabel('y', fontproperties=chinese_font)
-    ax.legend(prop=chinese_font)
+    # 图例位置（'best'）随终止射线变化，也作为动态部分
+    legend = ax.legend(prop=chinese_font)
     
-    return fig
+    return fig, (end_side, arc, label, legend)
+
+def _update_angle(artists, angle_deg):
+    """按角度更新角度模板"""
+    end_side, arc, label, _ = artists
+    _, (x_end, y_end), (x_arc, y_arc) = calculate_angle_points(angle_deg)
+    end_side.set_data(x_end, y_end)
+    arc.set_data(x_arc, y_arc)
+    
+    # 角度标注放在弧线中点外侧
+    arc_center_idx = len(x_arc) // 2
+    label.set_position((x_arc[arc_center_idx] * 1.5, y_arc[arc_center_idx] * 1.5))
+    label.set_text(f'{abs(angle_deg)}°')
 
-def draw_angle_component():
-    """角度绘制组件"""
+ANGLE = FigureTemplate("angle", _build_angle, _update_angle, blit=True)
+
+@displayed_in_columns(2)
+def draw_angle(angle_deg):
+    """绘制角度（复用模板池中的图形，渲染时只重绘变化的部分）"""
+    return get_template_figure(ANGLE, angle_deg)
+
+def angle_scene(angle_deg):
+    """draw_angle 的几何场景（浏览器端渲染）"""
+    (x_start, y_start), (x_end, y_end), (x_arc, y_arc) = calculate_angle_points(angle_deg)
+    scene = Scene((-6, 6), (-6, 6), title=get_text('angle_visualization'), xlabel='x', ylabel='y')
+    scene.polyline(np.column_stack((x_start, y_start)), color='blue', width=2, label=get_text('start_side'))
+    scene.polyline(np.column_stack((x_end, y_end)), color='red', width=2, label=get_text('end_side'))
+    scene.polyline(np.column_stack((x_arc, y_arc)), color='green', width=2)
+    arc_center_idx = len(x_arc) // 2
+    scene.text(x_arc[arc_center_idx] * 1.5, y_arc[arc_center_idx] * 1.5, f'{abs(angle_deg)}°')
+    return scene
+
+def draw_angle_component(backend="matplotlib"):
+    """角度绘制组件
+    
+    Args:
+        backend: 渲染方式，见 geometry_scene.select_render_backend
+    """
     st.subheader(get_text('angle_explorer'))
     
     # 移除原来的列布局，改为垂直布局
@@ -92,11 +123,14 @@ def draw_angle_component():
     """)
     
     # 图形放在特点说明的下面
-    fig = draw_angle(angle)
-    st.pyplot(fig)
+    show_geometry(draw_angle, angle_scene, angle, backend=backend, width=320)
 
-def draw_special_angles_component():
-    """特殊角度展示组件"""
+def draw_special_angles_component(backend="matplotlib"):
+    """特殊角度展示组件
+    
+    Args:
+        backend: 渲染方式，见 geometry_scene.select_render_backend
+    """
     st.subheader(get_text('special_angles'))
     
     special_angles = {
@@ -115,8 +149,7 @@ def draw_special_angles_component():
     )
     
     angle, description_key = special_angles[selected_angle]
-    fig = draw_angle(angle)
-    st.pyplot(fig)
+    show_geometry(draw_angle, angle_scene, angle, backend=backend, width=320)
     
     # 添加说明
     st.markdown(get_text(description_key))
@@ -141,13 +174,13 @@ def draw_dynamic_coordinate_system_component():
     
     # 创建一个居中的容器
     col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:  # 使用中间的列来显示图形
-        fig, ax = create_figure(figsize=(4, 4))  # 使用较小的图形尺寸
+    # 使用中间的列来显示图形，显示后释放图形
+    with col2, managed_figure(figsize=(4, 4)) as (fig, ax):  # 使用较小的图形尺寸
         
         # 设置坐标系范围
         setup_coordinate_system(ax, xlim=(x_min, x_max), ylim=(y_min, y_max))
         
-        st.pyplot(fig)
+        emit_figure(fig, columns=2)
 
 def draw_interactive_control_component():
     """交互控制选项组件"""
@@ -165,8 +198,8 @@ def draw_interactive_control_component():
     
     # 创建一个居中的容器
     col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:  # 使用中间的列来显示图形
-        fig, ax = create_figure(figsize=(4, 4))  # 使用较小的图形尺寸
+    # 使用中间的列来显示图形，显示后释放图形
+    with col2, managed_figure(figsize=(4, 4)) as (fig, ax):  # 使用较小的图形尺寸
         
         # 设置交互控制选项
         ax.grid(show_grid)
@@ -174,4 +207,4 @@ def draw_interactive_control_component():
         ax.set_title('交互控制选项' if show_title else '')
         ax.legend([] if show_legend else None)
         
-        st.pyplot(fig)
\ No newline at end of file
+        emit_figure(fig, columns=2)
\ No newline at end of file
@@ -0,0 +1,126 @@
+import time
+
+import numpy as np
+import streamlit as st
+from matplotlib import colormaps
+
+from ..utils.fractal_engine import (
+    PYRAMID_MAX_ZOOM,
+    adaptive_max_iter,
+    get_tile_cache_stats,
+    pixel_spacing,
+    render_viewport,
+)
+
+# 视口像素尺寸（宽, 高），宽高均为图块边长的整数倍时拼接最省
+VIEWPORT_SIZE = (768, 512)
+
+# 每次平移移动视口宽（高）的比例
+PAN_FRACTION = 0.25
+
+# 预设位置：名称 -> (中心实部, 中心虚部, 缩放级别)
+MANDELBROT_PRESETS = {
+    "全景": (-0.75, 0.0, 1),
+    "海马谷": (-0.7453, 0.1127, 9),
+    "象谷": (0.2925, 0.0149, 9),
+    "迷你曼德博": (-1.7687, 0.0017, 12),
+}
+JULIA_PRESETS = {
+    "全景": (0.0, 0.0, 1),
+}
+
+def _state_key(prefix, name):
+    return f"{prefix}_{name}"
+
+def _to_pixel(value, zoom):
+    """把复平面坐标换算为第 zoom 级的全局像素坐标"""
+    return int(np.floor(value / pixel_spacing(zoom)))
+
+def _go_to(prefix, re, im, zoom):
+    st.session_state[_state_key(prefix, "zoom")] = zoom
+    st.session_state[_state_key(prefix, "cx")] = _to_pixel(re, zoom)
+    st.session_state[_state_key(prefix, "cy")] = _to_pixel(-im, zoom)
+
+def _zoom(prefix, delta):
+    """以视口中心为不动点缩放一级"""
+    zoom_key = _state_key(prefix, "zoom")
+    zoom = st.session_state[zoom_key]
+    new_zoom = min(PYRAMID_MAX_ZOOM, max(0, zoom + delta))
+    if new_zoom == zoom:
+        return
+    for axis in ("cx", "cy"):
+        key = _state_key(prefix, axis)
+        st.session_state[key] = st.session_state[key] * 2 if delta > 0 else st.session_state[key] // 2
+    st.session_state[zoom_key] = new_zoom
+
+def _pan(prefix, dx, dy):
+    """按视口比例平移，坐标保持为整数像素，平移后可复用已有图块"""
+    width, height = VIEWPORT_SIZE
+    st.session_state[_state_key(prefix, "cx")] += int(dx * width * PAN_FRACTION)
+    st.session_state[_state_key(prefix, "cy")] += int(dy * height * PAN_FRACTION)
+
+def colorize_escape_time(image, max_iter, cmap="magma"):
+    """把逃逸时间数组映射为 RGB 图像，集合内部为黑色"""
+    normalized = np.log1p(image) / np.log1p(max_iter)
+    return colormaps[cmap](np.clip(normalized, 0, 1), bytes=True)[..., :3]
+
+def show_fractal_zoom_viewer(kind="mandelbrot", julia_c=None, key_prefix="fractal_zoom"):
+    """显示可缩放、平移的曼德博集合 / 朱利亚集合浏览器
+
+    Args:
+        kind: "mandelbrot" 或 "julia"
+        julia_c: 朱利亚集合参数 c
+        key_prefix: session_state 键的前缀，同一页面内多个浏览器需使用不同前缀
+    """
+    prefix = f"{key_prefix}_{kind}"
+    presets = MANDELBROT_PRESETS if kind == "mandelbrot" else JULIA_PRESETS
+    if _state_key(prefix, "zoom") not in st.session_state:
+        _go_to(prefix, *presets["全景"])
+
+    preset_col, iter_col = st.columns(2)
+    with preset_col:
+        preset = st.selectbox("跳转到", list(presets.keys()), key=_state_key(prefix, "preset"))
+        st.button("前往", key=_state_key(prefix, "goto"), on_click=_go_to, args=(prefix, *presets[preset]))
+    zoom = st.session_state[_state_key(prefix, "zoom")]
+    with iter_col:
+        auto_iter = st.checkbox("按缩放级别自动调整迭代次数", value=True, key=_state_key(prefix, "auto_iter"))
+        if auto_iter:
+            max_iter = adaptive_max_iter(zoom)
+            st.caption(f"最大迭代次数：{max_iter}")
+        else:
+            max_iter = st.slider("最大迭代次数", 50, 10000, 500, 50, key=_state_key(prefix, "max_iter"))
+
+    controls = st.columns(7)
+    buttons = [
+        ("＋ 放大", _zoom, (prefix, 1)),
+        ("－ 缩小", _zoom, (prefix, -1)),
+        ("←", _pan, (prefix, -1, 0)),
+        ("→", _pan, (prefix, 1, 0)),
+        ("↑", _pan, (prefix, 0, -1)),
+        ("↓", _pan, (prefix, 0, 1)),
+        ("复位", _go_to, (prefix, *presets["全景"])),
+    ]
+    for column, (label, callback, args) in zip(controls, buttons):
+        with column:
+            st.button(label, key=_state_key(prefix, f"btn_{label}"), on_click=callback, args=args,
+                      use_container_width=True)
+
+    center_px = st.session_state[_state_key(prefix, "cx")]
+    center_py = st.session_state[_state_key(prefix, "cy")]
+    width, height = VIEWPORT_SIZE
+    start = time.perf_counter()
+    image, bounds, computed, total = render_viewport(zoom, center_px, center_py, width, height,
+                                                     max_iter, julia_c)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    st.image(colorize_escape_time(image, max_iter), use_column_width=True)
+
+    center = complex((bounds[0] + bounds[1]) / 2, (bounds[2] + bounds[3]) / 2)
+    stats = get_tile_cache_stats()
+    st.caption(
+        f"中心 {center.real:.15g} {center.imag:+.15g}i ｜ 缩放级别 {zoom}（放大 {2 ** zoom:,} 倍）｜ "
+        f"图块 {total - computed}/{total} 命中缓存，新计算 {computed} 个，耗时 {elapsed:.0f} ms ｜ "
+        f"图块缓存 {stats.size_bytes / 1024 / 1024:.0f}/{stats.max_bytes / 1024 / 1024:.0f} MB"
+    )
+    if zoom >= PYRAMID_MAX_ZOOM:
+        st.info("已达到最大缩放级别。")
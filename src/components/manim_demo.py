@@ -2,94 +2,456 @@
 Manim 动画组件示例
 """
 import streamlit as st
+import streamlit.components.v1 as components
+import manim
 from manim import *
 import tempfile
 import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+from ..utils.hls_stream import HLSWriter, first_segment_time, stream_directory, stream_player_html, stream_url
+from ..utils.render_queue import DONE, FAILED, QUEUED, RenderQueueFull, get_render_queue
+from ..utils.tex_cache import install_tex_cache
+from ..utils.video_cache import get_video, make_scene_key, put_video, render_video
+
+# 渲染状态的轮询间隔（秒）
+POLL_INTERVAL = 1.0
+
+# 渐进式渲染：先渲染低质量预览（480p15）尽快显示，再在后台渲染请求的质量
+PREVIEW_QUALITY = "low_quality"
+DEFAULT_QUALITY = "high_quality"
+
+# 函数类型 -> 公式标签（同时用于预编译公式缓存）
+FUNCTION_LABELS = {
+    "sin": r"f(x)=\sin(x)",
+    "quadratic": r"f(x)=x^2",
+    "exponential": r"f(x)=e^x",
+}
+
+# 预编译公式的后台任务键（每个进程的渲染队列中只执行一次）
+TEX_PREWARM_JOB = "tex-prewarm"
+
+# 流式播放器的高度（像素）
+STREAM_PLAYER_HEIGHT = 420
+
+# 质量预设 -> 显示名称
+QUALITY_LABELS = {
+    "low_quality": "480p15",
+    "medium_quality": "720p30",
+    "high_quality": "1080p60",
+}
+
+# Manim 的 config 是进程级的全局对象，同一进程中的渲染（tempconfig）必须串行执行
+_render_lock = threading.Lock()
+
+def function_scene(func_type="sin"):
+    """函数动画场景
+
+    Args:
+        func_type: 函数类型，可选 "sin", "quadratic", "exponential"
+    """
+    class FunctionScene(Scene):
+        def construct(self):
+            # 创建坐标轴
+            axes = Axes(
+                x_range=[-3, 3, 1],
+                y_range=[-2, 2, 1],
+                axis_config={"color": BLUE},
+            )
+
+            # 根据函数类型选择不同的函数
+            if func_type == "sin":
+                graph = axes.plot(lambda x: np.sin(x), color=WHITE)
+            elif func_type == "quadratic":
+                graph = axes.plot(lambda x: x**2, color=WHITE)
+            else:  # exponential
+                graph = axes.plot(lambda x: np.exp(x), color=WHITE)
+            label = MathTex(FUNCTION_LABELS.get(func_type, FUNCTION_LABELS["exponential"]))
+
+            # 设置标签位置
+            label.to_corner(UR)
+
+            # 创建动画
+            self.play(Create(axes))
+            self.play(Create(graph))
+            self.play(Write(label))
+            self.wait()
+
+    return FunctionScene
+
+def geometry_scene(shape_type="square"):
+    """几何变换动画场景
+
+    Args:
+        shape_type: 形状类型，可选 "square", "circle", "triangle"
+    """
+    class GeometryScene(Scene):
+        def construct(self):
+            # 创建形状
+            if shape_type == "square":
+                shape = Square(color=BLUE)
+            elif shape_type == "circle":
+                shape = Circle(color=BLUE)
+            else:  # triangle
+                shape = Triangle(color=BLUE)
+
+            # 创建动画序列
+            self.play(Create(shape))
+            self.play(Rotate(shape, PI/2))
+            self.play(shape.animate.scale(2))
+            self.play(shape.animate.set_color(RED))
+            self.wait()
+
+    return GeometryScene
+
+def count_frames(scene_class):
+    """估算场景的总帧数
+
+    以跳过动画的方式执行一遍 construct（每段动画只计算最后一帧，不写视频），
+    按每段动画的时长与帧率累加帧数，与正式渲染写入的帧数一致。
+    """
+    renderer = CairoRenderer(skip_animations=True)
+    scene = scene_class(renderer=renderer)
+    frame_rate = config.frame_rate
+    total = 0
+    play = renderer.play
+
+    def counting_play(scene, *args, **kwargs):
+        nonlocal total
+        play(scene, *args, **kwargs)
+        if scene.is_current_animation_frozen_frame():
+            total += int(scene.duration * frame_rate)
+        else:
+            total += len(np.arange(0, scene.duration, 1 / frame_rate))
+
+    renderer.play = counting_play
+    with tempconfig({"write_to_movie": False}):
+        scene.render()
+    return total
+
+@contextmanager
+def isolated_media_dir():
+    """在独立的临时媒体目录中渲染，退出时删除该目录
+
+    并发的任务（即使场景类同名）各自写入自己的目录，不会互相覆盖输出文件。
+    """
+    media_dir = ManimDemo.create_temp_media_dir()
+    try:
+        with tempconfig({"media_dir": media_dir}):
+            yield media_dir
+    finally:
+        shutil.rmtree(media_dir, ignore_errors=True)
+
+def _on_frames(renderer, callback):
+    """渲染器每写入一帧（跳过的动画除外）时调用 callback(frame, num_frames)"""
+    add_frame = renderer.add_frame
+
+    def hooked_add_frame(frame, num_frames=1):
+        add_frame(frame, num_frames)
+        if not renderer.skip_animations:
+            callback(frame, num_frames)
+
+    renderer.add_frame = hooked_add_frame
+
+def render_to_bytes(scene_class, quality, progress=None):
+    """在独立的媒体目录中渲染场景，返回视频字节
+
+    Args:
+        scene_class: Manim Scene 类
+        quality: 渲染质量，可选 "low_quality", "medium_quality", "high_quality"
+        progress: render_queue.ProgressReporter，用于报告帧进度
+
+    Returns:
+        bytes: MP4 视频字节（结果由 video_cache 缓存，媒体目录随即删除）
+    """
+    install_tex_cache()
+    # 新目录中没有可复用的分段视频，关闭 Manim 自身的缓存以省去每段动画的哈希计算
+    with _render_lock, isolated_media_dir(), tempconfig({"quality": quality, "disable_caching": True}):
+        renderer = CairoRenderer()
+        if progress is not None:
+            progress.set_total(count_frames(scene_class))
+            _on_frames(renderer, lambda frame, num_frames: progress.advance(num_frames))
+        scene = scene_class(renderer=renderer)
+        scene.render()
+        # 按文件写入器给出的实际路径读取（目录名随分辨率与帧率变化）
+        with open(scene.renderer.file_writer.movie_file_path, "rb") as f:
+            return f.read()
+
+def stream_to_bytes(scene_class, quality, directory, progress=None):
+    """渲染场景，同时把每一帧编码为 HLS 流写入 directory
+
+    不再由 Manim 写 MP4（write_to_movie 关闭），帧直接送入 hls_stream.HLSWriter，
+    第一个分段完成后页面即可开始播放。
+
+    Returns:
+        bytes: 流结束后拼接得到的完整分片 MP4
+    """
+    install_tex_cache()
+    with _render_lock, isolated_media_dir(), \
+            tempconfig({"quality": quality, "disable_caching": True, "write_to_movie": False}):
+        if progress is not None:
+            progress.set_total(count_frames(scene_class))
+        renderer = CairoRenderer()
+        with HLSWriter(directory, config.pixel_width, config.pixel_height, config.frame_rate,
+                       config.ffmpeg_executable) as writer:
+
+            def write(frame, num_frames):
+                writer.write(frame, num_frames)
+                if progress is not None:
+                    progress.advance(num_frames)
+
+            _on_frames(renderer, write)
+            scene_class(renderer=renderer).render()
+        return writer.fmp4_bytes()
+
+def prewarm_tex_cache(progress):
+    """工作进程：预先编译演示用到的公式，写入共享的公式缓存
+
+    Returns:
+        int: 公式数量
+    """
+    install_tex_cache()
+    progress.set_total(len(FUNCTION_LABELS))
+    for label in FUNCTION_LABELS.values():
+        MathTex(label)
+        progress.advance()
+    return len(FUNCTION_LABELS)
+
+def render_animation_job(scene_factory, params, quality, progress):
+    """工作进程：渲染场景并返回视频字节
+
+    Args:
+        scene_factory: 返回 Scene 类的模块级函数（如 function_scene）
+        params: 传给 scene_factory 的参数
+        quality: 渲染质量
+        progress: render_queue.ProgressReporter
+    """
+    return render_to_bytes(scene_factory(**params), quality, progress)
+
+def stream_animation_job(scene_factory, params, quality, directory, progress):
+    """工作进程：渲染场景并输出 HLS 流，返回完整的分片 MP4 字节"""
+    return stream_to_bytes(scene_factory(**params), quality, directory, progress)
+
+def cache_video_job(key, job, *args):
+    """工作进程：执行返回视频字节的任务 job(*args, progress)，把视频写入视频缓存
+
+    视频在任务完成时就写入缓存，不经进程间管道传回，也不保存在渲染队列中；
+    提交任务的会话离开或刷新页面后，下一个请求同一视频的会话直接从缓存读取。
+
+    Returns:
+        int: 视频字节数
+    """
+    data = job(*args)
+    put_video(key, data)
+    return len(data)
+
+@dataclass
+class AnimationRequest:
+    """一次动画请求：预览与最终质量两个视频的内容地址"""
+    final_key: str
+    quality: str
+    preview_key: Optional[str] = None  # 不需要预览时为 None
+    submitted_at: float = 0.0
+    first_frame_s: Optional[float] = None  # 从提交到第一次显示视频的耗时（秒）
+    stream_key: Optional[str] = None  # 流式渲染任务的键，不是流式渲染时为 None
+    stream_dir: Optional[str] = None
+
+def _preview_pending(key):
+    """预览任务仍在排队或渲染（失败或过期时直接等待最终质量）"""
+    job = get_render_queue().get(key)
+    return job is not None and not job.finished
+
+@st.fragment(run_every=POLL_INTERVAL)
+def _render_status(key, label):
+    """轮询渲染任务的状态，完成后重新运行页面以显示视频"""
+    job = get_render_queue().get(key)
+    if job is None:
+        st.warning("渲染任务已过期，请重新生成")
+    elif job.status == DONE:
+        if get_video(key) is None:
+            st.error(f"{label}渲染完成，但视频不在缓存中（已被淘汰、超过缓存容量或缓存目录不可写），请重新生成")
+        else:
+            st.rerun()
+    elif job.status == FAILED:
+        st.error(f"{label}渲染失败：{job.error}")
+    elif job.status == QUEUED:
+        st.progress(0.0, text=f"{label}排队等待渲染...")
+    else:
+        st.progress(job.progress, text=f"正在渲染{label}：{job.frames_done} / {job.frames_total or '?'} 帧")
+
+@st.fragment(run_every=POLL_INTERVAL)
+def _stream_status(request):
+    """轮询流式渲染，第一个分段完成后重新运行页面以显示播放器"""
+    if first_segment_time(request.stream_dir) is not None:
+        st.rerun()
+    job = get_render_queue().get(request.stream_key)
+    if job is None:
+        st.warning("渲染任务已过期，请重新生成")
+    elif job.status == FAILED:
+        st.error(f"流式渲染失败：{job.error}")
+    elif job.status == QUEUED:
+        st.progress(0.0, text="排队等待渲染...")
+    else:
+        st.progress(job.progress, text=f"正在渲染第一个分段：{job.frames_done} / {job.frames_total or '?'} 帧")
 
 class ManimDemo:
     """Manim 演示类"""
-    
+
     @staticmethod
     def create_temp_media_dir():
         """创建临时媒体目录"""
         temp_dir = tempfile.mkdtemp()
         return temp_dir
 
+    def prewarm(self):
+        """在后台预编译公式（已提交过或队列已满时不提交）
+
+        任务排在之后提交的动画前面，新的工作进程不必在渲染时编译已知的公式。
+        失败的任务也不重新提交，避免每次页面运行都重复失败。
+        """
+        queue = get_render_queue()
+        if queue.get(TEX_PREWARM_JOB) is not None:
+            return
+        try:
+            queue.submit(TEX_PREWARM_JOB, prewarm_tex_cache)
+        except RenderQueueFull:
+            pass
+
     def render_scene(self, scene_class, quality="medium_quality"):
-        """渲染 Manim 场景
+        """在当前线程中渲染 Manim 场景（相同场景、参数与质量的视频从缓存读取）
 
         Args:
             scene_class: Manim Scene 类
             quality: 渲染质量，可选 "low_quality", "medium_quality", "high_quality"
+
+        Returns:
+            bytes: MP4 视频字节
         """
-        scene = scene_class()
-        scene.render()
-        # 使用 Manim 生成的实际视频路径
-        video_path = f"media/videos/1080p60/{scene_class.__name__}.mp4"
-        return video_path
+        return render_video(scene_class, render_to_bytes, quality, manim.__version__)
+
+    def submit_animation(self, scene_factory, quality=DEFAULT_QUALITY, preview=True, **params):
+        """把动画提交到后台渲染队列（已缓存的质量不提交）
+
+        需要预览时先提交低质量的预览任务，再提交请求的质量；两者在视频缓存中分别保存。
+
+        Args:
+            scene_factory: 返回 Scene 类的模块级函数，如 function_scene
+            quality: 最终的渲染质量
+            preview: 是否先渲染低质量预览
+            **params: 传给 scene_factory 的参数
+
+        Returns:
+            AnimationRequest: 交给 show_animation 显示
+
+        Raises:
+            RenderQueueFull: 渲染队列已满
+        """
+        scene_class = scene_factory(**params)
+        request = AnimationRequest(make_scene_key(scene_class, quality, manim.__version__), quality,
+                                   submitted_at=time.time())
+        if get_video(request.final_key) is not None:
+            return request
+        tasks = []
+        if preview and quality != PREVIEW_QUALITY:
+            request.preview_key = make_scene_key(scene_class, PREVIEW_QUALITY, manim.__version__)
+            if get_video(request.preview_key) is None:
+                # 进程池按提交顺序执行，预览先开始
+                tasks.append((request.preview_key, cache_video_job,
+                              (request.preview_key, render_animation_job, scene_factory, params, PREVIEW_QUALITY)))
+        tasks.append((request.final_key, cache_video_job,
+                      (request.final_key, render_animation_job, scene_factory, params, quality)))
+        # 两个任务一起提交：队列放不下最终质量时也不提交预览，不留下没有请求引用的任务
+        get_render_queue().submit_all(tasks)
+        return request
+
+    def show_animation(self, request):
+        """显示动画
+
+        最终质量的视频完成时直接播放；否则有预览时先播放预览，并在下方显示
+        最终质量的渲染进度，完成后自动替换。
+        """
+        final_label = QUALITY_LABELS.get(request.quality, request.quality)
+        video = get_video(request.final_key)
+        pending_label = None
+        if video is None and request.preview_key is not None:
+            video = get_video(request.preview_key)
+            if video is not None:
+                pending_label = final_label
+            elif _preview_pending(request.preview_key):
+                _render_status(request.preview_key, "预览")
+                return
+        if video is None:
+            _render_status(request.final_key, final_label)
+            return
+
+        if request.first_frame_s is None:
+            request.first_frame_s = time.time() - request.submitted_at
+        st.video(video, format="video/mp4")
+        if pending_label is None:
+            st.caption(f"{final_label}，首个画面用时 {request.first_frame_s:.1f} 秒")
+        else:
+            st.caption(f"预览（{QUALITY_LABELS[PREVIEW_QUALITY]}），首个画面用时 {request.first_frame_s:.1f} 秒；"
+                       f"{pending_label} 版本完成后自动替换")
+            _render_status(request.final_key, pending_label)
+
+    def submit_stream(self, scene_factory, quality=DEFAULT_QUALITY, **params):
+        """把动画提交到后台渲染队列，边渲染边输出 HLS 流（已缓存时不提交）
+
+        Returns:
+            AnimationRequest: 交给 show_stream 显示
+
+        Raises:
+            RenderQueueFull: 渲染队列已满
+        """
+        request = AnimationRequest(make_scene_key(scene_factory(**params), quality, manim.__version__), quality,
+                                   submitted_at=time.time())
+        if get_video(request.final_key) is not None:
+            return request
+        request.stream_key = f"{request.final_key}-stream"
+        request.stream_dir = str(stream_directory(request.stream_key))
+        job = get_render_queue().submit(request.stream_key, cache_video_job, request.final_key,
+                                        stream_animation_job, scene_factory, params, quality, request.stream_dir)
+        # 相同的流已在渲染时沿用其提交时间，首个分段用时从第一次提交算起
+        request.submitted_at = min(request.submitted_at, job.submitted_at)
+        return request
+
+    def show_stream(self, request):
+        """显示流式渲染的动画：第一个分段完成后开始播放，并显示首个分段的用时"""
+        if request.stream_key is None:
+            self.show_animation(request)
+            return
+        first_segment = first_segment_time(request.stream_dir)
+        if first_segment is None:
+            # 流目录过期删除后直接播放缓存的完整视频
+            video = get_video(request.final_key)
+            if video is not None:
+                st.video(video, format="video/mp4")
+            else:
+                _stream_status(request)
+            return
+        if request.first_frame_s is None:
+            request.first_frame_s = max(0.0, first_segment - request.submitted_at)
+        components.html(stream_player_html(stream_url(request.stream_dir)), height=STREAM_PLAYER_HEIGHT)
+        st.caption(f"{QUALITY_LABELS.get(request.quality, request.quality)} 流式播放，"
+                   f"首个分段用时 {request.first_frame_s:.1f} 秒")
 
     def show_function_animation(self, func_type="sin"):
-        """显示函数动画
+        """显示函数动画（在当前线程中渲染）
 
         Args:
             func_type: 函数类型，可选 "sin", "quadratic", "exponential"
         """
-        class FunctionScene(Scene):
-            def construct(self):
-                # 创建坐标轴
-                axes = Axes(
-                    x_range=[-3, 3, 1],
-                    y_range=[-2, 2, 1],
-                    axis_config={"color": BLUE},
-                )
-                
-                # 根据函数类型选择不同的函数
-                if func_type == "sin":
-                    graph = axes.plot(lambda x: np.sin(x), color=WHITE)
-                    label = MathTex(r"f(x)=\sin(x)")
-                elif func_type == "quadratic":
-                    graph = axes.plot(lambda x: x**2, color=WHITE)
-                    label = MathTex(r"f(x)=x^2")
-                else:  # exponential
-                    graph = axes.plot(lambda x: np.exp(x), color=WHITE)
-                    label = MathTex(r"f(x)=e^x")
-                
-                # 设置标签位置
-                label.to_corner(UR)
-                
-                # 创建动画
-                self.play(Create(axes))
-                self.play(Create(graph))
-                self.play(Write(label))
-                self.wait()
-
-        # 渲染场景并显示
-        video_path = self.render_scene(FunctionScene)
-        st.video(video_path)
+        st.video(self.render_scene(function_scene(func_type)), format="video/mp4")
 
     def show_geometry_animation(self, shape_type="square"):
-        """显示几何变换动画
+        """显示几何变换动画（在当前线程中渲染）
 
         Args:
             shape_type: 形状类型，可选 "square", "circle", "triangle"
         """
-        class GeometryScene(Scene):
-            def construct(self):
-                # 创建形状
-                if shape_type == "square":
-                    shape = Square(color=BLUE)
-                elif shape_type == "circle":
-                    shape = Circle(color=BLUE)
-                else:  # triangle
-                    shape = Triangle(color=BLUE)
-                
-                # 创建动画序列
-                self.play(Create(shape))
-                self.play(Rotate(shape, PI/2))
-                self.play(shape.animate.scale(2))
-                self.play(shape.animate.set_color(RED))
-                self.wait()
-
-        # 渲染场景并显示
-        video_path = self.render_scene(GeometryScene)
-        st.video(video_path)
+        st.video(self.render_scene(geometry_scene(shape_type)), format="video/mp4")
@@ -1,12 +1,9 @@
 import streamlit as st
 import matplotlib.pyplot as plt
 import numpy as np
-from ..utils.visualization import create_figure, setup_coordinate_system
+from ..utils.visualization import managed_figure, setup_coordinate_system
+from ..utils.image_output import emit_figure
 from ..utils.math_utils import calculate_regular_polygon_points
-from ..utils.plot_utils import configure_matplotlib_defaults
-
-# 配置matplotlib
-configure_matplotlib_defaults()
 
 def calculate_axis_limits(points, radius, margin_factor=1.5):
     """计算坐标轴的合适范围
@@ -41,8 +38,8 @@ def draw_polygon_component():
     
     # 创建一个居中的容器
     col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:  # 使用中间的列来显示图形
-        fig, ax = create_figure(figsize=(4, 4))  # 使用较小的图形尺寸
+    # 使用中间的列来显示图形，显示后释放图形
+    with col2, managed_figure(figsize=(4, 4)) as (fig, ax):  # 使用较小的图形尺寸
         
         # 计算并绘制多边形
         points = calculate_regular_polygon_points(n_sides, radius)
@@ -68,4 +65,4 @@ def draw_polygon_component():
             center_offset = radius * 0.1
             ax.text(center_offset, center_offset, 'O')
         
-        st.pyplot(fig)
+        emit_figure(fig, columns=2)
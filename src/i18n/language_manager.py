@@ -1,9 +1,18 @@
 """语言管理器"""
+import contextvars
+from contextlib import contextmanager
+
 import streamlit as st
 from .translations import TRANSLATIONS
 
+# 临时语言覆盖，用于在会话之外（如离线预渲染）按指定语言绘图
+_language_override = contextvars.ContextVar("language_override", default=None)
+
 def get_language():
     """获取当前语言"""
+    override = _language_override.get()
+    if override:
+        return override
     if 'language' not in st.session_state:
         st.session_state.language = 'zh'
     return st.session_state.language
@@ -12,6 +21,15 @@ def set_language(lang):
     """设置当前语言"""
     st.session_state.language = lang
 
+@contextmanager
+def use_language(lang):
+    """在当前上下文中临时使用指定语言，不修改会话状态"""
+    token = _language_override.set(lang)
+    try:
+        yield
+    finally:
+        _language_override.reset(token)
+
 def get_text(key):
     """获取指定key的翻译文本"""
     lang = get_language()
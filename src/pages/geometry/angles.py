@@ -1,11 +1,17 @@
 import streamlit as st
-from ...components.angle_drawer import draw_angle_component, draw_special_angles_component
+from ...components.angle_drawer import draw_angle, draw_angle_component, draw_special_angles_component
+from ...utils.geometry_scene import select_render_backend
 from ...i18n.language_manager import get_text, add_language_selector
 
+def get_prerender_grid():
+    """预渲染参数网格：角度滑块的全部取值（包含六个特殊角）"""
+    return [(draw_angle, {"angle_deg": angle}) for angle in range(-360, 361)]
+
 def show_angles_page():
     """角度页面"""
     # 添加语言选择器
     add_language_selector()
+    backend = select_render_backend("geometry_angles")
     
     st.title(get_text('angles_title'))
     
@@ -17,11 +23,11 @@ def show_angles_page():
     
     # 左列：角度探索器
     with col1:
-        draw_angle_component()
+        draw_angle_component(backend)
     
     # 右列：特殊角度展示
     with col2:
-        draw_special_angles_component()
+        draw_special_angles_component(backend)
     
     st.markdown("---")
     
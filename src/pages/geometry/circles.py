@@ -4,17 +4,16 @@
 
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
 from matplotlib.patches import Arc
 from src.utils.plot_utils import configure_matplotlib_defaults
+from src.utils.visualization import FigureTemplate, create_figure, get_template_figure
+from src.utils.geometry_scene import Scene, select_render_backend, show_geometry
 from src.i18n.language_manager import get_text, add_language_selector
 
-# 配置matplotlib并获取中文字体
-chinese_font = configure_matplotlib_defaults()
-
 def draw_circle_with_components(radius=2.0, show_components=True):
     """绘制带有各种组成部分的圆"""
-    fig, ax = plt.subplots(figsize=(8, 8))
+    chinese_font = configure_matplotlib_defaults()
+    fig, ax = create_figure(figsize=(8, 8))
     
     # 生成圆的点
     theta = np.linspace(0, 2*np.pi, 100)
@@ -54,34 +53,52 @@ def draw_circle_with_components(radius=2.0, show_components=True):
     ax.grid(True)
     ax.set_aspect('equal')
     
-    plt.close()
     return fig
 
-def draw_concentric_circles(radius1=2.0, radius2=1.0):
-    """绘制同心圆"""
-    fig, ax = plt.subplots(figsize=(8, 8))
-    
-    theta = np.linspace(0, 2*np.pi, 100)
+def circle_with_components_scene(radius=2.0, show_components=True):
+    """draw_circle_with_components 的几何场景（浏览器端渲染）"""
+    scene = Scene((-3, 3), (-3, 3), title=get_text("circle_basic_elements"))
+    scene.circle((0, 0), radius, color='blue', fill='blue', fill_opacity=0.1, label=get_text("circumference"))
     
-    # 绘制外圆
-    x1 = radius1 * np.cos(theta)
-    y1 = radius1 * np.sin(theta)
-    ax.plot(x1, y1, 'b-', label=f'{get_text("outer_circle")} (r={radius1})')
-    ax.fill(x1, y1, alpha=0.1, color='blue')
+    if show_components:
+        scene.polyline([[0, 0], [radius, 0]], color='red', dash='--', label=get_text("radius"))
+        scene.polyline([[-radius, 0], [radius, 0]], color='green', dash='--', label=get_text("diameter"))
+        angle = np.pi/3  # 60度
+        scene.polyline([[radius * np.cos(angle), radius * np.sin(angle)],
+                        [radius * np.cos(-angle), radius * np.sin(-angle)]],
+                       color='magenta', dash='--', label=get_text("chord"))
+        scene.polyline([[radius, 0], [radius+1, 0]], color='gold', label=get_text("tangent"))
+        scene.points([[0, 0]], color='black', label=get_text("center"))
+        theta = np.linspace(0, np.pi/4, 24)
+        scene.polyline(np.column_stack((radius * np.cos(theta), radius * np.sin(theta))),
+                       color='orange', label=get_text("arc"))
+    return scene
+
+# 圆周上的采样角
+CIRCLE_THETA = np.linspace(0, 2*np.pi, 100)
+
+def _circle_points(radius):
+    """半径为 radius 的圆周上的点"""
+    return radius * np.cos(CIRCLE_THETA), radius * np.sin(CIRCLE_THETA)
+
+def _build_concentric_circles():
+    """同心圆模板：创建坐标轴与各个圆、半径的占位对象"""
+    chinese_font = configure_matplotlib_defaults()
+    fig, ax = create_figure(figsize=(8, 8))
     
-    # 绘制内圆
-    x2 = radius2 * np.cos(theta)
-    y2 = radius2 * np.sin(theta)
-    ax.plot(x2, y2, 'r-', label=f'{get_text("inner_circle")} (r={radius2})')
-    ax.fill(x2, y2, alpha=0.1, color='red')
+    # 绘制外圆与内圆（数据由 _update_concentric_circles 填入）
+    outer, = ax.plot([], [], 'b-', label=get_text("outer_circle"))
+    outer_fill, = ax.fill([0], [0], alpha=0.1, color='blue')
+    inner, = ax.plot([], [], 'r-', label=get_text("inner_circle"))
+    inner_fill, = ax.fill([0], [0], alpha=0.1, color='red')
     
     # 绘制半径
-    ax.plot([0, radius1], [0, 0], 'b--', alpha=0.5)
-    ax.plot([0, radius2], [0, 0], 'r--', alpha=0.5)
+    outer_radius, = ax.plot([], [], 'b--', alpha=0.5)
+    inner_radius, = ax.plot([], [], 'r--', alpha=0.5)
     ax.plot([0], [0], 'ko', label=get_text("center"))
     
     ax.set_title(get_text("concentric_circles"), fontproperties=chinese_font)
-    ax.legend(prop=chinese_font)
+    legend = ax.legend(prop=chinese_font)
     
     ax.set_xlim(-6, 6)
     ax.set_ylim(-6, 6)
@@ -94,26 +111,56 @@ def draw_concentric_circles(radius1=2.0, radius2=1.0):
     ax.set_xlabel(get_text("x_axis"), fontproperties=chinese_font)
     ax.set_ylabel(get_text("y_axis"), fontproperties=chinese_font)
     
-    plt.close()
-    return fig
+    legend_texts = legend.get_texts()
+    return fig, (outer, outer_fill, inner, inner_fill, outer_radius, inner_radius,
+                 legend_texts[0], legend_texts[1])
 
-def draw_circle_calculator(radius=2.0):
-    """绘制用于计算的圆"""
-    fig, ax = plt.subplots(figsize=(8, 8))
-    
-    theta = np.linspace(0, 2*np.pi, 100)
-    x = radius * np.cos(theta)
-    y = radius * np.sin(theta)
+def _update_concentric_circles(artists, radius1=2.0, radius2=1.0):
+    """按两个半径更新同心圆模板"""
+    outer, outer_fill, inner, inner_fill, outer_radius, inner_radius, outer_label, inner_label = artists
+    for circle, fill, radius_line, label, key, radius in (
+        (outer, outer_fill, outer_radius, outer_label, "outer_circle", radius1),
+        (inner, inner_fill, inner_radius, inner_label, "inner_circle", radius2),
+    ):
+        x, y = _circle_points(radius)
+        circle.set_data(x, y)
+        fill.set_xy(np.column_stack((x, y)))
+        radius_line.set_data([0, radius], [0, 0])
+        label.set_text(f'{get_text(key)} (r={radius})')
+
+CONCENTRIC_CIRCLES = FigureTemplate("concentric_circles", _build_concentric_circles, _update_concentric_circles)
+
+def draw_concentric_circles(radius1=2.0, radius2=1.0):
+    """绘制同心圆（复用模板池中的图形，只更新数据）"""
+    return get_template_figure(CONCENTRIC_CIRCLES, radius1, radius2)
+
+def concentric_circles_scene(radius1=2.0, radius2=1.0):
+    """draw_concentric_circles 的几何场景（浏览器端渲染）"""
+    scene = Scene((-6, 6), (-6, 6), title=get_text("concentric_circles"),
+                  xlabel=get_text("x_axis"), ylabel=get_text("y_axis"))
+    scene.axis_lines()
+    for color, key, radius in (('blue', "outer_circle", radius1), ('red', "inner_circle", radius2)):
+        scene.circle((0, 0), radius, color=color, fill=color, fill_opacity=0.1,
+                     label=f'{get_text(key)} (r={radius})')
+        scene.polyline([[0, 0], [radius, 0]], color=color, dash='--', opacity=0.5)
+    scene.points([[0, 0]], color='black', label=get_text("center"))
+    return scene
+
+def _build_circle_calculator():
+    """圆的计算模板：创建坐标轴与圆、半径、标注的占位对象"""
+    chinese_font = configure_matplotlib_defaults()
+    fig, ax = create_figure(figsize=(8, 8))
     
-    ax.plot(x, y, 'b-')
-    ax.fill(x, y, alpha=0.1, color='blue')
+    # 绘制圆（数据由 _update_circle_calculator 填入）
+    circle, = ax.plot([], [], 'b-')
+    disk, = ax.fill([0], [0], alpha=0.1, color='blue')
     
     # 绘制半径
-    ax.plot([0, radius], [0, 0], 'r--', label=get_text("radius"))
+    radius_line, = ax.plot([], [], 'r--', label=get_text("radius"))
     ax.plot([0], [0], 'ko', label=get_text("center"))
     
     # 添加标注
-    ax.annotate(f'{get_text("radius")} = {radius}', xy=(radius/2, 0.2), fontproperties=chinese_font)
+    annotation = ax.annotate('', xy=(0, 0), fontproperties=chinese_font)
     
     ax.set_title(get_text("circle_calculations"), fontproperties=chinese_font)
     ax.legend(prop=chinese_font)
@@ -129,8 +176,35 @@ def draw_circle_calculator(radius=2.0):
     ax.set_xlabel(get_text("x_axis"), fontproperties=chinese_font)
     ax.set_ylabel(get_text("y_axis"), fontproperties=chinese_font)
     
-    plt.close()
-    return fig
+    return fig, (circle, disk, radius_line, annotation)
+
+def _update_circle_calculator(artists, radius=2.0):
+    """按半径更新圆的计算模板"""
+    circle, disk, radius_line, annotation = artists
+    x, y = _circle_points(radius)
+    circle.set_data(x, y)
+    disk.set_xy(np.column_stack((x, y)))
+    radius_line.set_data([0, radius], [0, 0])
+    annotation.set_text(f'{get_text("radius")} = {radius}')
+    annotation.xy = (radius/2, 0.2)
+    annotation.set_position(annotation.xy)
+
+CIRCLE_CALCULATOR = FigureTemplate("circle_calculator", _build_circle_calculator, _update_circle_calculator)
+
+def draw_circle_calculator(radius=2.0):
+    """绘制用于计算的圆（复用模板池中的图形，只更新数据）"""
+    return get_template_figure(CIRCLE_CALCULATOR, radius)
+
+def circle_calculator_scene(radius=2.0):
+    """draw_circle_calculator 的几何场景（浏览器端渲染）"""
+    scene = Scene((-3, 3), (-3, 3), title=get_text("circle_calculations"),
+                  xlabel=get_text("x_axis"), ylabel=get_text("y_axis"))
+    scene.axis_lines()
+    scene.circle((0, 0), radius, color='blue', fill='blue', fill_opacity=0.1)
+    scene.polyline([[0, 0], [radius, 0]], color='red', dash='--', label=get_text("radius"))
+    scene.points([[0, 0]], color='black', label=get_text("center"))
+    scene.text(radius/2, 0.2, f'{get_text("radius")} = {radius}')
+    return scene
 
 def calculate_polygon_properties(n_sides, radius=1, inscribed=True):
     """计算正多边形的顶点、周长和直径"""
@@ -151,10 +225,22 @@ def calculate_polygon_properties(n_sides, radius=1, inscribed=True):
     
     return vertices, perimeter, diagonal
 
+def get_prerender_grid():
+    """预渲染参数网格：与各标签页控件的取值范围一致"""
+    grid = [(draw_circle_with_components, {"show_components": flag}) for flag in (True, False)]
+    # 同心圆：外圆 0.5~5.0，内圆 0.1~外圆-0.1，步长 0.1
+    for i in range(5, 51):
+        for j in range(1, i):
+            grid.append((draw_concentric_circles, {"radius1": round(i * 0.1, 1), "radius2": round(j * 0.1, 1)}))
+    # 圆的计算：半径 0.1~10.0，步长 0.1
+    grid.extend((draw_circle_calculator, {"radius": round(i * 0.1, 1)}) for i in range(1, 101))
+    return grid
+
 def show_circles_page():
     """显示圆的页面"""
     # 添加语言选择器
     add_language_selector()
+    backend = select_render_backend("geometry_circles")
     
     st.title(get_text("circles_title"))
     
@@ -183,8 +269,8 @@ def show_circles_page():
         """)
         
         show_components = st.checkbox(get_text("show_components"), value=True)
-        fig = draw_circle_with_components(show_components=show_components)
-        st.pyplot(fig)
+        show_geometry(draw_circle_with_components, circle_with_components_scene,
+                      show_components=show_components, backend=backend)
     
     # 标签页2：圆的性质
     with tab2:
@@ -252,8 +338,7 @@ def show_circles_page():
         ring_area = area1 - area2
         st.success(f"{get_text('ring_area')}: {ring_area:.2f}")
         
-        fig = draw_concentric_circles(radius1, radius2)
-        st.pyplot(fig)
+        show_geometry(draw_concentric_circles, concentric_circles_scene, radius1, radius2, backend=backend)
     
     # 标签页4：圆的计算
     with tab4:
@@ -289,8 +374,7 @@ def show_circles_page():
         st.latex(r"C = 2\pi r")
         st.latex(r"d = 2r")
         
-        fig = draw_circle_calculator(radius)
-        st.pyplot(fig)
+        show_geometry(draw_circle_calculator, circle_calculator_scene, radius, backend=backend)
     
     # 标签页5：圆周率 π
     with tab5:
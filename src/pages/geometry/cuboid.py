@@ -3,13 +3,11 @@
 """
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 from src.utils.plot_utils import configure_matplotlib_defaults
-
-# 配置matplotlib并获取中文字体
-chinese_font = configure_matplotlib_defaults()
+from src.utils.visualization import managed_figure
+from src.utils.image_output import emit_figure
 
 def create_cuboid_vertices(length=1, width=1, height=1):
     """创建长方体的顶点坐标"""
@@ -85,6 +83,7 @@ def rotate_vertices(vertices, angles):
 
 def plot_cuboid(fig, ax, vertices, faces, colors):
     """绘制长方体"""
+    chinese_font = configure_matplotlib_defaults()
     # 清除当前图形
     ax.clear()
     
@@ -131,25 +130,24 @@ def show_cuboid_page():
     y_angle = st.sidebar.slider("绕Y轴旋转", -180, 180, 0, 5, key="geometry_cuboid_rotate_y")
     z_angle = st.sidebar.slider("绕Z轴旋转", -180, 180, 0, 5, key="geometry_cuboid_rotate_z")
     
-    # 创建图形
-    fig = plt.figure(figsize=(10, 10))
-    ax = fig.add_subplot(111, projection='3d')
+    # 创建图形，显示后释放
+    with managed_figure(figsize=(10, 10), subplot_kw={'projection': '3d'}) as (fig, ax):
     
-    # 创建长方体的顶点和面
-    vertices = create_cuboid_vertices(length, width, height)
-    faces = create_cuboid_faces()
+        # 创建长方体的顶点和面
+        vertices = create_cuboid_vertices(length, width, height)
+        faces = create_cuboid_faces()
     
-    # 应用旋转
-    rotated_vertices = rotate_vertices(vertices, (x_angle, y_angle, z_angle))
+        # 应用旋转
+        rotated_vertices = rotate_vertices(vertices, (x_angle, y_angle, z_angle))
     
-    # 定义每个面的颜色
-    colors = ['#FF9999', '#66B2FF', '#99FF99', '#FFCC99', '#FF99CC', '#99CCFF']
+        # 定义每个面的颜色
+        colors = ['#FF9999', '#66B2FF', '#99FF99', '#FFCC99', '#FF99CC', '#99CCFF']
     
-    # 绘制长方体
-    plot_cuboid(fig, ax, rotated_vertices, faces, colors)
+        # 绘制长方体
+        plot_cuboid(fig, ax, rotated_vertices, faces, colors)
     
-    # 显示图形
-    st.pyplot(fig)
+        # 显示图形
+        emit_figure(fig)
     
     # 添加说明
     st.markdown("""
@@ -3,30 +3,56 @@
 """
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle, Circle
-import plotly.graph_objects as go
+from src.utils.geometry_scene import Scene, select_render_backend, show_geometry
+from src.utils.visualization import FigureTemplate, create_figure, get_template_figure
+from src.utils.image_output import displayed_in_columns
 
-def draw_curtain_model(scale_factor=1.0, direction='vertical', shape='rectangle'):
-    """
-    绘制窗帘模型的高级版本
-    
-    Args:
-        scale_factor (float): 缩放因子
-        direction (str): 变换方向 'vertical' 或 'horizontal'
-        shape (str): 形状类型 'rectangle' 或 'circle'
-    """
-    fig, ax = plt.subplots(figsize=(10, 8))
+# 网格大小与基础形状（左下角、宽、高）
+CURTAIN_GRID_SIZE = 6
+CURTAIN_BASE = (2, 2, 2, 2)
+
+def _build_curtain_model():
+    """窗帘模型模板：网格与坐标轴为静态部分，矩形、圆与标题随参数变化"""
+    fig, ax = create_figure(figsize=(10, 8))
     
     # 绘制网格
-    grid_size = 6
+    grid_size = CURTAIN_GRID_SIZE
     for i in range(grid_size + 1):
         ax.plot([i, i], [0, grid_size], 'gray', alpha=0.2, linewidth=0.5)
         ax.plot([0, grid_size], [i, i], 'gray', alpha=0.2, linewidth=0.5)
     
-    # 设置基础形状
-    base_x, base_y = 2, 2
-    base_width, base_height = 2, 2
+    # 两种形状都预先创建，按参数切换显示（尺寸由 _update_curtain_model 填入）
+    base_x, base_y, base_width, base_height = CURTAIN_BASE
+    rect = Rectangle(
+        (base_x, base_y), 
+        base_width, base_height, 
+        facecolor='lightblue', 
+        edgecolor='blue', 
+        alpha=0.5
+    )
+    ax.add_patch(rect)
+    circle = Circle(
+        (base_x + base_width/2, base_y + base_height/2), 
+        base_width / 2, 
+        facecolor='lightgreen', 
+        edgecolor='green', 
+        alpha=0.5
+    )
+    ax.add_patch(circle)
+    
+    # 设置坐标轴
+    ax.set_xlim(-0.5, grid_size + 0.5)
+    ax.set_ylim(-0.5, grid_size + 0.5)
+    ax.set_aspect('equal')
+    ax.set_title(" ")
+    
+    return fig, (rect, circle, ax.title)
+
+def _update_curtain_model(artists, scale_factor=1.0, direction='vertical', shape='rectangle'):
+    """按缩放因子、方向与形状更新窗帘模型模板"""
+    rect, circle, title = artists
+    _, _, base_width, base_height = CURTAIN_BASE
     
     # 根据缩放方向和形状调整
     if direction == 'vertical':
@@ -36,45 +62,67 @@ def draw_curtain_model(scale_factor=1.0, direction='vertical', shape='rectangle'
         draw_height = base_height
         draw_width = base_width * scale_factor
     
-    # 绘制形状
     if shape == 'rectangle':
-        rect = Rectangle(
-            (base_x, base_y), 
-            draw_width, draw_height, 
-            facecolor='lightblue', 
-            edgecolor='blue', 
-            alpha=0.5
-        )
-        ax.add_patch(rect)
+        rect.set_width(draw_width)
+        rect.set_height(draw_height)
     else:  # circle
         # 计算圆的半径
         if direction == 'vertical':
-            radius = base_height * scale_factor / 2
+            circle.set_radius(base_height * scale_factor / 2)
         else:
-            radius = base_width * scale_factor / 2
-        
-        circle = Circle(
-            (base_x + base_width/2, base_y + base_height/2), 
-            radius, 
-            facecolor='lightgreen', 
-            edgecolor='green', 
-            alpha=0.5
-        )
-        ax.add_patch(circle)
-    
-    # 设置坐标轴
-    ax.set_xlim(-0.5, grid_size + 0.5)
-    ax.set_ylim(-0.5, grid_size + 0.5)
-    ax.set_aspect('equal')
+            circle.set_radius(base_width * scale_factor / 2)
+    rect.set_visible(shape == 'rectangle')
+    circle.set_visible(shape != 'rectangle')
     
     # 添加标题和说明
     transform_type = "垂直" if direction == 'vertical' else "水平"
-    plt.title(f"{transform_type}方向{shape}伸缩变换 (k = {scale_factor:.2f})")
+    title.set_text(f"{transform_type}方向{shape}伸缩变换 (k = {scale_factor:.2f})")
+
+CURTAIN_MODEL = FigureTemplate("curtain_model", _build_curtain_model, _update_curtain_model, blit=True)
+
+@displayed_in_columns(3)
+def draw_curtain_model(scale_factor=1.0, direction='vertical', shape='rectangle'):
+    """
+    绘制窗帘模型的高级版本
+    
+    三个滑块共用同一个模板图形，渲染时只重绘形状与标题。
     
-    return fig
+    Args:
+        scale_factor (float): 缩放因子
+        direction (str): 变换方向 'vertical' 或 'horizontal'
+        shape (str): 形状类型 'rectangle' 或 'circle'
+    """
+    return get_template_figure(CURTAIN_MODEL, scale_factor, direction, shape)
+
+def curtain_model_scene(scale_factor=1.0, direction='vertical', shape='rectangle'):
+    """draw_curtain_model 的几何场景（浏览器端渲染）"""
+    grid_size = CURTAIN_GRID_SIZE
+    transform_type = "垂直" if direction == 'vertical' else "水平"
+    scene = Scene((-0.5, grid_size + 0.5), (-0.5, grid_size + 0.5),
+                  title=f"{transform_type}方向{shape}伸缩变换 (k = {scale_factor:.2f})", grid=False)
+    for i in range(grid_size + 1):
+        scene.polyline([[i, 0], [i, grid_size]], color='gray', opacity=0.2, width=0.5)
+        scene.polyline([[0, i], [grid_size, i]], color='gray', opacity=0.2, width=0.5)
+    
+    base_x, base_y, base_width, base_height = CURTAIN_BASE
+    if shape == 'rectangle':
+        width, height = base_width, base_height
+        if direction == 'vertical':
+            height *= scale_factor
+        else:
+            width *= scale_factor
+        scene.polyline([[base_x, base_y], [base_x + width, base_y],
+                        [base_x + width, base_y + height], [base_x, base_y + height]],
+                       color='blue', fill='lightblue', fill_opacity=1.0, opacity=0.5, closed=True)
+    else:
+        base = base_height if direction == 'vertical' else base_width
+        scene.circle((base_x + base_width/2, base_y + base_height/2), base * scale_factor / 2,
+                     color='green', fill='lightgreen', fill_opacity=1.0, opacity=0.5)
+    return scene
 
 def render_curtain_page():
     """渲染窗帘模型页面的高级版本"""
+    backend = select_render_backend("geometry_curtain")
     st.title("窗帘模型：几何变换与伸缩")
     
     # 数学公式展示
@@ -98,8 +146,8 @@ def render_curtain_page():
             value=1.0,
             key="vertical_rect"
         )
-        fig_v_rect = draw_curtain_model(vertical_scale, 'vertical', 'rectangle')
-        st.pyplot(fig_v_rect)
+        show_geometry(draw_curtain_model, curtain_model_scene, vertical_scale, 'vertical', 'rectangle',
+                      backend=backend, width=260)
     
     with col2:
         st.subheader("水平方向-矩形")
@@ -110,8 +158,8 @@ def render_curtain_page():
             value=1.0,
             key="horizontal_rect"
         )
-        fig_h_rect = draw_curtain_model(horizontal_scale, 'horizontal', 'rectangle')
-        st.pyplot(fig_h_rect)
+        show_geometry(draw_curtain_model, curtain_model_scene, horizontal_scale, 'horizontal', 'rectangle',
+                      backend=backend, width=260)
     
     with col3:
         st.subheader("圆形伸缩")
@@ -122,8 +170,8 @@ def render_curtain_page():
             value=1.0,
             key="circle_scale"
         )
-        fig_circle = draw_curtain_model(circle_scale, 'vertical', 'circle')
-        st.pyplot(fig_circle)
+        show_geometry(draw_curtain_model, curtain_model_scene, circle_scale, 'vertical', 'circle',
+                      backend=backend, width=260)
     
     # 交互式解释区域
     st.markdown(r"""
@@ -196,5 +244,3 @@ def render_curtain_page_with_quiz():
     
     if st.checkbox("开始测验"):
         interactive_quiz()
-
-render_curtain_page_with_quiz()
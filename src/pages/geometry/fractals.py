@@ -1,154 +1,566 @@
 """
 分形图形的可视化页面
 """
+import html
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection, PolyCollection
 from src.utils.plot_utils import configure_matplotlib_defaults
+from src.utils.visualization import create_figure
+from src.utils.figure_cache import show_figure
+from src.utils.image_output import resolve_dpi
+from src.utils.static_files import MAX_STATIC_FILE_BYTES, static_url, task_directory
+from src.utils.fractal_engine import IFS_SYSTEMS, ifs_density, ifs_points, render_escape_time
+from src.components.fractal_zoom_viewer import show_fractal_zoom_viewer
+
+# 分形类型：显示名称 -> 内部标识
+FRACTAL_TYPES = {
+    "科赫雪花": "koch",
+    "谢尔宾斯基三角形": "sierpinski",
+    "谢尔宾斯基三角形（点云）": "sierpinski_points",
+    "曼德博集合": "mandelbrot",
+    "朱利亚集合": "julia",
+    "巴恩斯利蕨": "fern",
+    "龙曲线": "dragon",
+    "莱维C曲线": "levy",
+}
+
+# 逃逸时间分形的默认视口 (xmin, xmax, ymin, ymax)
+ESCAPE_TIME_VIEWS = {
+    "mandelbrot": (-2.25, 0.75, -1.5, 1.5),
+    "julia": (-1.6, 1.6, -1.6, 1.6),
+}
+
+# 逃逸时间图像与 IFS 密度图的分辨率（像素）
+ENGINE_RESOLUTION = 800
+
+# 各分形递归深度的硬上限；滑块的上限另按 LOD 取能改变输出图像的最大深度（见 order_limit）
+MAX_ORDER = {
+    "koch": 10,
+    "sierpinski": 12,
+    "sierpinski_points": 16,
+}
+
+# 点云模式的采样点数
+CHAOS_GAME_POINTS = 200_000
+
+# 流式生成的默认块大小（线段或三角形个数）
+STREAM_CHUNK_SIZE = 65536
+
+# 数据导出允许的最大递归深度（二进制：科赫 10 级约 50 MB，谢尔宾斯基 13 级约 38 MB）
+EXPORT_MAX_ORDER = {
+    "koch": 10,
+    "sierpinski": 13,
+}
+
+# CSV 每行的文本约为二进制的 4 倍，上限各低一级（约 50 MB）
+EXPORT_MAX_ORDER_CSV = {
+    "koch": 9,
+    "sierpinski": 12,
+}
+
+# 导出文件放在 static/exports/ 中由静态文件服务提供下载，超过保留时间后删除
+EXPORT_CATEGORY = "exports"
+EXPORT_RETENTION_S = 3600
+
+# 分形画布大小（英寸）
+FIGURE_SIZE = (10, 10)
+
+# 细节层次（LOD）：最小特征小于该像素数时不再细分
+LOD_MIN_PIXELS = 1.0
+
+# 每细分一级，最小特征（线段或三角形边长）缩小的倍数
+_LOD_SHRINK = {
+    "koch": 3,
+    "sierpinski": 2,
+    "sierpinski_points": 2,
+}
 
-# 配置matplotlib并获取中文字体
-chinese_font = configure_matplotlib_defaults()
+# 逆时针旋转60°的矩阵，即乘以 exp(i*pi/3)
+_ROT60 = np.array([
+    [0.5, -np.sqrt(3) / 2],
+    [np.sqrt(3) / 2, 0.5]
+])
+
+def _koch_fill(points, stride):
+    """在间隔为 stride 的已有顶点之间原地插入下一级的三个新顶点
+
+    points[::stride] 是上一级折线的顶点，每条线段 (start, end) 被替换为
+    start -> p1 -> p_top -> p2 -> end，新顶点写入间隔为 stride/4 的位置。
+    """
+    step = stride // 4
+    start = points[0:-1:stride]
+    end = points[stride::stride]
+    
+    # 计算三等分点
+    third = (end - start) / 3
+    p1 = start + third
+    points[step::stride] = p1
+    # 将中间三分之一逆时针旋转60°得到凸起的顶点
+    points[2*step::stride] = p1 + third @ _ROT60.T
+    points[3*step::stride] = p1 + third
 
 def koch_snowflake(order, size=1):
     """生成科赫雪花的顶点
     
+    逐级生成：预先分配最终的 (3·4^order+1, 2) 数组，初始三角形的顶点
+    放在间隔为 4^order 的位置，每一级用一次批量运算填充新顶点。
+    
     Args:
         order: 递归深度
         size: 初始三角形的大小
     
     Returns:
-        vertices: 所有线段的顶点坐标
+        vertices: 闭合折线的顶点坐标，形状为 (3·4^order+1, 2)
     """
-    def koch_curve(start, end, order):
-        if order == 0:
-            return [start, end]
-        
-        # 计算三等分点
-        vec = end - start
-        p1 = start + vec / 3
-        p2 = start + 2 * vec / 3
-        
-        # 计算顶点
-        # 使用复数进行旋转计算
-        zv = complex(vec[0], vec[1])
-        rot = zv * (0.5 + 0.8660254037844386j)  # exp(i*pi/3)
-        p_top = p1 + np.array([rot.real, rot.imag]) / 3
-        
-        # 递归生成每个部分
-        points = []
-        points.extend(koch_curve(start, p1, order-1))
-        points.extend(koch_curve(p1, p_top, order-1))
-        points.extend(koch_curve(p_top, p2, order-1))
-        points.extend(koch_curve(p2, end, order-1))
-        
-        return points
-    
-    # 创建初始等边三角形的顶点
+    # 创建初始等边三角形的顶点（首尾相接）
     height = size * np.sqrt(3) / 2
     vertices = np.array([
+        [-size/2, -height/3],
+        [size/2, -height/3],
+        [0, height*2/3],
+        [-size/2, -height/3]
+    ])
+    
+    stride = 4 ** order
+    points = np.empty((3 * stride + 1, 2))
+    points[::stride] = vertices
+    
+    # 逐级细分
+    while stride > 1:
+        _koch_fill(points, stride)
+        stride //= 4
+    
+    return points
+
+def _sierpinski_base(size):
+    """初始等边三角形的顶点"""
+    height = size * np.sqrt(3) / 2
+    return np.array([
         [-size/2, -height/3],
         [size/2, -height/3],
         [0, height*2/3]
     ])
+
+def _sierpinski_refine(triangles):
+    """把每个三角形替换为三个角上的子三角形，(m, 3, 2) -> (3m, 3, 2)
+
+    子三角形的顺序与原递归实现一致：第 i 个三角形的子三角形位于 3i、3i+1、3i+2。
+    """
+    v0, v1, v2 = triangles[:, 0], triangles[:, 1], triangles[:, 2]
     
-    # 生成三条边的科赫曲线
-    points = []
-    for i in range(3):
-        start = vertices[i]
-        end = vertices[(i+1)%3]
-        points.extend(koch_curve(start, end, order))
+    # 计算三角形的中点
+    m01 = (v0 + v1) / 2
+    m12 = (v1 + v2) / 2
+    m20 = (v2 + v0) / 2
     
-    return np.array(points)
+    children = np.stack([
+        np.stack([v0, m01, m20], axis=1),
+        np.stack([m01, v1, m12], axis=1),
+        np.stack([m20, m12, v2], axis=1)
+    ], axis=1)
+    return children.reshape(-1, 3, 2)
 
 def sierpinski_triangle(order, size=1):
     """生成谢尔宾斯基三角形的顶点
     
+    逐级生成，每一级对全部三角形做一次批量中点细分，共 order 步。
+    
     Args:
         order: 递归深度
         size: 初始三角形的大小
     
     Returns:
-        triangles: 所有三角形的顶点坐标
+        triangles: 所有三角形的顶点坐标，形状为 (3^order, 3, 2)
     """
-    def create_triangles(vertices, order):
-        if order == 0:
-            return [vertices]
-        
-        # 计算三角形的中点
-        mid_points = [
-            (vertices[0] + vertices[1]) / 2,
-            (vertices[1] + vertices[2]) / 2,
-            (vertices[2] + vertices[0]) / 2
-        ]
-        
-        # 递归生成三个新的三角形
-        triangles = []
-        triangles.extend(create_triangles([vertices[0], mid_points[0], mid_points[2]], order-1))
-        triangles.extend(create_triangles([mid_points[0], vertices[1], mid_points[1]], order-1))
-        triangles.extend(create_triangles([mid_points[2], mid_points[1], vertices[2]], order-1))
-        
-        return triangles
+    triangles = _sierpinski_base(size)[np.newaxis]
+    for _ in range(order):
+        triangles = _sierpinski_refine(triangles)
+    return triangles
+
+def koch_refine(points):
+    """在上一级科赫折线的基础上细分一级，(m+1, 2) -> (4m+1, 2)"""
+    refined = np.empty((4 * (len(points) - 1) + 1, 2))
+    refined[::4] = points
+    _koch_fill(refined, 4)
+    return refined
+
+class FractalLevelCache:
+    """按级缓存单位尺寸的分形几何
+
+    - 提高一级：在已缓存的最高一级上做一次细分
+    - 降低一级：直接读取已缓存的级别
+    - 改变大小：对单位尺寸的几何做一次缩放，不重新生成
+
+    缓存为进程级共享，所有会话和重新运行都可复用。
+    """
+
+    def __init__(self, base, refine):
+        """
+        Args:
+            base: 第0级的单位尺寸几何
+            refine: 由第 k 级生成第 k+1 级的函数
+        """
+        self._levels = [base]
+        self._refine = refine
+        self._lock = threading.Lock()
+
+    def get(self, order, size=1):
+        """获取指定级别、指定大小的几何（返回新数组，可安全修改）"""
+        with self._lock:
+            while len(self._levels) <= order:
+                self._levels.append(self._refine(self._levels[-1]))
+            level = self._levels[order]
+        return level * size
+
+    @property
+    def cached_orders(self):
+        """已缓存的最高级别"""
+        return len(self._levels) - 1
+
+    def clear(self):
+        """只保留第0级"""
+        with self._lock:
+            del self._levels[1:]
+
+# 各分形类型的逐级缓存（点云模式每次直接采样，不经过逐级缓存）
+_level_caches = {
+    "koch": FractalLevelCache(koch_snowflake(0), koch_refine),
+    "sierpinski": FractalLevelCache(sierpinski_triangle(0), _sierpinski_refine),
+}
+
+def get_fractal_geometry(fractal_type, order, size=1):
+    """从逐级缓存获取科赫雪花或谢尔宾斯基三角形的几何"""
+    return _level_caches[fractal_type].get(order, size)
+
+def sierpinski_chaos_game(order, size=1, n_points=CHAOS_GAME_POINTS, seed=0):
+    """用迭代函数系统（混沌游戏）生成谢尔宾斯基三角形的点云
     
-    # 创建初始等边三角形的顶点
-    height = size * np.sqrt(3) / 2
-    initial_vertices = np.array([
-        [-size/2, -height/3],
-        [size/2, -height/3],
-        [0, height*2/3]
-    ])
+    先在初始三角形内均匀取点，再对每个点随机施加 order 次
+    "向某个顶点收缩一半" 的变换，所得点云均匀覆盖第 order 级的全部三角形。
+    所需内存只与点数有关，与递归深度无关。
+    
+    Args:
+        order: 递归深度
+        size: 初始三角形的大小
+        n_points: 点数
+        seed: 随机种子，固定种子保证结果可复现（便于缓存）
     
-    return create_triangles(initial_vertices, order)
+    Returns:
+        points: 点坐标，形状为 (n_points, 2)
+    """
+    rng = np.random.default_rng(seed)
+    vertices = _sierpinski_base(size)
+    
+    # 在初始三角形内均匀采样（重心坐标）
+    u, v = rng.random((2, n_points))
+    outside = u + v > 1
+    u[outside], v[outside] = 1 - u[outside], 1 - v[outside]
+    edge1 = vertices[1] - vertices[0]
+    edge2 = vertices[2] - vertices[0]
+    x = vertices[0, 0] + u * edge1[0] + v * edge2[0]
+    y = vertices[0, 1] + u * edge1[1] + v * edge2[1]
+    
+    # 每个点每一步随机选择一个顶点，向它收缩一半（原地运算）
+    vx, vy = vertices[:, 0], vertices[:, 1]
+    for choice in rng.integers(0, 3, (order, n_points), dtype=np.uint8):
+        x += vx[choice]
+        x *= 0.5
+        y += vy[choice]
+        y *= 0.5
+    return np.column_stack((x, y))
+
+# 科赫曲线在单位线段 [0, 1] 上的四个相似变换 z -> c + w·z（复数表示）
+_KOCH_OFFSETS = np.array([0, 1/3, 1/3 + np.exp(1j*np.pi/3)/3, 2/3])
+_KOCH_SCALES = np.array([1/3, np.exp(1j*np.pi/3)/3, np.exp(-1j*np.pi/3)/3, 1/3])
+
+def iter_koch_segments(order, size=1, chunk_size=STREAM_CHUNK_SIZE):
+    """按遍历顺序分块生成科赫雪花的线段
+
+    第 i 条线段由其序号的四进制各位决定：每一位选择一个相似变换，
+    从最低位（最内层）开始依次作用在单位线段上，再映射到所在的初始边。
+    每块独立计算，内存占用只与块大小有关。
+
+    Args:
+        order: 递归深度
+        size: 初始三角形的大小
+        chunk_size: 每块的线段数
+
+    Yields:
+        numpy.ndarray: 形状为 (k, 2, 2) 的线段块，[起点, 终点]
+    """
+    corners = koch_snowflake(0, size)
+    corners = corners[:, 0] + 1j * corners[:, 1]
+    per_edge = 4 ** order
+    total = 3 * per_edge
+    for start in range(0, total, chunk_size):
+        index = np.arange(start, min(start + chunk_size, total))
+        edge, local = np.divmod(index, per_edge)
+        z0 = np.zeros(len(index), dtype=complex)
+        z1 = np.ones(len(index), dtype=complex)
+        for _ in range(order):
+            local, digit = np.divmod(local, 4)
+            z0 = _KOCH_OFFSETS[digit] + _KOCH_SCALES[digit] * z0
+            z1 = _KOCH_OFFSETS[digit] + _KOCH_SCALES[digit] * z1
+        origin = corners[edge]
+        direction = corners[edge + 1] - origin
+        p0 = origin + direction * z0
+        p1 = origin + direction * z1
+        yield np.stack([
+            np.column_stack((p0.real, p0.imag)),
+            np.column_stack((p1.real, p1.imag))
+        ], axis=1)
+
+def iter_sierpinski_triangles(order, size=1, chunk_size=STREAM_CHUNK_SIZE):
+    """按遍历顺序分块生成谢尔宾斯基三角形
+
+    第 i 个三角形由其序号的三进制各位决定：每一位选择一个
+    "向对应顶点收缩一半" 的变换，从最低位开始依次作用在初始三角形上。
+
+    Args:
+        order: 递归深度
+        size: 初始三角形的大小
+        chunk_size: 每块的三角形数
+
+    Yields:
+        numpy.ndarray: 形状为 (k, 3, 2) 的三角形块
+    """
+    vertices = _sierpinski_base(size)
+    total = 3 ** order
+    for start in range(0, total, chunk_size):
+        local = np.arange(start, min(start + chunk_size, total))
+        triangles = np.broadcast_to(vertices, (len(local), 3, 2)).copy()
+        for _ in range(order):
+            local, digit = np.divmod(local, 3)
+            triangles += vertices[digit][:, np.newaxis, :]
+            triangles *= 0.5
+        yield triangles
 
 def plot_koch_snowflake(ax, points):
     """绘制科赫雪花"""
+    chinese_font = configure_matplotlib_defaults()
     ax.plot(points[:, 0], points[:, 1], 'b-', linewidth=1)
     ax.set_aspect('equal')
     ax.axis('off')
     ax.set_title('科赫雪花', fontproperties=chinese_font)
 
 def plot_sierpinski_triangle(ax, triangles):
-    """绘制谢尔宾斯基三角形"""
-    for triangle in triangles:
-        # 闭合三角形
-        tri = np.vstack([triangle, triangle[0]])
-        ax.plot(tri[:, 0], tri[:, 1], 'b-', linewidth=1)
+    """绘制谢尔宾斯基三角形（全部三角形放在同一个 PolyCollection 中）"""
+    chinese_font = configure_matplotlib_defaults()
+    collection = PolyCollection(triangles, closed=True, facecolors='none',
+                                edgecolors='b', linewidths=1)
+    ax.add_collection(collection)
+    ax.autoscale_view()
     ax.set_aspect('equal')
     ax.axis('off')
     ax.set_title('谢尔宾斯基三角形', fontproperties=chinese_font)
 
-def show_fractals_page():
-    """显示分形图形页面"""
-    st.title("分形图形")
-    
-    # 添加分形简介
-    st.markdown("""
-    ### 什么是分形？
-    分形是一种具有自相似性的图形，即局部和整体具有相似的形状。在数学中，分形通常具有以下特征：
-    1. 自相似性：图形的局部和整体形状相似
-    2. 无限细节：无论放大多少倍，都能看到类似的结构
-    3. 分数维：不同于普通的整数维度
-    
-    下面展示了两个经典的分形图形：科赫雪花和谢尔宾斯基三角形。
-    """)
+def plot_sierpinski_points(ax, points):
+    """以点云形式绘制谢尔宾斯基三角形"""
+    chinese_font = configure_matplotlib_defaults()
+    ax.plot(points[:, 0], points[:, 1], ',', color='b')
+    ax.set_aspect('equal')
+    ax.axis('off')
+    ax.set_title('谢尔宾斯基三角形', fontproperties=chinese_font)
+
+def add_chunks_to_axes(ax, chunks, color='b', linewidth=1):
+    """把流式生成的线段块或三角形块逐块加入坐标轴
+
+    每块对应一个集合对象，绘制时不需要把全部几何拼接成一个数组。
+
+    Args:
+        ax: Matplotlib坐标轴
+        chunks: iter_koch_segments 或 iter_sierpinski_triangles 的输出
+    """
+    for chunk in chunks:
+        if chunk.shape[1] == 2:
+            collection = LineCollection(chunk, colors=color, linewidths=linewidth)
+        else:
+            collection = PolyCollection(chunk, closed=True, facecolors='none',
+                                        edgecolors=color, linewidths=linewidth)
+        ax.add_collection(collection)
+    ax.autoscale_view()
+
+def write_chunks(chunks, fileobj, fmt="bin"):
+    """把流式生成的几何逐块写入文件
+
+    Args:
+        chunks: iter_koch_segments 或 iter_sierpinski_triangles 的输出
+        fileobj: 以二进制模式打开的文件对象
+        fmt: "bin" 为小端 float32 原始数据（每行一个线段/三角形的全部坐标），
+             "csv" 为带表头的文本
+
+    Returns:
+        int: 写入的线段/三角形个数
+    """
+    count = 0
+    for i, chunk in enumerate(chunks):
+        rows = chunk.reshape(len(chunk), -1)
+        if fmt == "csv":
+            if i == 0:
+                n_points = rows.shape[1] // 2
+                header = ",".join(f"x{k},y{k}" for k in range(n_points))
+                fileobj.write((header + "\n").encode("utf-8"))
+            np.savetxt(fileobj, rows, fmt="%.9g", delimiter=",")
+        else:
+            fileobj.write(rows.astype("<f4").tobytes())
+        count += len(rows)
+    return count
+
+def export_fractal(fractal_type, order, size=1, fmt="bin", directory=None):
+    """把分形几何流式写入文件
+
+    先写入同目录的临时文件，完成后再改名，下载链接不会读到写了一半的文件；
+    写入失败时删除临时文件。
+
+    Args:
+        directory: 输出目录，默认为系统临时目录
+
+    Returns:
+        str: 文件路径
+    """
+    if fractal_type == "koch":
+        chunks = iter_koch_segments(order, size)
+    else:
+        chunks = iter_sierpinski_triangles(order, size)
+    directory = directory or tempfile.gettempdir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{fractal_type}_order{order}.{fmt}")
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write_chunks(chunks, f, fmt)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    return path
+
+def effective_order(fractal_type, order, figsize=FIGURE_SIZE, dpi=None,
+                    min_pixels=LOD_MIN_PIXELS):
+    """按输出画布的像素预算计算实际需要的递归深度
+
+    图形总是按坐标轴宽度等比缩放，最小特征的像素尺寸只取决于递归深度，
+    与 size 无关：像素数 ≈ 坐标轴像素宽度 / (1.1 × 缩小倍数^order)。
+    超过像素精度的细分不会改变输出图像，只增加计算量和内存。
+
+    Args:
+        fractal_type: 分形类型
+        order: 请求的递归深度
+        figsize: 画布大小（英寸）
+        dpi: 输出分辨率，默认与 show_figure 按容器宽度计算的分辨率一致
+        min_pixels: 最小特征的像素阈值
+
+    Returns:
+        int: 不超过 order 的实际递归深度
+    """
+    dpi = dpi or resolve_dpi(figsize[0])
+    # 默认子图占画布宽度的 77.5%，自动缩放另留约 10% 边距
+    axes_pixels = figsize[0] * dpi * 0.775 / 1.1
+    shrink = _LOD_SHRINK[fractal_type]
+    max_useful = int(np.floor(np.log(axes_pixels / min_pixels) / np.log(shrink)))
+    return max(0, min(order, max_useful))
+
+def order_limit(fractal_type):
+    """递归深度滑块的上限：不超过 MAX_ORDER，且更深的细分仍能改变输出图像
+
+    更深的几何数据可以通过"导出分形数据"获取（导出不受像素预算限制）。
+    """
+    return effective_order(fractal_type, MAX_ORDER[fractal_type])
+
+def draw_fractal(fractal_type, order, size=1):
+    """绘制分形图形
+
+    Args:
+        fractal_type: 分形类型，"koch"、"sierpinski" 或 "sierpinski_points"
+        order: 递归深度
+        size: 初始三角形的大小
+
+    Returns:
+        fig: Matplotlib图形对象
+    """
+    fig, ax = create_figure(figsize=FIGURE_SIZE)
+    if fractal_type == "koch":
+        plot_koch_snowflake(ax, get_fractal_geometry("koch", order, size))
+    elif fractal_type == "sierpinski_points":
+        plot_sierpinski_points(ax, sierpinski_chaos_game(order, size))
+    else:
+        plot_sierpinski_triangle(ax, get_fractal_geometry("sierpinski", order, size))
+    return fig
+
+def draw_escape_time(fractal_type, max_iter, julia_re=-0.8, julia_im=0.156):
+    """绘制曼德博集合或朱利亚集合
+
+    Args:
+        fractal_type: "mandelbrot" 或 "julia"
+        max_iter: 最大迭代次数
+        julia_re, julia_im: 朱利亚集合参数 c 的实部与虚部
+    """
+    chinese_font = configure_matplotlib_defaults()
+    bounds = ESCAPE_TIME_VIEWS[fractal_type]
+    julia_c = complex(julia_re, julia_im) if fractal_type == "julia" else None
+    image = render_escape_time(bounds, ENGINE_RESOLUTION, ENGINE_RESOLUTION, max_iter, julia_c)
     
-    # 创建分形控制
-    st.sidebar.header("分形参数")
-    fractal_type = st.sidebar.selectbox(
-        "选择分形类型",
-        ["科赫雪花", "谢尔宾斯基三角形"],
-        key="geometry_fractals_type"
-    )
+    fig, ax = create_figure(figsize=FIGURE_SIZE)
+    # 对数着色拉开边界附近的层次；集合内部为0，显示为黑色
+    ax.imshow(np.log1p(image), extent=bounds, cmap='magma', interpolation='nearest')
+    ax.set_aspect('equal')
+    ax.axis('off')
+    title = '曼德博集合' if fractal_type == "mandelbrot" else f'朱利亚集合 (c = {julia_c})'
+    ax.set_title(title, fontproperties=chinese_font)
+    return fig
+
+def draw_ifs(fractal_type, n_points):
+    """绘制迭代函数系统分形的密度图
+
+    Args:
+        fractal_type: "fern"、"dragon" 或 "levy"
+        n_points: 采样点数
+    """
+    chinese_font = configure_matplotlib_defaults()
+    points = ifs_points(IFS_SYSTEMS[fractal_type], n_points)
+    image, bounds = ifs_density(points, ENGINE_RESOLUTION)
     
-    order = st.sidebar.slider("递归深度", 0, 6, 3, key="geometry_fractals_order")
+    fig, ax = create_figure(figsize=FIGURE_SIZE)
+    cmap = 'Greens' if fractal_type == "fern" else 'Blues'
+    ax.imshow(image, extent=bounds, cmap=cmap, interpolation='nearest')
+    ax.set_aspect('equal')
+    ax.axis('off')
+    titles = {"fern": '巴恩斯利蕨', "dragon": '龙曲线', "levy": '莱维C曲线'}
+    ax.set_title(titles[fractal_type], fontproperties=chinese_font)
+    return fig
+
+def get_prerender_grid():
+    """预渲染参数网格：与侧边栏滑块的取值范围一致"""
+    sizes = [round(0.5 + 0.1 * i, 1) for i in range(16)]
+    return [
+        (draw_fractal, {"fractal_type": fractal_type, "order": order, "size": size})
+        for fractal_type in MAX_ORDER
+        for order in range(order_limit(fractal_type) + 1)
+        for size in sizes
+    ]
+
+def _show_subdivision_fractal(fractal_type):
+    """科赫雪花与谢尔宾斯基三角形：递归细分类分形"""
+    # 切换分形类型时，把超出新上限的递归深度收回到上限
+    max_order = order_limit(FRACTAL_TYPES[fractal_type])
+    if st.session_state.get("geometry_fractals_order", 0) > max_order:
+        st.session_state["geometry_fractals_order"] = max_order
+    order = st.sidebar.slider("递归深度", 0, max_order, 3, key="geometry_fractals_order",
+                              help=f"上限按当前分辨率计算：{max_order} 级以上的细节小于一个像素")
+    hard_limit = MAX_ORDER[FRACTAL_TYPES[fractal_type]]
+    if max_order < hard_limit:
+        st.sidebar.caption(f"当前分辨率下递归深度限制为 {max_order} 级（硬上限 {hard_limit} 级）："
+                           f"更高的深度不会改变图像。需要更深层的数据时请使用\"导出分形数据\"。")
     size = st.sidebar.slider("图形大小", 0.5, 2.0, 1.0, 0.1, key="geometry_fractals_size")
     
-    # 创建图形
-    fig, ax = plt.subplots(figsize=(10, 10))
-    
     if fractal_type == "科赫雪花":
-        points = koch_snowflake(order, size)
-        plot_koch_snowflake(ax, points)
-        
         # 添加科赫雪花的说明
         st.markdown("""
         ### 科赫雪花
@@ -166,9 +578,6 @@ def show_fractals_page():
         """)
         
     else:
-        triangles = sierpinski_triangle(order, size)
-        plot_sierpinski_triangle(ax, triangles)
-        
         # 添加谢尔宾斯基三角形的说明
         st.markdown("""
         ### 谢尔宾斯基三角形
@@ -186,7 +595,43 @@ def show_fractals_page():
         """)
     
     # 显示图形
-    st.pyplot(fig)
+    lod_order = effective_order(FRACTAL_TYPES[fractal_type], order)
+    if lod_order < order:
+        st.caption(f"实际绘制深度：{lod_order}（更深层的细节小于一个像素，已省略）")
+    else:
+        st.caption(f"实际绘制深度：{lod_order}")
+    show_figure(draw_fractal, FRACTAL_TYPES[fractal_type], lod_order, size)
+    
+    # 数据导出：流式写入静态文件目录并由静态文件服务下载，内存占用与递归深度无关
+    export_type = FRACTAL_TYPES[fractal_type].replace("_points", "")
+    with st.expander("导出分形数据"):
+        export_fmt = st.radio("文件格式", ["bin", "csv"], horizontal=True,
+                              format_func=lambda x: {"bin": "二进制（float32）", "csv": "CSV"}[x],
+                              key="geometry_fractals_export_fmt")
+        limits = EXPORT_MAX_ORDER_CSV if export_fmt == "csv" else EXPORT_MAX_ORDER
+        max_export = limits[export_type]
+        if st.session_state.get("geometry_fractals_export_order", 0) > max_export:
+            st.session_state["geometry_fractals_export_order"] = max_export
+        export_order = st.slider("导出递归深度", 0, max_export, min(order, max_export),
+                                 key="geometry_fractals_export_order")
+        if st.button("生成导出文件", key="geometry_fractals_export"):
+            # 删除本会话上一次导出的文件；其他会话留下的文件超过保留时间后删除
+            previous = st.session_state.pop("geometry_fractals_export_file", None)
+            if previous:
+                shutil.rmtree(os.path.dirname(previous), ignore_errors=True)
+            directory = task_directory(EXPORT_CATEGORY, uuid.uuid4().hex, EXPORT_RETENTION_S)
+            st.session_state["geometry_fractals_export_file"] = export_fractal(
+                export_type, export_order, size, export_fmt, directory=str(directory))
+        export_file = st.session_state.get("geometry_fractals_export_file")
+        if export_file and os.path.exists(export_file):
+            if os.path.getsize(export_file) > MAX_STATIC_FILE_BYTES:
+                st.error("导出文件超过静态文件服务的大小上限，请降低递归深度")
+            else:
+                # 由静态文件服务按块读取发送，文件内容不读入会话内存
+                name = html.escape(os.path.basename(export_file))
+                st.markdown(f'<a href="{static_url(export_file)}" download="{name}">下载 {name}</a>',
+                            unsafe_allow_html=True)
+        st.caption("二进制文件每行依次为各顶点的 x、y 坐标（小端 float32）：科赫雪花每行一条线段，谢尔宾斯基三角形每行一个三角形。")
     
     # 添加交互说明
     st.sidebar.markdown("""
@@ -196,6 +641,115 @@ def show_fractals_page():
     
     提示：递归深度越大，图形越精细，但计算量也越大。
     """)
+
+def _show_escape_time_fractal(kind):
+    """曼德博集合与朱利亚集合：逃逸时间类分形"""
+    mode = st.sidebar.radio("显示方式", ["静态图像", "缩放浏览"], key="geometry_fractals_view_mode")
+    if mode == "静态图像":
+        max_iter = st.sidebar.slider("最大迭代次数", 20, 1000, 200, 10, key="geometry_fractals_max_iter")
+    julia_re, julia_im = -0.8, 0.156
+    if kind == "julia":
+        julia_re = st.sidebar.slider("参数 c 的实部", -1.5, 1.5, -0.8, 0.01, key="geometry_fractals_julia_re")
+        julia_im = st.sidebar.slider("参数 c 的虚部", -1.5, 1.5, 0.156, 0.001, key="geometry_fractals_julia_im")
+    
+    if kind == "mandelbrot":
+        st.markdown("""
+        ### 曼德博集合
+        曼德博集合是复平面上使迭代 $z_{n+1} = z_n^2 + c$（从 $z_0 = 0$ 开始）保持有界的全部参数 $c$ 组成的集合。
+        
+        特点：
+        - 边界具有无穷精细的结构，放大后不断出现与整体相似的图案
+        - 集合是连通的
+        - 边界的豪斯多夫维数为2
+        """)
+    else:
+        st.markdown("""
+        ### 朱利亚集合
+        固定参数 $c$，迭代 $z_{n+1} = z_n^2 + c$ 时保持有界的初始点 $z_0$ 组成填充朱利亚集合。
+        
+        特点：
+        - 当 $c$ 属于曼德博集合时，朱利亚集合是连通的
+        - 当 $c$ 不属于曼德博集合时，朱利亚集合是一片"尘埃"（康托尔集）
+        - 改变 $c$ 会得到形态各异的图案
+        """)
+    
+    # 颜色表示逃逸所需的迭代次数，黑色区域为集合内部
+    if mode == "缩放浏览":
+        julia_c = complex(julia_re, julia_im) if kind == "julia" else None
+        show_fractal_zoom_viewer(kind, julia_c, key_prefix="geometry_fractals_zoom")
+    else:
+        show_figure(draw_escape_time, kind, max_iter, julia_re, julia_im)
+    
+    st.sidebar.markdown("""
+    ### 参数说明
+    - 最大迭代次数：越大边界越精细，但计算量也越大
+    - 缩放浏览：每次放大一倍；平移时只计算新进入视口的图块，
+      放大后迭代次数随缩放级别自动增加
+    
+    图像按图块在多个进程中并行计算。
+    """)
+
+def _show_ifs_fractal(kind):
+    """巴恩斯利蕨、龙曲线、莱维C曲线：迭代函数系统类分形"""
+    n_points = st.sidebar.slider("采样点数（万）", 5, 200, 50, 5, key="geometry_fractals_ifs_points") * 10_000
+    
+    descriptions = {
+        "fern": r"""
+        ### 巴恩斯利蕨
+        巴恩斯利蕨由英国数学家迈克尔·巴恩斯利提出，由四个仿射变换按不同概率随机迭代生成，
+        形状酷似真实的蕨类植物叶片。每个变换分别生成叶柄、主干和左右两侧的小叶。
+        """,
+        "dragon": r"""
+        ### 龙曲线
+        龙曲线（海威龙）可以通过反复对折纸条再展开得到。它由两个缩放比例为 $1/\sqrt{2}$、
+        旋转45°的相似变换组成，曲线本身不自交，并且可以铺满平面。
+        """,
+        "levy": r"""
+        ### 莱维C曲线
+        莱维C曲线由法国数学家保罗·莱维研究，同样由两个缩放比例为 $1/\sqrt{2}$ 的相似变换组成，
+        形状像一个由无数小"C"拼成的大"C"，分形维数为2。
+        """,
+    }
+    st.markdown(descriptions[kind])
+    
+    show_figure(draw_ifs, kind, n_points)
+    
+    st.sidebar.markdown("""
+    ### 参数说明
+    - 采样点数：点越多图像越细致，但计算量也越大
+    """)
+
+def show_fractals_page():
+    """显示分形图形页面"""
+    st.title("分形图形")
+    
+    # 添加分形简介
+    st.markdown("""
+    ### 什么是分形？
+    分形是一种具有自相似性的图形，即局部和整体具有相似的形状。在数学中，分形通常具有以下特征：
+    1. 自相似性：图形的局部和整体形状相似
+    2. 无限细节：无论放大多少倍，都能看到类似的结构
+    3. 分数维：不同于普通的整数维度
+    
+    下面展示了三类经典的分形图形：递归细分（科赫雪花、谢尔宾斯基三角形）、
+    复动力系统（曼德博集合、朱利亚集合）和迭代函数系统（巴恩斯利蕨、龙曲线、莱维C曲线）。
+    """)
+    
+    # 创建分形控制
+    st.sidebar.header("分形参数")
+    fractal_type = st.sidebar.selectbox(
+        "选择分形类型",
+        list(FRACTAL_TYPES.keys()),
+        key="geometry_fractals_type"
+    )
+    
+    kind = FRACTAL_TYPES[fractal_type]
+    if kind in ESCAPE_TIME_VIEWS:
+        _show_escape_time_fractal(kind)
+    elif kind in IFS_SYSTEMS:
+        _show_ifs_fractal(kind)
+    else:
+        _show_subdivision_fractal(fractal_type)
     
     # 添加数学原理
     st.markdown("""
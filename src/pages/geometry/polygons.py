@@ -3,21 +3,22 @@
 """
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
 from ...components.polygon_drawer import draw_polygon_component
 from ...utils.plot_utils import configure_matplotlib_defaults
+from ...utils.visualization import create_figure
+from ...utils.image_output import displayed_in_columns
+from ...utils.geometry_scene import Scene, select_render_backend, show_geometry
 from ...i18n.language_manager import get_text, add_language_selector
 
-# 获取中文字体
-chinese_font = configure_matplotlib_defaults()
-
+@displayed_in_columns(2)
 def plot_regular_polygon(n, size=1):
     """绘制正n边形"""
+    chinese_font = configure_matplotlib_defaults()
     angles = np.linspace(0, 2*np.pi, n, endpoint=False)
     x = size * np.cos(angles)
     y = size * np.sin(angles)
     
-    fig, ax = plt.subplots(figsize=(4, 4))
+    fig, ax = create_figure(figsize=(4, 4))
     ax.plot(np.append(x, x[0]), np.append(y, y[0]), 'b-')
     ax.set_aspect('equal')
     ax.grid(True)
@@ -32,13 +33,31 @@ def plot_regular_polygon(n, size=1):
     ax.set_xlabel('x', fontproperties=chinese_font)
     ax.set_ylabel('y', fontproperties=chinese_font)
     
-    plt.close()
     return fig
 
+def regular_polygon_scene(n, size=1):
+    """plot_regular_polygon 的几何场景（浏览器端渲染）"""
+    angles = np.linspace(0, 2*np.pi, n, endpoint=False)
+    margin = 0.2
+    scene = Scene((-size-margin, size+margin), (-size-margin, size+margin),
+                  title=f'{get_text("regular_polygons")} ({n})', xlabel='x', ylabel='y')
+    scene.polyline(size * np.column_stack((np.cos(angles), np.sin(angles))), color='blue', closed=True)
+    return scene
+
+def get_prerender_grid():
+    """预渲染参数网格：与边数、边长滑块的取值范围一致"""
+    sizes = [round(0.5 + 0.1 * i, 1) for i in range(16)]
+    return [
+        (plot_regular_polygon, {"n": n, "size": size})
+        for n in range(3, 37)
+        for size in sizes
+    ]
+
 def show_polygons_page():
     """显示多边形页面"""
     # 添加语言选择器
     add_language_selector()
+    backend = select_render_backend("geometry_polygons")
     
     st.title(get_text("polygons_title"))
     
@@ -64,8 +83,8 @@ def show_polygons_page():
             size = st.slider(get_text("side_length"), min_value=0.5, max_value=2.0, value=1.0, step=0.1)
             
             # 图形显示
-            fig = plot_regular_polygon(n_sides, size)
-            st.pyplot(fig)
+            show_geometry(plot_regular_polygon, regular_polygon_scene, n_sides, size,
+                          backend=backend, width=300)
         
         # 右列：文字说明
         with right_col:
@@ -1,35 +1,59 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
 from src.utils.plot_utils import configure_matplotlib_defaults
+from src.utils.visualization import create_figure
+from src.utils.geometry_scene import Scene, select_render_backend, show_geometry
 
-# 配置matplotlib并获取中文字体
-chinese_font = configure_matplotlib_defaults()
+# 两组示例三角形：(顶点, 标题)
+BASIC_TRIANGLES = [
+    (np.array([[0, 0], [1, 0], [0.5, 1]]), "普通三角形"),
+    (np.array([[0, 0], [1, 0], [0, 1]]), "直角三角形"),
+    (np.array([[-0.5, 0], [0.5, 0], [0, 1]]), "等腰三角形"),
+]
+SPECIAL_TRIANGLES = [
+    (np.array([[0, 0], [1, 0], [0.5, np.sqrt(3) / 2]]), "等边三角形"),
+    (np.array([[0, 0], [2, 0], [0, np.sqrt(3)]]), "30-60-90三角形"),
+    (np.array([[0, 0], [1, 0], [0, 1]]), "45-45-90三角形"),
+]
+
+def triangle_angle_labels(points):
+    """计算三角形各内角的标注位置与文字
+    
+    Args:
+        points: 三个顶点
+        
+    Returns:
+        list: [(标注位置, 角度文字), ...]
+    """
+    labels = []
+    for i in range(3):
+        p1 = points[i]
+        p2 = points[(i+1)%3]
+        p3 = points[(i+2)%3]
+        
+        # 计算向量
+        v1 = p2 - p1
+        v2 = p3 - p1
+        
+        # 计算角度
+        angle = np.degrees(np.arccos(np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))))
+        
+        # 在角的位置显示角度
+        labels.append((p1 + 0.2 * (v1 + v2) / 2, f'{angle:.0f}°'))
+    return labels
 
 def draw_triangle(ax, points, title="", color='blue', alpha=0.3, show_angles=False):
     """绘制三角形"""
+    chinese_font = configure_matplotlib_defaults()
     # 添加第一个点作为结束点，形成闭合图形
     points = np.vstack((points, points[0]))
     ax.plot(points[:, 0], points[:, 1], color=color)
     ax.fill(points[:, 0], points[:, 1], alpha=alpha, color=color)
     
     if show_angles:
-        # 计算并显示角度
-        for i in range(3):
-            p1 = points[i]
-            p2 = points[(i+1)%3]
-            p3 = points[(i+2)%3]
-            
-            # 计算向量
-            v1 = p2 - p1
-            v2 = p3 - p1
-            
-            # 计算角度
-            angle = np.degrees(np.arccos(np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))))
-            
-            # 在角的位置显示角度
-            midpoint = p1 + 0.2 * (v1 + v2) / 2
-            ax.text(midpoint[0], midpoint[1], f'{angle:.0f}°', fontsize=8)
+        # 在角的位置显示角度
+        for (x, y), text in triangle_angle_labels(points[:3]):
+            ax.text(x, y, text, fontsize=8)
     
     ax.set_title(title, fontproperties=chinese_font)
     ax.set_aspect('equal')
@@ -38,46 +62,51 @@ def draw_triangle(ax, points, title="", color='blue', alpha=0.3, show_angles=Fal
 
 def draw_basic_triangles():
     """绘制基本三角形示例"""
-    fig, axes = plt.subplots(1, 3, figsize=(12, 4))
-    
-    # 普通三角形
-    points1 = np.array([[0, 0], [1, 0], [0.5, 1]])
-    draw_triangle(axes[0], points1, "普通三角形", show_angles=True)
+    fig, axes = create_figure(figsize=(12, 4), ncols=3)
     
-    # 直角三角形
-    points2 = np.array([[0, 0], [1, 0], [0, 1]])
-    draw_triangle(axes[1], points2, "直角三角形", show_angles=True)
+    # 普通三角形、直角三角形、等腰三角形
+    for ax, (points, title) in zip(axes, BASIC_TRIANGLES):
+        draw_triangle(ax, points, title, show_angles=True)
     
-    # 等腰三角形
-    points3 = np.array([[-0.5, 0], [0.5, 0], [0, 1]])
-    draw_triangle(axes[2], points3, "等腰三角形", show_angles=True)
-    
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 def draw_special_triangles():
     """绘制特殊三角形"""
-    fig, axes = plt.subplots(1, 3, figsize=(12, 4))
-    
-    # 等边三角形
-    side = 1
-    height = side * np.sqrt(3) / 2
-    points1 = np.array([[0, 0], [1, 0], [0.5, height]])
-    draw_triangle(axes[0], points1, "等边三角形", show_angles=True)
+    fig, axes = create_figure(figsize=(12, 4), ncols=3)
     
-    # 30-60-90三角形
-    points2 = np.array([[0, 0], [2, 0], [0, np.sqrt(3)]])
-    draw_triangle(axes[1], points2, "30-60-90三角形", show_angles=True)
+    # 等边三角形、30-60-90三角形、45-45-90三角形
+    for ax, (points, title) in zip(axes, SPECIAL_TRIANGLES):
+        draw_triangle(ax, points, title, show_angles=True)
     
-    # 45-45-90三角形
-    points3 = np.array([[0, 0], [1, 0], [0, 1]])
-    draw_triangle(axes[2], points3, "45-45-90三角形", show_angles=True)
-    
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
+def triangle_scene(points, title="", color='blue', alpha=0.3):
+    """draw_triangle 的几何场景（浏览器端渲染），坐标范围在顶点外留 5% 边距"""
+    low, high = points.min(axis=0), points.max(axis=0)
+    margin = 0.05 * (high - low)
+    scene = Scene((low[0] - margin[0], high[0] + margin[0]), (low[1] - margin[1], high[1] + margin[1]), title=title)
+    scene.polyline(points, color=color, fill=color, fill_opacity=alpha, closed=True)
+    for (x, y), text in triangle_angle_labels(points):
+        scene.text(x, y, text, size=10)
+    return scene
+
+def basic_triangles_scene():
+    """draw_basic_triangles 的几何场景"""
+    return [triangle_scene(points, title) for points, title in BASIC_TRIANGLES]
+
+def special_triangles_scene():
+    """draw_special_triangles 的几何场景"""
+    return [triangle_scene(points, title) for points, title in SPECIAL_TRIANGLES]
+
+def get_prerender_grid():
+    """预渲染参数网格：本页图形均无参数"""
+    return [(draw_basic_triangles, {}), (draw_special_triangles, {})]
+
 def show_triangles_page():
     """显示三角形页面"""
+    backend = select_render_backend("geometry_triangles")
     st.title("三角形 ")
     
     # 创建选项卡
@@ -113,7 +142,7 @@ def show_triangles_page():
         - **钝角三角形**：有一个角是钝角（大于90°）
         """)
         
-        st.pyplot(draw_basic_triangles())
+        show_geometry(draw_basic_triangles, basic_triangles_scene, backend=backend, width=200)
     
     # Tab 2: 特殊三角形
     with tab2:
@@ -136,7 +165,7 @@ def show_triangles_page():
         - 两个直角边相等，斜边是直角边的√2倍
         """)
         
-        st.pyplot(draw_special_triangles())
+        show_geometry(draw_special_triangles, special_triangles_scene, backend=backend, width=200)
     
     # Tab 3: 三角形性质
     with tab3:
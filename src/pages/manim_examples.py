@@ -2,7 +2,29 @@
 Manim 示例页面
 """
 import streamlit as st
-from src.components.manim_demo import ManimDemo
+from src.components.manim_demo import DEFAULT_QUALITY, QUALITY_LABELS, ManimDemo, function_scene, geometry_scene
+from src.utils.render_queue import RenderQueueFull
+
+def _submit(manim_demo, state_key, scene_factory, quality, stream, **params):
+    """提交动画渲染任务，把请求保存到会话状态
+
+    流式渲染边渲染边播放；否则先渲染低质量预览、再渲染所选质量。
+    """
+    submit = manim_demo.submit_stream if stream else manim_demo.submit_animation
+    try:
+        st.session_state[state_key] = submit(scene_factory, quality, **params)
+    except RenderQueueFull as exc:
+        st.warning(str(exc))
+
+def _show(manim_demo, state_key):
+    """显示会话中保存的动画请求"""
+    request = st.session_state.get(state_key)
+    if request is None:
+        return
+    if request.stream_key is not None:
+        manim_demo.show_stream(request)
+    else:
+        manim_demo.show_animation(request)
 
 def render_manim_page():
     """渲染 Manim 示例页面"""
@@ -11,8 +33,24 @@ def render_manim_page():
     # 创建选项卡
     tab1, tab2 = st.tabs(["函数可视化", "几何变换"])
     
-    # 实例化 Manim 演示类
+    # 实例化 Manim 演示类，并在后台预编译公式
     manim_demo = ManimDemo()
+    manim_demo.prewarm()
+
+    # 先显示 480p15 预览，所选质量在后台渲染完成后自动替换
+    qualities = list(QUALITY_LABELS)
+    quality = st.sidebar.selectbox(
+        "视频质量",
+        qualities,
+        index=qualities.index(DEFAULT_QUALITY),
+        format_func=QUALITY_LABELS.get,
+        key="manim_quality",
+    )
+    stream = st.sidebar.checkbox(
+        "边渲染边播放",
+        key="manim_stream",
+        help="逐帧编码为 HLS 分段，第一个分段完成后即开始播放",
+    )
     
     # 函数可视化选项卡
     with tab1:
@@ -28,8 +66,9 @@ def render_manim_page():
         )
         
         if st.button("生成函数动画"):
-            with st.spinner("正在生成动画..."):
-                manim_demo.show_function_animation(func_type)
+            _submit(manim_demo, "manim_function_video", function_scene, quality, stream, func_type=func_type)
+        # 渲染在后台进行，页面只轮询进度，完成后显示视频
+        _show(manim_demo, "manim_function_video")
     
     # 几何变换选项卡
     with tab2:
@@ -45,5 +84,5 @@ def render_manim_page():
         )
         
         if st.button("生成几何动画"):
-            with st.spinner("正在生成动画..."):
-                manim_demo.show_geometry_animation(shape_type)
+            _submit(manim_demo, "manim_geometry_video", geometry_scene, quality, stream, shape_type=shape_type)
+        _show(manim_demo, "manim_geometry_video")
@@ -0,0 +1,109 @@
+"""
+位块传输（blitting）渲染
+
+滑块驱动的图形在相邻两帧之间只有少数艺术家（射线、形状、标注）发生变化，
+坐标轴、网格、刻度与标签完全相同。本模块把静态部分用 Agg 栅格化一次并缓存，
+之后每一帧只恢复背景、重绘动态艺术家（编码由 image_output 完成）：
+
+1. 动态艺术家标记为 animated，canvas.draw() 时不绘制，得到纯静态的背景
+2. 每帧 restore_region(背景) + draw_artist(动态艺术家)
+3. 按背景的紧凑边界裁剪（与 bbox_inches="tight" 一致）
+
+要求动态艺术家不影响静态部分的布局：坐标轴范围固定，标题、图例等
+随参数变化的文字本身也要作为动态艺术家。
+"""
+import time
+
+import numpy as np
+
+# 紧凑裁剪时在内容外保留的边距（英寸），与 savefig 的 pad_inches 默认值一致
+TIGHT_PAD_INCHES = 0.1
+
+def _flatten(artists):
+    for artist in artists:
+        if isinstance(artist, (list, tuple)):
+            yield from _flatten(artist)
+        else:
+            yield artist
+
+class BlitRenderer:
+    """用缓存的静态背景逐帧渲染同一个图形"""
+
+    def __init__(self, fig, artists):
+        """
+        Args:
+            fig: 使用 Agg 画布的图形
+            artists: 动态艺术家（可以嵌套在列表或元组中）
+        """
+        self.fig = fig
+        self.artists = list(_flatten(artists))
+        for artist in self.artists:
+            artist.set_animated(True)
+        self._background = None  # (dpi, 背景区域, 裁剪范围)
+        self.backgrounds = 0  # 栅格化背景的次数
+        self.frames = 0
+        self.timings = {}  # 最近一帧各阶段的耗时（毫秒）
+
+    def invalidate(self):
+        """静态部分发生变化后调用，下一帧重新栅格化背景"""
+        self._background = None
+
+    def _tight_crop(self, renderer):
+        """与 bbox_inches="tight" 对应的像素裁剪范围 (行切片, 列切片)"""
+        bbox = self.fig.get_tightbbox(renderer).padded(TIGHT_PAD_INCHES)
+        dpi = self.fig.dpi
+        width, height = self.fig.canvas.get_width_height()
+        # savefig 按边界宽高截断取整得到输出尺寸，这里保持一致
+        left = max(0, round(bbox.x0 * dpi))
+        top = max(0, round(height - bbox.y1 * dpi))
+        right = min(width, left + int(bbox.width * dpi))
+        bottom = min(height, top + int(bbox.height * dpi))
+        return slice(top, bottom), slice(left, right)
+
+    def _ensure_background(self, dpi):
+        if self._background is not None and self._background[0] == dpi:
+            return
+        if self.fig.dpi != dpi:
+            self.fig.set_dpi(dpi)
+        canvas = self.fig.canvas
+        canvas.draw()
+        region = canvas.copy_from_bbox(self.fig.bbox)
+        self._background = (dpi, region, self._tight_crop(canvas.get_renderer()))
+        self.backgrounds += 1
+
+    def render_rgba(self, dpi=None):
+        """渲染一帧，返回裁剪后的 RGBA 数组"""
+        dpi = dpi or self.fig.dpi
+        start = time.perf_counter()
+        self._ensure_background(dpi)
+        background_done = time.perf_counter()
+
+        canvas = self.fig.canvas
+        _, region, crop = self._background
+        canvas.restore_region(region)
+        for artist in self.artists:
+            if artist.axes is not None:
+                artist.axes.draw_artist(artist)
+            else:
+                self.fig.draw_artist(artist)
+        image = np.asarray(canvas.buffer_rgba())[crop]
+        draw_done = time.perf_counter()
+
+        self.frames += 1
+        self.timings = {
+            "background_ms": (background_done - start) * 1000,
+            "draw_ms": (draw_done - background_done) * 1000,
+        }
+        return image
+
+def enable_blitting(fig, artists):
+    """为图形启用位块传输渲染，返回其渲染器（重复调用返回同一个）"""
+    # 渲染器保存在图形自身上，与图形一起被回收（弱引用字典的值引用了图形，条目永远不会被删除）
+    renderer = getattr(fig, "_blit_renderer", None)
+    if renderer is None:
+        renderer = fig._blit_renderer = BlitRenderer(fig, artists)
+    return renderer
+
+def get_blit_renderer(fig):
+    """获取图形的位块传输渲染器，没有启用时返回 None"""
+    return getattr(fig, "_blit_renderer", None)
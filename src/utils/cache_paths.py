@@ -0,0 +1,17 @@
+"""
+缓存目录
+
+所有磁盘缓存（图形、字体索引等）都放在 CACHE_ROOT 下的子目录中，
+默认 ~/.cache/streamlit_math，可用环境变量 STREAMLIT_MATH_CACHE_DIR 修改。
+本模块只依赖标准库，可以在任何模块中导入。
+"""
+import os
+
+CACHE_ROOT = os.environ.get(
+    "STREAMLIT_MATH_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "streamlit_math"),
+)
+
+def get_cache_dir(name):
+    """获取某类缓存的目录（不会创建目录）"""
+    return os.path.join(CACHE_ROOT, name)
@@ -0,0 +1,455 @@
+"""
+图形渲染缓存
+
+以 (绘图函数, 规范化参数, 语言, 主题, 分辨率, 格式) 作为内容地址，缓存 Matplotlib
+图形经 image_output 编码后的图像字节。缓存分两层：
+1. 内存层：进程级单例，所有会话共享
+2. 磁盘层：按内容地址存放的图像目录，进程重启后仍然有效
+
+相同参数的重复请求直接返回缓存字节，不再调用 Matplotlib。
+"""
+import functools
+import hashlib
+import inspect
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import streamlit as st
+
+from src.i18n.language_manager import get_language, use_language
+from src.utils.cache_paths import get_cache_dir
+from src.utils.image_output import encode_figure, show_image, target_width_px
+from src.utils.plot_utils import configure_matplotlib_defaults
+from src.utils.visualization import FigureTemplate, release_figure
+
+# 分辨率上限（与 st.pyplot 的默认值一致）；实际分辨率按容器宽度计算，见 image_output
+DEFAULT_DPI = 200
+DEFAULT_FORMAT = "auto"
+
+# 内存缓存的字节预算（MB），可通过环境变量调整
+MEMORY_BUDGET_MB = int(os.environ.get("STREAMLIT_MATH_FIGURE_CACHE_MB", "64"))
+
+# 磁盘缓存的容量上限（MB）
+DISK_BUDGET_MB = int(os.environ.get("STREAMLIT_MATH_DISK_CACHE_MB", "512"))
+
+# 缓存格式版本：修改存储布局或渲染管线时递增，旧版本目录会被清理。
+# 缓存键只包含绘图函数及其引用的 FigureTemplate（build/update）的源码；
+# 修改其他辅助函数、plot_utils 的样式默认值或 visualization 的图形工厂时，
+# 磁盘上的旧图像不会自动失效，也必须递增此版本号
+CACHE_VERSION = 2
+
+@dataclass
+class CacheStats:
+    """缓存统计信息"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    size_bytes: int = 0
+    max_bytes: int = 0
+
+    @property
+    def hit_rate(self):
+        """命中率"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+class LRUByteCache:
+    """按字节预算淘汰的 LRU 缓存（线程安全）"""
+
+    def __init__(self, max_bytes):
+        """
+        Args:
+            max_bytes: 缓存内容的总字节上限
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = CacheStats(max_bytes=max_bytes)
+
+    def get(self, key):
+        """读取缓存，未命中时返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes=None):
+        """写入缓存，并按 LRU 顺序淘汰超出预算的条目
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            nbytes: 值占用的字节数，默认取 len(value)
+        """
+        if nbytes is None:
+            nbytes = len(value)
+        # 单个条目超过预算时不缓存
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = (value, nbytes)
+            self._size += nbytes
+            while self._size > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._size -= evicted_bytes
+                self._stats.evictions += 1
+
+    def clear(self):
+        """清空缓存（保留计数器）"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        """返回当前统计信息的快照"""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                entries=len(self._entries),
+                size_bytes=self._size,
+                max_bytes=self.max_bytes,
+            )
+
+class DiskByteCache:
+    """按内容地址存放在磁盘上的字节缓存
+
+    - 文件按键的前两位分目录存放：<root>/v<version>/ab/abcdef....<ext>
+    - 写入先落到同目录的临时文件，再用 os.replace 原子替换，多进程并发写入安全
+    - 读取时刷新文件的修改时间，作为 LRU 的访问记录
+    - 总大小超过上限时，按修改时间从旧到新删除，直到降到上限的 90%
+    """
+
+    def __init__(self, root, max_bytes, version=CACHE_VERSION):
+        """
+        Args:
+            root: 缓存根目录
+            max_bytes: 磁盘占用上限（字节）
+            version: 缓存版本号，不同版本使用不同子目录
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.directory = os.path.join(root, f"v{version}")
+        self._lock = threading.Lock()
+        self._stats = CacheStats(max_bytes=max_bytes)
+        self.enabled = True
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._purge_stale_versions()
+            self._size = sum(size for _, _, size in self._scan())
+        except OSError:
+            # 目录不可写时退化为纯内存缓存
+            self.enabled = False
+            self._size = 0
+
+    def _purge_stale_versions(self):
+        """删除其他版本的缓存目录"""
+        current = os.path.basename(self.directory)
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith("v") and name != current and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _path(self, key, ext):
+        return os.path.join(self.directory, key[:2], f"{key}.{ext}")
+
+    def _scan(self):
+        """列出所有缓存文件 (路径, 修改时间, 大小)"""
+        entries = []
+        for dirpath, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if filename.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    st_ = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((path, st_.st_mtime, st_.st_size))
+        return entries
+
+    def get(self, key, ext):
+        """读取缓存，未命中时返回 None"""
+        if not self.enabled:
+            return None
+        path = self._path(key, ext)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            with self._lock:
+                self._stats.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self._stats.hits += 1
+        return data
+
+    def put(self, key, ext, data):
+        """原子写入缓存文件"""
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+        path = self._path(key, ext)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            return
+        with self._lock:
+            # 覆盖已有条目时只计入大小的差值
+            self._size += len(data) - replaced
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def evict(self):
+        """按 LRU 顺序删除文件，直到总大小降到上限的 90%"""
+        entries = sorted(self._scan(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._size = total
+            self._stats.evictions += evicted
+
+    def clear(self):
+        """删除当前版本的全部缓存文件"""
+        if not self.enabled:
+            return
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            self._size = 0
+
+    def stats(self):
+        """返回当前统计信息的快照"""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                entries=len(self._scan()) if self.enabled else 0,
+                size_bytes=self._size,
+                max_bytes=self.max_bytes,
+            )
+
+# 进程级共享的图形缓存；磁盘层在第一次使用时创建，导入本模块不会创建缓存目录
+_figure_cache = LRUByteCache(MEMORY_BUDGET_MB * 1024 * 1024)
+_disk_cache = None
+_disk_cache_lock = threading.Lock()
+
+def _get_disk_cache():
+    """获取进程级共享的磁盘层（第一次调用时创建）"""
+    global _disk_cache
+    with _disk_cache_lock:
+        if _disk_cache is None:
+            _disk_cache = DiskByteCache(get_cache_dir("figures"), DISK_BUDGET_MB * 1024 * 1024)
+        return _disk_cache
+
+def normalize_key_arg(value):
+    """将参数值转换为稳定、可比较的表示（用于计算缓存键）"""
+    if isinstance(value, (bool, str, int, type(None))):
+        return value
+    if isinstance(value, (float, np.floating)):
+        # 消除滑块等产生的浮点噪声
+        return round(float(value), 10)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.ndarray):
+        return ("ndarray", value.shape, str(value.dtype), hashlib.sha256(value.tobytes()).hexdigest())
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize_key_arg(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, normalize_key_arg(v)) for k, v in value.items()))
+    return repr(value)
+
+def _source(func):
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        return func.__qualname__
+
+def _referenced_templates(func):
+    """绘图函数按名称引用的模块级 FigureTemplate"""
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return []
+    namespace = getattr(func, "__globals__", {})
+    return [namespace[name] for name in code.co_names if isinstance(namespace.get(name), FigureTemplate)]
+
+@functools.lru_cache(maxsize=None)
+def _source_digest(func):
+    """绘图函数源码的摘要，代码修改后缓存键随之改变
+
+    函数引用的图形模板（如 draw_angle 中的 ANGLE）的 build/update 源码也计入摘要；
+    其他辅助函数不在其中，修改时需要递增 CACHE_VERSION。
+    """
+    sources = [_source(func)]
+    for template in _referenced_templates(func):
+        sources += [_source(template.build), _source(template.update)]
+    return hashlib.sha256("\n".join(sources).encode("utf-8")).hexdigest()[:16]
+
+def get_theme():
+    """获取当前 Streamlit 主题名称"""
+    return st.get_option("theme.base") or "light"
+
+def make_figure_key(func, args=(), kwargs=None, lang=None, theme=None,
+                    dpi=DEFAULT_DPI, fmt=DEFAULT_FORMAT):
+    """计算图形的内容地址
+
+    参数先按函数签名绑定并补全默认值，因此位置参数与关键字参数的写法得到相同的键；
+    键中还包含函数源码的摘要，修改绘图代码后旧的缓存条目自动失效。
+
+    Returns:
+        str: sha256 十六进制摘要
+    """
+    bound = inspect.signature(func).bind(*args, **(kwargs or {}))
+    bound.apply_defaults()
+    params = tuple((name, normalize_key_arg(value)) for name, value in bound.arguments.items())
+    payload = "|".join([
+        f"{func.__module__}.{func.__qualname__}",
+        _source_digest(func),
+        repr(params),
+        str(lang),
+        str(theme),
+        str(dpi),
+        fmt,
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def figure_to_bytes(fig, fmt=DEFAULT_FORMAT, dpi=None, columns=1):
+    """将图形编码为图像字节并释放图形
+
+    参数见 image_output.encode_figure；启用了位块传输的模板图形只重绘动态部分。
+    """
+    data = encode_figure(fig, fmt, dpi, columns)
+    release_figure(fig)
+    return data
+
+def _resolution_key(func, dpi):
+    """缓存键中的分辨率：指定了 DPI 时取 DPI，否则取容器的目标像素宽度"""
+    if dpi is not None:
+        return dpi
+    return f"w{target_width_px(getattr(func, 'display_columns', 1))}"
+
+def _render_to_bytes(func, args, kwargs, lang, fmt, dpi):
+    """按指定语言调用绘图函数并渲染为字节"""
+    configure_matplotlib_defaults()
+    with use_language(lang):
+        fig = func(*args, **kwargs)
+    return figure_to_bytes(fig, fmt=fmt, dpi=dpi, columns=getattr(func, "display_columns", 1))
+
+def render_figure(func, *args, fmt=DEFAULT_FORMAT, dpi=None, lang=None, theme=None, **kwargs):
+    """通过缓存渲染图形
+
+    Args:
+        func: 返回 Matplotlib Figure 的绘图函数
+        *args, **kwargs: 传给绘图函数的参数
+        fmt: 输出格式，见 image_output.IMAGE_FORMATS
+        dpi: 输出分辨率，None 表示按绘图函数声明的容器宽度计算
+        lang: 语言，默认取当前会话语言
+        theme: 主题，默认取当前 Streamlit 主题
+
+    Returns:
+        bytes: 渲染后的图像字节
+    """
+    lang = lang or get_language()
+    theme = theme or get_theme()
+    key = make_figure_key(func, args, kwargs, lang, theme, _resolution_key(func, dpi), fmt)
+
+    data = _figure_cache.get(key)
+    if data is not None:
+        return data
+
+    data = _get_disk_cache().get(key, fmt)
+    if data is None:
+        data = _render_to_bytes(func, args, kwargs, lang, fmt, dpi)
+        _get_disk_cache().put(key, fmt, data)
+    _figure_cache.put(key, data)
+    return data
+
+def prerender_figure(func, kwargs, lang, theme, fmt=DEFAULT_FORMAT, dpi=None):
+    """离线预渲染：确保图形已写入磁盘缓存（不占用内存层）
+
+    Returns:
+        tuple: (字节数, 是否实际调用了 Matplotlib)
+    """
+    key = make_figure_key(func, (), kwargs, lang, theme, _resolution_key(func, dpi), fmt)
+    data = _get_disk_cache().get(key, fmt)
+    if data is not None:
+        return len(data), False
+    data = _render_to_bytes(func, (), kwargs, lang, fmt, dpi)
+    _get_disk_cache().put(key, fmt, data)
+    return len(data), True
+
+def show_figure(func, *args, fmt=DEFAULT_FORMAT, dpi=None, **kwargs):
+    """渲染（或从缓存读取）图形并显示在页面上，用于替代 st.pyplot"""
+    show_image(render_figure(func, *args, fmt=fmt, dpi=dpi, **kwargs))
+
+def get_figure_cache_stats():
+    """获取内存层图形缓存的命中/未命中/淘汰计数"""
+    return _figure_cache.stats()
+
+def get_disk_cache_stats():
+    """获取磁盘层图形缓存的命中/未命中/淘汰计数"""
+    return _get_disk_cache().stats()
+
+def get_disk_cache_dir():
+    """磁盘层当前版本的缓存目录"""
+    return _get_disk_cache().directory
+
+def clear_figure_cache(disk=False):
+    """清空图形缓存
+
+    Args:
+        disk: 是否同时清空磁盘层
+    """
+    _figure_cache.clear()
+    if disk:
+        _get_disk_cache().clear()
@@ -0,0 +1,238 @@
+"""
+几何场景与浏览器端渲染
+
+几何页面的图形除了用 Matplotlib 在服务器端栅格化为 PNG，还可以描述为
+与渲染方式无关的场景（折线/多边形、点、文字及其样式），编译为 Vega-Lite
+规格交给 st.vega_lite_chart 在浏览器中绘制。这种方式下服务器每次交互只需
+生成几组顶点坐标，不调用 Matplotlib，传输的是几 KB 的 JSON 而不是图像；
+中文文字由浏览器字体显示，不依赖服务器上的中文字体。
+
+渲染方式按页面在侧边栏选择，默认值可用环境变量
+STREAMLIT_MATH_RENDER_BACKEND（matplotlib 或 vega-lite）设置。
+"""
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+import streamlit as st
+
+from src.utils.figure_cache import show_figure
+
+# 渲染方式：标识 -> 侧边栏显示名称
+RENDER_BACKENDS = {
+    "matplotlib": "图像（Matplotlib）",
+    "vega-lite": "矢量（浏览器渲染）",
+}
+DEFAULT_RENDER_BACKEND = os.environ.get("STREAMLIT_MATH_RENDER_BACKEND", "matplotlib")
+
+# 图表绘图区的默认宽度（像素），高度按坐标范围等比例计算
+DEFAULT_CHART_WIDTH = 420
+
+# 圆周采样点数
+CIRCLE_SEGMENTS = 96
+
+# 坐标保留的小数位数，足以在屏幕上精确定位，又能减小 JSON 体积
+COORDINATE_DIGITS = 4
+
+# Matplotlib 单字母颜色在 Vega-Lite 中的对应值
+_COLOR_NAMES = {"b": "blue", "g": "green", "r": "red", "c": "cyan", "m": "magenta",
+                "y": "gold", "k": "black", "w": "white"}
+
+# 线型到 strokeDash 的对应
+_DASHES = {"--": [6, 4], ":": [2, 3], "-.": [6, 3, 2, 3]}
+
+def _color(value):
+    return _COLOR_NAMES.get(value, value)
+
+@dataclass
+class Polyline:
+    """折线；closed 为 True 时首尾相连，可填充"""
+    points: np.ndarray
+    color: str = "blue"
+    width: float = 1.5
+    dash: Optional[str] = None
+    opacity: float = 1.0
+    fill: Optional[str] = None
+    fill_opacity: float = 0.0
+    closed: bool = False
+    label: Optional[str] = None
+
+@dataclass
+class Points:
+    """散点"""
+    points: np.ndarray
+    color: str = "black"
+    size: float = 40
+    label: Optional[str] = None
+
+@dataclass
+class Text:
+    """文字标注，(x, y) 为文字左下角"""
+    x: float
+    y: float
+    text: str
+    size: float = 12
+    color: str = "black"
+
+@dataclass
+class Scene:
+    """与渲染方式无关的二维几何场景（等比例坐标轴）"""
+    xlim: Tuple[float, float]
+    ylim: Tuple[float, float]
+    title: str = ""
+    xlabel: str = ""
+    ylabel: str = ""
+    grid: bool = True
+    primitives: List[object] = field(default_factory=list)
+
+    def polyline(self, points, **style):
+        """添加折线或多边形，样式参数见 Polyline"""
+        self.primitives.append(Polyline(np.asarray(points, dtype=float), **style))
+
+    def circle(self, center, radius, segments=CIRCLE_SEGMENTS, **style):
+        """添加圆（按 segments 段折线近似）"""
+        theta = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+        points = np.column_stack((center[0] + radius * np.cos(theta), center[1] + radius * np.sin(theta)))
+        self.polyline(points, closed=True, **style)
+
+    def points(self, points, **style):
+        """添加散点，样式参数见 Points"""
+        self.primitives.append(Points(np.atleast_2d(np.asarray(points, dtype=float)), **style))
+
+    def text(self, x, y, text, **style):
+        """添加文字，样式参数见 Text"""
+        self.primitives.append(Text(float(x), float(y), text, **style))
+
+    def axis_lines(self, opacity=0.3):
+        """添加过原点的水平与竖直参考线"""
+        self.polyline([[self.xlim[0], 0], [self.xlim[1], 0]], color="black", width=1, opacity=opacity)
+        self.polyline([[0, self.ylim[0]], [0, self.ylim[1]]], color="black", width=1, opacity=opacity)
+
+def _rows(points, closed, label=None):
+    """顶点数组 -> Vega-Lite 数据行，i 为绘制顺序，k 为图例标签"""
+    points = np.round(points, COORDINATE_DIGITS)
+    if closed and len(points):
+        points = np.vstack((points, points[:1]))
+    rows = [{"x": float(x), "y": float(y), "i": i} for i, (x, y) in enumerate(points)]
+    if label:
+        for row in rows:
+            row["k"] = label
+    return rows
+
+def _legend_encoding(legend_scale):
+    """有标签的图元共用同一个颜色比例尺，合并为一个图例"""
+    return {"color": {"field": "k", "type": "nominal", "scale": legend_scale,
+                      "legend": {"title": None, "orient": "top-right", "fillColor": "white"}}}
+
+def _layer(primitive, legend_scale):
+    """把一个图元编译为 Vega-Lite 图层"""
+    if isinstance(primitive, Polyline):
+        mark = {"type": "line", "stroke": _color(primitive.color), "strokeWidth": primitive.width,
+                "opacity": primitive.opacity, "clip": True}
+        if primitive.dash in _DASHES:
+            mark["strokeDash"] = _DASHES[primitive.dash]
+        if primitive.fill is not None:
+            mark["fill"] = _color(primitive.fill)
+            mark["fillOpacity"] = primitive.fill_opacity
+        encoding = {"order": {"field": "i", "type": "quantitative"}}
+        if primitive.label:
+            del mark["stroke"]
+            encoding.update(_legend_encoding(legend_scale))
+        rows = _rows(primitive.points, primitive.closed, primitive.label)
+        return {"data": {"values": rows}, "mark": mark, "encoding": encoding}
+
+    if isinstance(primitive, Points):
+        mark = {"type": "circle", "size": primitive.size, "opacity": 1, "color": _color(primitive.color)}
+        encoding = {}
+        if primitive.label:
+            del mark["color"]
+            encoding.update(_legend_encoding(legend_scale))
+        return {"data": {"values": _rows(primitive.points, False, primitive.label)}, "mark": mark, "encoding": encoding}
+
+    if isinstance(primitive, Text):
+        return {
+            "data": {"values": [{"x": round(primitive.x, COORDINATE_DIGITS),
+                                 "y": round(primitive.y, COORDINATE_DIGITS), "t": primitive.text}]},
+            "mark": {"type": "text", "align": "left", "baseline": "bottom",
+                     "fontSize": primitive.size, "color": _color(primitive.color)},
+            "encoding": {"text": {"field": "t", "type": "nominal"}},
+        }
+    raise TypeError(f"未知的图元类型：{type(primitive).__name__}")
+
+def _scene_spec(scene, width):
+    """单个场景 -> 分层的 Vega-Lite 规格（不含 $schema）"""
+    xspan = scene.xlim[1] - scene.xlim[0]
+    yspan = scene.ylim[1] - scene.ylim[0]
+    axis = {"grid": scene.grid, "gridOpacity": 0.4}
+    labeled = [p for p in scene.primitives if getattr(p, "label", None)]
+    legend_scale = {"domain": [p.label for p in labeled], "range": [_color(p.color) for p in labeled]}
+    spec = {
+        "width": width,
+        "height": round(width * yspan / xspan),
+        "encoding": {
+            "x": {"field": "x", "type": "quantitative", "title": scene.xlabel or None,
+                  "scale": {"domain": list(scene.xlim), "nice": False, "zero": False}, "axis": axis},
+            "y": {"field": "y", "type": "quantitative", "title": scene.ylabel or None,
+                  "scale": {"domain": list(scene.ylim), "nice": False, "zero": False}, "axis": axis},
+        },
+        "layer": [_layer(primitive, legend_scale) for primitive in scene.primitives],
+    }
+    if scene.title:
+        spec["title"] = scene.title
+    return spec
+
+def scene_to_vega_lite(scenes, width=DEFAULT_CHART_WIDTH):
+    """把场景编译为 Vega-Lite 规格
+
+    Args:
+        scenes: Scene，或并排显示的多个 Scene
+        width: 每个场景绘图区的宽度（像素）
+
+    Returns:
+        dict: Vega-Lite 规格
+    """
+    if isinstance(scenes, Scene):
+        spec = _scene_spec(scenes, width)
+    else:
+        spec = {"hconcat": [_scene_spec(scene, width) for scene in scenes]}
+    spec["$schema"] = "https://vega.github.io/schema/vega-lite/v5.json"
+    spec["background"] = "white"
+    return spec
+
+def show_scene(scenes, width=DEFAULT_CHART_WIDTH):
+    """在浏览器中渲染场景"""
+    st.vega_lite_chart(scene_to_vega_lite(scenes, width), theme=None)
+
+def select_render_backend(page_key):
+    """在侧边栏选择本页面的渲染方式
+
+    Args:
+        page_key: 页面标识，每个页面独立保存选择
+
+    Returns:
+        str: "matplotlib" 或 "vega-lite"
+    """
+    options = list(RENDER_BACKENDS)
+    default = DEFAULT_RENDER_BACKEND if DEFAULT_RENDER_BACKEND in RENDER_BACKENDS else "matplotlib"
+    return st.sidebar.radio(
+        "渲染方式",
+        options,
+        index=options.index(default),
+        format_func=RENDER_BACKENDS.get,
+        key=f"{page_key}_render_backend",
+        help="浏览器渲染只传输顶点与样式，交互时服务器几乎不占用 CPU",
+    )
+
+def show_geometry(draw_func, scene_func, *args, backend="matplotlib", width=DEFAULT_CHART_WIDTH, **kwargs):
+    """按渲染方式显示几何图形
+
+    Args:
+        draw_func: 返回 Matplotlib 图形的绘图函数（经 show_figure 缓存）
+        scene_func: 参数相同、返回 Scene（或 Scene 列表）的场景函数
+        backend: "matplotlib" 或 "vega-lite"
+    """
+    if backend == "vega-lite":
+        show_scene(scene_func(*args, **kwargs), width)
+    else:
+        show_figure(draw_func, *args, **kwargs)
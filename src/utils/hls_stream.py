@@ -0,0 +1,193 @@
+"""
+逐帧流式输出（HLS / 分片 MP4）
+
+整段渲染要等 MP4 完全写完才能交给 st.video。流式输出把渲染器产生的每一帧
+直接送入本地 ffmpeg，编码为分片 MP4（fMP4）分段的 HLS 事件流：
+
+    static/streams/<任务>/index.m3u8   播放列表，随分段完成追加，结束时写入 #EXT-X-ENDLIST
+    static/streams/<任务>/init.mp4     初始化分段
+    static/streams/<任务>/seg0000.m4s  媒体分段，每段 SEGMENT_SECONDS 秒，都从关键帧开始
+
+流目录由 Streamlit 的静态文件服务提供（.streamlit/config.toml 中
+server.enableStaticServing = true），页面在第一个分段完成后即可开始播放：
+内嵌脚本用 MediaSource 逐段下载并追加分段，不依赖 CDN 上的播放器，可以离线使用。
+Streamlit 对图片以外的静态文件一律返回 text/plain，脚本按字节读取分段不受影响；
+只有不支持 MediaSource 的浏览器才退回原生 HLS 播放。
+结束后 init.mp4 与全部分段按顺序拼接即为完整的分片 MP4，可以存入视频缓存。
+"""
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+from src.utils.static_files import STATIC_ROOT, static_url, task_directory
+
+STREAM_ROOT = STATIC_ROOT / "streams"
+
+# 分段时长（秒）：越短首个分段越早完成，但分段数与请求数越多
+SEGMENT_SECONDS = 1
+
+# 流目录的保留时间（秒），之后在新建流时删除
+STREAM_RETENTION_S = 3600
+
+# 播放器轮询播放列表的间隔（毫秒）
+PLAYER_POLL_MS = 500
+
+PLAYLIST_NAME = "index.m3u8"
+INIT_SEGMENT_NAME = "init.mp4"
+
+# 与编码参数（H.264 High Profile，Level 4.2，足够 1080p60）对应的 MediaSource 编解码器
+STREAM_CODECS = 'video/mp4; codecs="avc1.64002a"'
+
+def hls_command(directory, width, height, fps, ffmpeg="ffmpeg", segment_seconds=SEGMENT_SECONDS):
+    """ffmpeg 命令：从标准输入读取 RGBA 原始帧，输出 fMP4 分段的 HLS 事件流
+
+    关键帧间隔固定为一个分段的帧数，且关闭场景切换检测，每个分段都从关键帧开始、可以单独解码。
+    """
+    directory = Path(directory)
+    gop = max(1, round(fps * segment_seconds))
+    return [
+        ffmpeg, "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+        "-an", "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p",
+        "-profile:v", "high", "-level", "4.2",
+        "-g", str(gop), "-keyint_min", str(gop), "-sc_threshold", "0",
+        "-f", "hls", "-hls_time", str(segment_seconds), "-hls_playlist_type", "event",
+        "-hls_segment_type", "fmp4", "-hls_fmp4_init_filename", INIT_SEGMENT_NAME,
+        # temp_file：分段写完后才改名出现在目录与播放列表中
+        "-hls_flags", "independent_segments+temp_file",
+        "-hls_segment_filename", str(directory / "seg%04d.m4s"),
+        str(directory / PLAYLIST_NAME),
+    ]
+
+class HLSWriter:
+    """把 RGBA 帧逐帧送入 ffmpeg，编码为 HLS 流"""
+
+    def __init__(self, directory, width, height, fps, ffmpeg="ffmpeg"):
+        """
+        Args:
+            directory: 流目录（不存在时创建）
+            width, height: 帧尺寸（像素）
+            fps: 帧率
+            ffmpeg: ffmpeg 可执行文件
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.frames = 0
+        # 流目录对外公开，ffmpeg 的错误输出（含主机路径与编码器信息）写入私有的临时文件
+        self._log = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            hls_command(self.directory, width, height, fps, ffmpeg),
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._log,
+        )
+
+    def write(self, frame, num_frames=1):
+        """写入一帧（H×W×4 的 uint8 数组），num_frames 为重复次数"""
+        data = frame.tobytes()
+        for _ in range(num_frames):
+            self.process.stdin.write(data)
+        self.frames += num_frames
+
+    def close(self):
+        """结束输入并等待 ffmpeg 写完最后一个分段与 #EXT-X-ENDLIST"""
+        if self.process.stdin and not self.process.stdin.closed:
+            self.process.stdin.close()
+        returncode = self.process.wait()
+        self._log.seek(0)
+        log = self._log.read().decode("utf-8", errors="replace").strip().splitlines()
+        self._log.close()
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg 编码失败（返回码 {returncode}）：{log[-1] if log else ''}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.process.kill()
+            self.process.wait()
+            self._log.close()
+
+    def fmp4_bytes(self):
+        """初始化分段与全部媒体分段按顺序拼接得到的完整分片 MP4"""
+        segments, _ = read_playlist(self.directory)
+        parts = [self.directory / INIT_SEGMENT_NAME] + [self.directory / name for name in segments]
+        return b"".join(path.read_bytes() for path in parts)
+
+def read_playlist(directory):
+    """读取流目录的播放列表
+
+    Returns:
+        tuple: (已完成的分段文件名列表, 流是否已结束)；播放列表尚未生成时为 ([], False)
+    """
+    try:
+        text = (Path(directory) / PLAYLIST_NAME).read_text()
+    except OSError:
+        return [], False
+    segments = [line.strip() for line in text.splitlines() if line.strip() and not line.startswith("#")]
+    return segments, "#EXT-X-ENDLIST" in text
+
+def first_segment_time(directory):
+    """第一个分段完成的时间（time.time() 时间戳），尚未完成时返回 None"""
+    segments, _ = read_playlist(directory)
+    if not segments:
+        return None
+    try:
+        return os.stat(Path(directory) / segments[0]).st_mtime
+    except OSError:
+        return None
+
+def stream_directory(key):
+    """任务的流目录，同时删除超过保留时间的旧流"""
+    return task_directory(STREAM_ROOT.name, key, STREAM_RETENTION_S)
+
+def stream_url(directory):
+    """流目录对应的静态文件 URL（以 / 结尾）"""
+    return static_url(directory) + "/"
+
+_PLAYER_TEMPLATE = """
+<video id="stream" controls autoplay muted playsinline style="width: 100%; background: black"></video>
+<script>
+const base = "__BASE__";
+const video = document.getElementById("stream");
+if (!(window.MediaSource && MediaSource.isTypeSupported('__CODECS__'))) {
+  video.src = base + "__PLAYLIST__";
+} else {
+  const source = new MediaSource();
+  video.src = URL.createObjectURL(source);
+  source.addEventListener("sourceopen", async () => {
+    const buffer = source.addSourceBuffer('__CODECS__');
+    const append = (data) => new Promise((resolve) => {
+      buffer.addEventListener("updateend", resolve, {once: true});
+      buffer.appendBuffer(data);
+    });
+    const load = async (name) => (await fetch(base + name, {cache: "no-store"})).arrayBuffer();
+    await append(await load("__INIT__"));
+    let next = 0;
+    for (;;) {
+      const playlist = await (await fetch(base + "__PLAYLIST__", {cache: "no-store"})).text();
+      const segments = playlist.split("\\n").map((line) => line.trim()).filter((line) => line && !line.startsWith("#"));
+      for (; next < segments.length; next++) {
+        await append(await load(segments[next]));
+      }
+      if (playlist.includes("#EXT-X-ENDLIST")) {
+        source.endOfStream();
+        break;
+      }
+      await new Promise((resolve) => setTimeout(resolve, __POLL_MS__));
+    }
+  });
+}
+</script>
+"""
+
+def stream_player_html(url):
+    """播放 HLS 流的 HTML（边下载边播放，直到播放列表结束）"""
+    return (_PLAYER_TEMPLATE
+            .replace("__BASE__", url)
+            .replace("__PLAYLIST__", PLAYLIST_NAME)
+            .replace("__INIT__", INIT_SEGMENT_NAME)
+            .replace("__CODECS__", STREAM_CODECS)
+            .replace("__POLL_MS__", str(PLAYER_POLL_MS)))
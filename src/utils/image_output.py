@@ -0,0 +1,322 @@
+"""
+图像输出策略
+
+所有 Matplotlib 图形都经由本模块编码并显示，按显示容器的宽度选择分辨率，
+按图形内容选择格式，并统计每种格式的字节数与编码耗时。
+
+1. 分辨率：目标像素宽度 = 主区域宽度 ÷ 列数 × 设备像素比，且不超过 st.image
+   的最大宽度（更宽的图像会被 Streamlit 缩小后重新编码）；DPI = 目标宽度 ÷ 图形宽度
+2. 格式（fmt="auto"）：
+   - 位图一律输出调色板 PNG：颜色不超过 256 种时无损，否则用八叉树量化为 256 色
+     （每个通道误差不超过约 15/255），体积约为真彩色 PNG 的 1/3，编码也更快
+   - 只有线条、没有图像的图形，按顶点与文字数估算 SVG 体积；估算比 PNG 小时
+     再实际输出 SVG，取传输体积较小的一个（SVG 以 base64 内嵌，按 4/3 计）
+   - 也可以显式指定 "png"（无损真彩色）、"png-opt"（调色板 PNG）、"svg"、"webp"
+3. 显示：PNG 以 output_format="PNG" 交给 st.image，避免 RGB 图像被转码为 JPEG；
+   st.image 不接受 WebP 字节（会转为 PNG/JPEG），WebP 以 data URI 嵌入
+
+屏幕宽度与设备像素比无法从服务器端得知，用环境变量
+STREAMLIT_MATH_CONTENT_WIDTH（CSS 像素）与 STREAMLIT_MATH_PIXEL_RATIO 设置。
+"""
+import base64
+import io
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+
+import numpy as np
+import streamlit as st
+from matplotlib.collections import Collection
+from matplotlib.image import AxesImage
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch
+from matplotlib.text import Text
+from PIL import Image
+
+from src.utils.blit_renderer import get_blit_renderer
+from src.utils.visualization import FIGURE_DEBUG
+
+# 可选的输出格式
+IMAGE_FORMATS = ("auto", "png", "png-opt", "svg", "webp")
+
+# 宽屏布局下主区域的宽度（CSS 像素）与设备像素比
+CONTENT_WIDTH_PX = int(os.environ.get("STREAMLIT_MATH_CONTENT_WIDTH", "1000"))
+PIXEL_RATIO = float(os.environ.get("STREAMLIT_MATH_PIXEL_RATIO", "2"))
+
+# st.image 的最大宽度（streamlit.elements.image.MAXIMUM_CONTENT_WIDTH）
+MAX_IMAGE_WIDTH = 2 * 730
+
+# DPI 范围，上限与 st.pyplot 的默认值一致
+MIN_DPI = 50
+MAX_DPI = 200
+
+# PNG 压缩级别：6 以上耗时成倍增加，体积只减小不到 10%
+PNG_COMPRESS_LEVEL = 6
+
+# WebP：位图有损压缩，线条图无损压缩
+WEBP_QUALITY = 90
+WEBP_METHOD = 4
+
+# SVG 体积估算：固定开销 + 每个显示的坐标轴（刻度与刻度标签）+ 每个顶点 + 每个字符（字形轮廓）
+SVG_BASE_BYTES = 1_500
+SVG_BYTES_PER_AXES = 14_000
+SVG_BYTES_PER_VERTEX = 40
+SVG_BYTES_PER_CHAR = 150
+# 顶点数超过该值时不尝试 SVG（散点图的 SVG 可达数十 MB，编码需数秒）
+SVG_MAX_VERTICES = 50_000
+
+def target_width_px(columns=1):
+    """图形所在容器的目标像素宽度
+
+    Args:
+        columns: 容器把主区域等分为几列（图形占其中一列）
+    """
+    return min(MAX_IMAGE_WIDTH, round(CONTENT_WIDTH_PX / columns * PIXEL_RATIO))
+
+def resolve_dpi(fig_width_in, columns=1):
+    """按容器宽度计算输出分辨率
+
+    Args:
+        fig_width_in: 图形宽度（英寸）
+        columns: 容器把主区域等分为几列
+
+    Returns:
+        int: DPI
+    """
+    return int(min(MAX_DPI, max(MIN_DPI, target_width_px(columns) / fig_width_in)))
+
+def displayed_in_columns(columns):
+    """装饰器：声明绘图函数的图形显示在几列布局中的一列
+
+    show_figure 与离线预渲染都按这里声明的列数计算分辨率，两者的缓存键一致。
+    """
+    def decorator(func):
+        func.display_columns = columns
+        return func
+    return decorator
+
+@dataclass(frozen=True)
+class FigureContent:
+    """图形内容的统计，用于选择格式"""
+    vertices: int = 0  # 线条、多边形与散点的顶点数
+    images: int = 0    # 位图（imshow）数量
+    chars: int = 0     # 可见文字的字符数
+    axes: int = 0      # 显示坐标轴（刻度）的子图数
+
+    @property
+    def line_art(self):
+        """只有矢量元素"""
+        return self.images == 0
+
+    def svg_estimate(self):
+        """SVG 体积的粗略估算（字节）"""
+        return (SVG_BASE_BYTES + self.axes * SVG_BYTES_PER_AXES
+                + self.vertices * SVG_BYTES_PER_VERTEX + self.chars * SVG_BYTES_PER_CHAR)
+
+def _collection_vertices(collection):
+    paths = collection.get_paths()
+    offsets = collection.get_offsets()
+    if offsets is not None and len(offsets) > 1 and len(paths) <= 1:
+        # 散点：同一个标记按偏移量重复绘制
+        return len(offsets)
+    return sum(len(path.vertices) for path in paths)
+
+def analyze_figure(fig):
+    """统计图形中的顶点、位图与文字
+
+    Returns:
+        FigureContent: 统计结果
+    """
+    vertices = images = chars = axes = 0
+    hidden = set()  # 关闭坐标轴后不绘制的刻度文字
+    for ax in fig.axes:
+        if ax.axison:
+            axes += 1
+        else:
+            hidden.update(ax.xaxis.findobj(Text) + ax.yaxis.findobj(Text))
+        for artist in ax.get_children():
+            if not artist.get_visible():
+                continue
+            if isinstance(artist, Line2D):
+                vertices += len(artist.get_xdata(orig=False))
+            elif isinstance(artist, Collection):
+                vertices += _collection_vertices(artist)
+            elif isinstance(artist, Patch):
+                vertices += len(artist.get_path().vertices)
+            elif isinstance(artist, AxesImage):
+                images += 1
+    for text in fig.findobj(Text):
+        if text.get_visible() and text not in hidden:
+            chars += len(text.get_text())
+    return FigureContent(vertices, images, chars, axes)
+
+@dataclass
+class FormatStats:
+    """一种输出格式的累计统计"""
+    figures: int = 0
+    bytes: int = 0
+    raster_ms: float = 0.0  # 栅格化（或位块传输）耗时
+    encode_ms: float = 0.0  # 编码耗时
+
+    @property
+    def bytes_per_figure(self):
+        return self.bytes / self.figures if self.figures else 0.0
+
+    @property
+    def ms_per_figure(self):
+        return (self.raster_ms + self.encode_ms) / self.figures if self.figures else 0.0
+
+_stats_lock = threading.Lock()
+_stats = {}  # 格式 -> FormatStats
+
+def _record(fmt, nbytes, raster_ms, encode_ms):
+    with _stats_lock:
+        stats = _stats.setdefault(fmt, FormatStats())
+        stats.figures += 1
+        stats.bytes += nbytes
+        stats.raster_ms += raster_ms
+        stats.encode_ms += encode_ms
+
+def get_image_stats():
+    """各输出格式的累计统计快照 {格式: FormatStats}"""
+    with _stats_lock:
+        return {fmt: replace(stats) for fmt, stats in _stats.items()}
+
+def reset_image_stats():
+    """清空统计"""
+    with _stats_lock:
+        _stats.clear()
+
+def rasterize(fig, dpi):
+    """把图形栅格化为 RGB 数组（按内容紧凑裁剪）
+
+    启用了位块传输的模板图形只重绘动态部分；其余图形以不压缩的 PNG
+    经 savefig(bbox_inches="tight") 输出后解码，与直接保存的结果逐像素一致。
+    """
+    renderer = get_blit_renderer(fig)
+    if renderer is not None:
+        return np.ascontiguousarray(renderer.render_rgba(dpi)[..., :3])
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight", pil_kwargs={"compress_level": 0})
+    buffer.seek(0)
+    with Image.open(buffer) as image:
+        return np.asarray(image.convert("RGB"))
+
+def _palette_image(rgb):
+    """RGB 数组 -> 调色板图像；不超过 256 种颜色时无损"""
+    image = Image.fromarray(rgb)
+    colors = image.getcolors(256)
+    if colors is None:
+        return image.quantize(256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    # 精确调色板：按打包后的颜色值查找索引
+    palette = np.array(sorted(color for _, color in colors), dtype=np.uint8)
+    keys = (palette[:, 0].astype(np.uint32) << 16) | (palette[:, 1].astype(np.uint32) << 8) | palette[:, 2]
+    packed = (rgb[..., 0].astype(np.uint32) << 16) | (rgb[..., 1].astype(np.uint32) << 8) | rgb[..., 2]
+    indexed = Image.fromarray(np.searchsorted(keys, packed).astype(np.uint8))
+    indexed.putpalette(palette.tobytes())  # 灰度图像设置调色板后成为调色板图像
+    return indexed
+
+def encode_png(rgb, palette=True):
+    """编码 PNG
+
+    Args:
+        rgb: RGB 数组
+        palette: 是否转为调色板 PNG
+    """
+    image = _palette_image(rgb) if palette else Image.fromarray(rgb)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=PNG_COMPRESS_LEVEL)
+    return buffer.getvalue()
+
+def encode_webp(rgb, lossless=False):
+    """编码 WebP"""
+    buffer = io.BytesIO()
+    Image.fromarray(rgb).save(buffer, format="WEBP", lossless=lossless, quality=WEBP_QUALITY, method=WEBP_METHOD)
+    return buffer.getvalue()
+
+def encode_svg(fig):
+    """编码 SVG（文字输出为字形轮廓，不依赖浏览器字体）"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="svg", bbox_inches="tight")
+    return buffer.getvalue()
+
+def encode_figure(fig, fmt="auto", dpi=None, columns=1):
+    """按输出策略编码图形（不释放图形）
+
+    Args:
+        fig: Matplotlib 图形
+        fmt: 输出格式，见 IMAGE_FORMATS
+        dpi: 输出分辨率，None 表示按容器宽度计算
+        columns: 容器把主区域等分为几列
+
+    Returns:
+        bytes: 图像字节，格式可用 detect_format 识别
+    """
+    if fmt not in IMAGE_FORMATS:
+        raise ValueError(f"不支持的输出格式：{fmt}，可选 {IMAGE_FORMATS}")
+    if dpi is None:
+        dpi = resolve_dpi(fig.get_size_inches()[0], columns)
+
+    start = time.perf_counter()
+    if fmt == "svg":
+        data = encode_svg(fig)
+        _record("svg", len(data), 0.0, (time.perf_counter() - start) * 1000)
+        return data
+
+    rgb = rasterize(fig, dpi)
+    raster_done = time.perf_counter()
+    content = analyze_figure(fig) if fmt in ("auto", "webp") else None
+    if fmt == "webp":
+        data, emitted = encode_webp(rgb, lossless=content.line_art), "webp"
+    else:
+        data, emitted = encode_png(rgb, palette=fmt != "png"), fmt
+    raster_ms = (raster_done - start) * 1000
+    encode_ms = (time.perf_counter() - raster_done) * 1000
+
+    # 线条图的 SVG 可能更小；逐帧渲染的模板图形保持位图，不增加每帧延迟
+    if (fmt == "auto" and content.line_art and get_blit_renderer(fig) is None
+            and content.vertices <= SVG_MAX_VERTICES and content.svg_estimate() * 4 / 3 < len(data)):
+        svg_start = time.perf_counter()
+        svg = encode_svg(fig)
+        encode_ms += (time.perf_counter() - svg_start) * 1000
+        if len(svg) * 4 / 3 < len(data):
+            data, emitted = svg, "svg"
+    if emitted == "auto":
+        emitted = "png-opt"
+    _record(emitted, len(data), raster_ms, encode_ms)
+    return data
+
+def detect_format(data):
+    """按文件头识别图像格式（png、webp 或 svg）"""
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return "svg"
+
+def show_image(data):
+    """在页面上显示 encode_figure 输出的图像，宽度与容器一致"""
+    fmt = detect_format(data)
+    if fmt == "png":
+        st.image(data, output_format="PNG", use_column_width=True)
+    elif fmt == "webp":
+        encoded = base64.b64encode(data).decode("ascii")
+        st.html(f'<img src="data:image/webp;base64,{encoded}" style="width: 100%">')
+    else:
+        st.image(data.decode("utf-8"), use_column_width=True)
+
+def emit_figure(fig, fmt="auto", dpi=None, columns=1):
+    """编码并显示图形，用于替代 st.pyplot（不经过缓存，不释放图形）
+
+    参数与 encode_figure 相同。
+    """
+    show_image(encode_figure(fig, fmt, dpi, columns))
+
+def report_image_stats():
+    """调试模式（STREAMLIT_MATH_FIGURE_DEBUG）下在侧边栏显示各格式的平均体积与耗时"""
+    if not FIGURE_DEBUG:
+        return
+    for fmt, stats in sorted(get_image_stats().items()):
+        st.sidebar.caption(f"{fmt}：{stats.figures} 张，平均 {stats.bytes_per_figure / 1024:.1f} KB，"
+                           f"{stats.ms_per_figure:.0f} ms")
@@ -1,9 +1,15 @@
 # src/utils/page_config.py
 
+import importlib
+import sys
+import threading
+import time
 from enum import Enum
 from dataclasses import dataclass
 from typing import Callable, Optional
 
+from src.utils import startup_profiler
+
 @dataclass
 class PageInfo:
     """页面信息类"""
@@ -11,6 +17,15 @@ class PageInfo:
     file_path: str            # 文件路径
     handler: Optional[str]     # 处理函数名
     description: str          # 页面描述
+    prerender: Optional[str] = None  # 预渲染参数网格函数名
+
+@dataclass
+class ImportRecord:
+    """页面模块首次导入的耗时记录"""
+    page_id: "PageID"
+    module: str                # 模块名
+    seconds: float             # 导入耗时（含其依赖中首次导入的模块）
+    new_modules: int           # 本次导入新加载的模块数
 
 class PageID(Enum):
     """页面ID枚举"""
@@ -38,25 +53,29 @@ PAGES = {
         display_name="几何/多边形",
         file_path="pages.geometry.polygons",
         handler="show_polygons_page",
-        description="多边形的性质与构造"
+        description="多边形的性质与构造",
+        prerender="get_prerender_grid"
     ),
     PageID.GEOMETRY_CIRCLE: PageInfo(
         display_name="几何/圆",
         file_path="pages.geometry.circles",
         handler="show_circles_page",
-        description="圆的性质与应用"
+        description="圆的性质与应用",
+        prerender="get_prerender_grid"
     ),
     PageID.GEOMETRY_ANGLE: PageInfo(
         display_name="几何/角",
         file_path="pages.geometry.angles",
         handler="show_angles_page",
-        description="认识角的概念与度量"
+        description="认识角的概念与度量",
+        prerender="get_prerender_grid"
     ),
     PageID.GEOMETRY_TRIANGLE: PageInfo(
         display_name="几何/三角形",
         file_path="pages.geometry.triangles",
         handler="show_triangles_page",
-        description="三角形的性质与构造"
+        description="三角形的性质与构造",
+        prerender="get_prerender_grid"
     ),
     PageID.GEOMETRY_CUBOID: PageInfo(
         display_name="几何/长方体",
@@ -68,12 +87,13 @@ PAGES = {
         display_name="几何/分形",
         file_path="pages.geometry.fractals",
         handler="show_fractals_page",
-        description="分形图形的生成与性质"
+        description="分形图形的生成与性质",
+        prerender="get_prerender_grid"
     ),
     PageID.GEOMETRY_CURTAIN: PageInfo(
         display_name="几何/窗帘模型",
         file_path="pages.geometry.curtain_model",
-        handler="render_curtain_page",
+        handler="render_curtain_page_with_quiz",
         description="窗帘模型与伸缩变换"
     ),
     PageID.MANIM_EXAMPLES: PageInfo(
@@ -85,19 +105,83 @@ PAGES = {
     # ... 其他页面配置
 }
 
+# 显示名称 -> 页面ID，模块加载时构建一次
+_DISPLAY_NAME_INDEX = {info.display_name: page_id for page_id, info in PAGES.items()}
+
+# 已解析的页面处理函数与导入耗时记录（进程级，跨会话、跨重运行共享）
+_handlers: dict[PageID, Callable] = {}
+_import_records: list[ImportRecord] = []
+_handlers_lock = threading.Lock()
+
 def get_page_handler(page_id: PageID) -> Callable:
-    """获取页面处理函数"""
-    page_info = PAGES[page_id]
-    module = __import__(f"src.{page_info.file_path}", fromlist=[page_info.handler])
-    return getattr(module, page_info.handler)
+    """获取页面处理函数
+
+    只在第一次访问某个页面时导入其模块，之后直接返回缓存的处理函数，
+    未访问的页面不会被导入。
+    """
+    handler = _handlers.get(page_id)
+    if handler is not None:
+        return handler
+
+    with _handlers_lock:
+        if page_id not in _handlers:
+            page_info = PAGES[page_id]
+            module_name = f"src.{page_info.file_path}"
+            loaded = len(sys.modules)
+            start = time.perf_counter()
+            with startup_profiler.section(module_name, kind="page_import"):
+                module = importlib.import_module(module_name)
+            _import_records.append(ImportRecord(
+                page_id=page_id,
+                module=module_name,
+                seconds=time.perf_counter() - start,
+                new_modules=len(sys.modules) - loaded,
+            ))
+            _handlers[page_id] = getattr(module, page_info.handler)
+        return _handlers[page_id]
+
+def get_import_report() -> list[ImportRecord]:
+    """获取页面模块的导入耗时记录（按首次访问顺序）"""
+    return list(_import_records)
 
 def get_page_id_by_display_name(display_name: str) -> Optional[PageID]:
     """通过显示名称获取页面ID"""
-    for page_id, info in PAGES.items():
-        if info.display_name == display_name:
-            return page_id
-    return None
+    return _DISPLAY_NAME_INDEX.get(display_name)
 
 def get_all_display_names() -> list[str]:
     """获取所有页面的显示名称"""
-    return [info.display_name for info in PAGES.values()]
\ No newline at end of file
+    return list(_DISPLAY_NAME_INDEX)
+
+def main():
+    """命令行入口：在新进程中依次导入全部页面，打印各页面模块的导入耗时
+
+    用法：
+        python -m src.utils.page_config
+
+    按页面配置顺序导入，每行的耗时只包含此前尚未加载的依赖。
+    """
+    start = time.perf_counter()
+    importlib.import_module("streamlit")
+    base = time.perf_counter() - start
+
+    print(f"{'页面':<22}{'模块':<36}{'耗时(ms)':>10}{'新模块数':>10}")
+    print("-" * 78)
+    print(f"{'(streamlit)':<22}{'streamlit':<36}{base * 1000:>10.1f}{'-':>10}")
+    for page_id in PAGES:
+        try:
+            get_page_handler(page_id)
+        except ImportError as e:
+            print(f"{page_id.value:<22}导入失败: {e}")
+            continue
+        record = get_import_report()[-1]
+        print(f"{record.page_id.value:<22}{record.module:<36}"
+              f"{record.seconds * 1000:>10.1f}{record.new_modules:>10}")
+
+    start = time.perf_counter()
+    from src.utils.plot_utils import configure_matplotlib_defaults
+    configure_matplotlib_defaults()
+    print(f"{'(首次绘图前)':<22}{'configure_matplotlib_defaults':<36}"
+          f"{(time.perf_counter() - start) * 1000:>10.1f}{'-':>10}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,53 +1,235 @@
+import matplotlib
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 import platform
 import os
+import hashlib
+import json
+import tempfile
+import threading
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Optional
+from src.utils.cache_paths import get_cache_dir
+from src.utils.startup_profiler import profiled
+
+# 各平台按优先级排列的中文字体文件
+FONT_PATHS = {
+    'Darwin': [
+        '/System/Library/Fonts/STHeiti Medium.ttc',
+        '/System/Library/Fonts/STHeiti Light.ttc',
+        '/System/Library/Fonts/PingFang.ttc',
+        '/Library/Fonts/Arial Unicode.ttf'
+    ],
+    'Linux': [
+        # Noto Sans CJK：Debian/Ubuntu（fonts-noto-cjk）、Arch、Fedora
+        '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
+        '/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc',
+        '/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc',
+        # 文泉驿微米黑 / 正黑
+        '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
+        '/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc',
+        '/usr/share/fonts/wenquanyi/wqy-microhei/wqy-microhei.ttc',
+        '/usr/share/fonts/wenquanyi/wqy-zenhei/wqy-zenhei.ttc',
+        '/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf'
+    ],
+    'Windows': [
+        'C:/Windows/Fonts/msyh.ttc',
+        'C:/Windows/Fonts/simhei.ttf',
+        'C:/Windows/Fonts/simsun.ttc'
+    ],
+}
+
+# 上述文件都不存在时，按字体族名称在 Matplotlib 的字体列表中查找
+FONT_FAMILIES = [
+    'PingFang SC', 'Heiti SC', 'STHeiti',
+    'Noto Sans CJK SC', 'Noto Sans SC', 'Source Han Sans SC',
+    'WenQuanYi Micro Hei', 'WenQuanYi Zen Hei',
+    'Microsoft YaHei', 'SimHei', 'Droid Sans Fallback', 'Arial Unicode MS'
+]
+
+# 字体目录：其中任一目录（或其直接子目录）有变化时重新解析字体
+FONT_DIRS = {
+    'Darwin': ['/System/Library/Fonts', '/Library/Fonts', '~/Library/Fonts'],
+    'Linux': ['/usr/share/fonts', '/usr/local/share/fonts', '~/.fonts', '~/.local/share/fonts'],
+    'Windows': ['C:/Windows/Fonts'],
+}
+
+# 字体索引格式版本，解析规则变化时递增
+FONT_INDEX_VERSION = 1
+
+# 全局默认样式，进程内只应用一次
+DEFAULT_RC = {
+    'axes.unicode_minus': False,  # 解决负号显示问题
+    'figure.figsize': [10, 6],
+    'figure.dpi': 100,
+    'axes.titlesize': 14,
+    'axes.labelsize': 12,
+    'legend.fontsize': 10,
+    'xtick.labelsize': 10,
+    'ytick.labelsize': 10,
+}
+
+@dataclass(frozen=True)
+class StyleProfile:
+    """单个图形的样式（不可变，可在多个线程之间共享）
+
+    创建图形时直接应用到 Figure 与 Axes 上，不读写全局 rcParams；
+    为 None 的字段沿用 DEFAULT_RC。
+    """
+    figsize: tuple = (10, 6)
+    dpi: int = 100
+    facecolor: str = 'white'
+    grid: Optional[bool] = None
+    label_size: Optional[float] = None
+    tick_label_size: Optional[float] = None
+
+    def replace(self, **changes):
+        """返回修改了部分字段的新样式"""
+        return replace(self, **changes)
+
+    def apply_to_axes(self, ax):
+        """把样式应用到坐标轴上"""
+        if self.grid is not None:
+            ax.grid(self.grid)
+        if self.label_size is not None:
+            ax.xaxis.label.set_size(self.label_size)
+            ax.yaxis.label.set_size(self.label_size)
+        if self.tick_label_size is not None:
+            ax.tick_params(labelsize=self.tick_label_size)
+
+# 默认样式，与 DEFAULT_RC 一致
+DEFAULT_STYLE = StyleProfile()
+
+_defaults_lock = threading.Lock()
+_default_font = None
+
+@dataclass(frozen=True)
+class FontResolution:
+    """中文字体的解析结果"""
+    path: Optional[str]    # 字体文件路径，None 表示没有找到中文字体
+    family: Optional[str]  # 字体族名称
+    source: str            # "index"（磁盘索引）、"path"（按路径探测）、"family"（按名称查找）或 "fallback"
+
+def _font_dirs():
+    """当前平台存在的字体目录及其直接子目录"""
+    dirs = []
+    for root in FONT_DIRS.get(platform.system(), []):
+        root = os.path.expanduser(root)
+        if not os.path.isdir(root):
+            continue
+        dirs.append(root)
+        try:
+            with os.scandir(root) as entries:
+                dirs.extend(sorted(entry.path for entry in entries if entry.is_dir()))
+        except OSError:
+            pass
+    return dirs
+
+def _font_index_key():
+    """字体索引的键：平台、Matplotlib 版本与字体目录的修改时间"""
+    dirs = []
+    for path in _font_dirs():
+        try:
+            dirs.append((path, os.stat(path).st_mtime_ns))
+        except OSError:
+            pass
+    payload = [FONT_INDEX_VERSION, platform.system(), matplotlib.__version__, dirs]
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+def _font_index_path():
+    return os.path.join(get_cache_dir("fonts"), "font_index.json")
+
+def _probe_chinese_font():
+    """探测中文字体：先查已知路径，再按字体族名称查找"""
+    for path in FONT_PATHS.get(platform.system(), []):
+        if os.path.exists(path):
+            return FontResolution(path, fm.FontProperties(fname=path).get_name(), "path")
+
+    available = {font.name: font.fname for font in fm.fontManager.ttflist}
+    for family in FONT_FAMILIES:
+        if family in available:
+            return FontResolution(available[family], family, "family")
+    return FontResolution(None, None, "fallback")
+
+def _read_font_index(path, key):
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("key") != key:
+        return None
+    if data.get("path") is not None and not os.path.exists(data["path"]):
+        return None
+    return FontResolution(data.get("path"), data.get("family"), "index")
+
+def _write_font_index(path, key, resolution):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "path": resolution.path, "family": resolution.family}, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass
+
+@lru_cache(maxsize=None)
+def resolve_chinese_font():
+    """解析中文字体
+
+    进程内只解析一次；结果按平台与字体目录写入磁盘索引，
+    后续进程在字体目录没有变化时直接读取，不再逐个探测字体文件。
+
+    Returns:
+        FontResolution: 解析结果
+    """
+    key = _font_index_key()
+    path = _font_index_path()
+    resolution = _read_font_index(path, key)
+    if resolution is None:
+        resolution = _probe_chinese_font()
+        _write_font_index(path, key, resolution)
+    return resolution
 
 def get_chinese_font():
     """获取系统中可用的中文字体"""
-    if platform.system() == 'Darwin':  # macOS
-        # 尝试常见的中文字体路径
-        font_paths = [
-            '/System/Library/Fonts/STHeiti Medium.ttc',
-            '/System/Library/Fonts/STHeiti Light.ttc',
-            '/System/Library/Fonts/PingFang.ttc',
-            '/Library/Fonts/Arial Unicode.ttf'
-        ]
-        
-        for path in font_paths:
-            if os.path.exists(path):
-                return fm.FontProperties(fname=path)
-    
+    resolution = resolve_chinese_font()
+    if resolution.path:
+        return fm.FontProperties(fname=resolution.path)
     # 如果找不到指定字体，返回系统默认字体
     return fm.FontProperties()
 
+@profiled("setup")
 def configure_matplotlib_defaults():
-    """配置matplotlib的默认设置，主要用于支持中文显示和统一样式"""
-    # 获取中文字体
-    chinese_font = get_chinese_font()
-    
-    # 设置全局字体
-    plt.rcParams['font.family'] = chinese_font.get_name()
-    plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
-    
-    # 设置图形样式
-    plt.style.use('default')  # 使用默认样式
-    
-    # 设置默认图形大小
-    plt.rcParams['figure.figsize'] = [10, 6]
-    
-    # 设置默认DPI（分辨率）
-    plt.rcParams['figure.dpi'] = 100
-    
-    # 设置标题和标签的字体大小
-    plt.rcParams['axes.titlesize'] = 14
-    plt.rcParams['axes.labelsize'] = 12
-    
-    # 设置图例字体大小
-    plt.rcParams['legend.fontsize'] = 10
-    
-    # 设置刻度标签字体大小
-    plt.rcParams['xtick.labelsize'] = 10
-    plt.rcParams['ytick.labelsize'] = 10
-    
-    return chinese_font  # 返回字体对象，以便在需要时使用
+    """配置matplotlib的默认设置，主要用于支持中文显示和统一样式
+
+    只在进程内第一次调用时真正执行（加锁，多个会话同时调用也只执行一次），
+    之后直接返回同一个字体对象，全局 rcParams 从此只读。
+    绘图函数应在开头调用它，而不是在模块导入时调用；
+    单个图形需要不同的样式时把 StyleProfile 传给 visualization.create_figure，
+    不要修改全局 rcParams。
+    """
+    global _default_font
+    if _default_font is not None:
+        return _default_font
+    with _defaults_lock:
+        if _default_font is None:
+            resolution = resolve_chinese_font()
+            rc = dict(DEFAULT_RC)
+            if resolution.family:
+                # 字体文件不在 Matplotlib 的扫描目录中时需要先注册，才能按名称使用
+                if resolution.family not in {font.name for font in fm.fontManager.ttflist}:
+                    fm.fontManager.addfont(resolution.path)
+                rc['font.family'] = resolution.family
+
+            # 设置图形样式
+            plt.style.use('default')  # 使用默认样式
+            matplotlib.rcParams.update(rc)
+            _default_font = get_chinese_font()  # 返回字体对象，以便在需要时使用
+    return _default_font
+
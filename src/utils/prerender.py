@@ -0,0 +1,125 @@
+"""
+图形预渲染命令行工具
+
+遍历 page_config.PAGES，按各页面声明的参数网格（PageInfo.prerender）
+在多个进程中并行渲染全部参数组合，写入磁盘图形缓存。
+部署前执行一次，线上请求即可直接读取缓存，不再调用 Matplotlib。
+
+用法：
+    python -m src.utils.prerender
+    python -m src.utils.prerender --pages geometry_polygon geometry_angle --workers 4
+"""
+import argparse
+import importlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import matplotlib
+matplotlib.use("Agg")
+
+from src.i18n.translations import TRANSLATIONS
+from src.utils import figure_cache
+from src.utils.image_output import IMAGE_FORMATS
+from src.utils.page_config import PAGES, PageID
+
+@dataclass
+class PageReport:
+    """单个页面的预渲染结果"""
+    page_id: PageID
+    figures: int = 0       # 参数组合总数
+    rendered: int = 0      # 实际渲染的数量（其余已在缓存中）
+    elapsed: float = 0.0   # 墙钟耗时（秒）
+    size_bytes: int = 0    # 图像总字节数
+
+def collect_page_grids(page_ids=None):
+    """收集页面声明的预渲染参数网格
+
+    Args:
+        page_ids: 需要预渲染的页面ID列表，默认全部页面
+
+    Returns:
+        list: [(page_id, [(绘图函数, 参数字典), ...]), ...]
+    """
+    grids = []
+    for page_id, page_info in PAGES.items():
+        if page_info.prerender is None:
+            continue
+        if page_ids and page_id not in page_ids:
+            continue
+        module = importlib.import_module(f"src.{page_info.file_path}")
+        grids.append((page_id, getattr(module, page_info.prerender)()))
+    return grids
+
+def _render_task(task):
+    """工作进程：渲染单个参数组合"""
+    func, kwargs, lang, theme, fmt, dpi = task
+    return figure_cache.prerender_figure(func, kwargs, lang, theme, fmt=fmt, dpi=dpi)
+
+def prerender_pages(page_ids=None, languages=None, theme="light",
+                    fmt=figure_cache.DEFAULT_FORMAT, dpi=None, workers=None):
+    """并行预渲染页面图形
+
+    Args:
+        page_ids: 页面ID列表，默认全部声明了参数网格的页面
+        languages: 语言列表，默认全部已翻译的语言
+        theme: 主题名称
+        fmt: 输出格式，见 image_output.IMAGE_FORMATS
+        dpi: 输出分辨率，默认与页面显示时一样按容器宽度计算
+        workers: 进程数，默认等于CPU核数
+
+    Returns:
+        list[PageReport]: 每个页面的渲染统计
+    """
+    languages = languages or list(TRANSLATIONS.keys())
+    workers = workers or os.cpu_count()
+    reports = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for page_id, grid in collect_page_grids(page_ids):
+            tasks = [
+                (func, kwargs, lang, theme, fmt, dpi)
+                for func, kwargs in grid
+                for lang in languages
+            ]
+            report = PageReport(page_id=page_id, figures=len(tasks))
+            start = time.perf_counter()
+            chunksize = max(1, len(tasks) // (workers * 4))
+            for nbytes, rendered in executor.map(_render_task, tasks, chunksize=chunksize):
+                report.size_bytes += nbytes
+                report.rendered += int(rendered)
+            report.elapsed = time.perf_counter() - start
+            reports.append(report)
+
+    return reports
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="预渲染页面图形到磁盘缓存")
+    parser.add_argument("--pages", nargs="*", default=None,
+                        help="页面ID（如 geometry_polygon），默认全部")
+    parser.add_argument("--languages", nargs="*", default=None, help="语言，默认全部")
+    parser.add_argument("--theme", default="light", help="主题名称")
+    parser.add_argument("--format", dest="fmt", default=figure_cache.DEFAULT_FORMAT, choices=IMAGE_FORMATS)
+    parser.add_argument("--dpi", type=int, default=None, help="输出分辨率，默认按容器宽度计算")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认CPU核数")
+    args = parser.parse_args(argv)
+
+    page_ids = [PageID(value) for value in args.pages] if args.pages else None
+    reports = prerender_pages(page_ids, args.languages, args.theme, args.fmt, args.dpi, args.workers)
+
+    print(f"{'页面':<22}{'图形数':>8}{'新渲染':>8}{'耗时(s)':>10}{'大小(MB)':>10}")
+    print("-" * 58)
+    for report in reports:
+        print(f"{report.page_id.value:<22}{report.figures:>8}{report.rendered:>8}"
+              f"{report.elapsed:>10.2f}{report.size_bytes / 1024 / 1024:>10.2f}")
+    print("-" * 58)
+    total_bytes = sum(report.size_bytes for report in reports)
+    total_time = sum(report.elapsed for report in reports)
+    print(f"{'总计':<22}{sum(r.figures for r in reports):>8}{sum(r.rendered for r in reports):>8}"
+          f"{total_time:>10.2f}{total_bytes / 1024 / 1024:>10.2f}")
+    print(f"缓存目录: {figure_cache.get_disk_cache_dir()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+后台渲染队列
+
+Manim 动画渲染需要数秒到数分钟。在脚本线程中同步渲染会让会话一直阻塞，
+多个会话同时渲染时也没有并发上限。本模块提供进程级共享的渲染队列：
+
+- 任务在有界的进程池中执行，进程数即全局并发上限（STREAMLIT_MATH_RENDER_WORKERS）
+- 等待与执行中的任务总数有上限（STREAMLIT_MATH_RENDER_QUEUE），超出时拒绝提交
+- 以内容地址作为任务键，相同的任务正在排队或执行时直接返回已有任务（去重）
+- 工作进程把进度（已完成帧数 / 总帧数）写入任务的进度文件，页面轮询读取
+
+工作进程用 spawn 方式启动，不继承 Streamlit 服务器进程的线程与锁；
+任务函数及其参数需要可以序列化（模块级函数）。
+工作进程崩溃（如被 OOM 终止）后进程池不可再用：其中未结束的任务标记为失败，
+下一次提交时重新创建进程池。
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Optional
+
+# 同时渲染的进程数（全局并发上限）
+RENDER_WORKERS = int(os.environ.get("STREAMLIT_MATH_RENDER_WORKERS", str(max(1, (os.cpu_count() or 1) // 2))))
+
+# 排队与执行中的任务总数上限
+RENDER_QUEUE_LIMIT = int(os.environ.get("STREAMLIT_MATH_RENDER_QUEUE", "16"))
+
+# 保留的已结束任务数（供轮询的会话读取结果）
+FINISHED_JOBS_KEPT = 32
+
+# 工作进程写入进度的最小间隔（秒）
+PROGRESS_INTERVAL = 0.2
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+class RenderQueueFull(RuntimeError):
+    """排队的任务数已达上限"""
+
+@dataclass
+class RenderJob:
+    """渲染任务的状态"""
+    key: str
+    status: str = QUEUED
+    frames_done: int = 0
+    frames_total: int = 0
+    result: Optional[bytes] = field(default=None, repr=False)
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self):
+        """任务已结束（成功或失败）"""
+        return self.status in (DONE, FAILED)
+
+    @property
+    def progress(self):
+        """完成比例（0~1），总帧数未知时为 0"""
+        if self.status == DONE:
+            return 1.0
+        return min(1.0, self.frames_done / self.frames_total) if self.frames_total else 0.0
+
+class ProgressReporter:
+    """工作进程中报告进度：原子写入 "已完成帧数 总帧数"，按时间间隔节流"""
+
+    def __init__(self, path, total=0):
+        """
+        Args:
+            path: 进度文件路径（由 RenderQueue 分配）
+            total: 总帧数，未知时为 0
+        """
+        self.path = path
+        self.total = total
+        self.done = 0
+        self._last_write = 0.0
+        self._write()
+
+    def _write(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(f"{self.done} {self.total}")
+        os.replace(tmp_path, self.path)
+        self._last_write = time.monotonic()
+
+    def set_total(self, total):
+        """设置总帧数"""
+        self.total = total
+        self._write()
+
+    def advance(self, frames=1):
+        """完成若干帧"""
+        self.done += frames
+        if time.monotonic() - self._last_write >= PROGRESS_INTERVAL:
+            self._write()
+
+def read_progress(path):
+    """读取进度文件，返回 (已完成帧数, 总帧数)；工作进程尚未开始时返回 None"""
+    try:
+        with open(path) as f:
+            done, total = f.read().split()
+        return int(done), int(total)
+    except (OSError, ValueError):
+        return None
+
+class RenderQueue:
+    """有界进程池上的去重渲染队列（线程安全）"""
+
+    def __init__(self, max_workers=RENDER_WORKERS, max_pending=RENDER_QUEUE_LIMIT):
+        """
+        Args:
+            max_workers: 同时渲染的进程数
+            max_pending: 排队与执行中的任务总数上限
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = None  # 第一次提交任务时创建
+        self._jobs = OrderedDict()  # key -> RenderJob，按提交顺序
+        self._progress_dir = tempfile.mkdtemp(prefix="render_progress_")
+        self._lock = threading.Lock()
+
+    def _progress_path(self, key):
+        return os.path.join(self._progress_dir, key)
+
+    def submit(self, key, func, *args):
+        """提交任务；相同键的任务正在排队或执行时返回已有任务
+
+        任务在工作进程中以 func(*args, progress) 调用，progress 为 ProgressReporter，
+        返回值保存在 RenderJob.result 中。已结束（成功或失败）的任务不参与去重，
+        再次提交时重新执行：任务的产物（如视频缓存中的文件）可能已被淘汰或没有写入，
+        是否需要重新执行由调用方先检查产物决定。
+
+        Raises:
+            RenderQueueFull: 未结束的任务数已达上限
+        """
+        return self.submit_all([(key, func, args)])[0]
+
+    def submit_all(self, tasks):
+        """一次提交多个任务：队列容量不足时一个也不提交
+
+        Args:
+            tasks: [(键, 任务函数, 参数元组), ...]，按顺序提交（进程池按提交顺序开始执行）；
+                去重规则与 submit 相同
+
+        Returns:
+            list: 与 tasks 对应的 RenderJob
+
+        Raises:
+            RenderQueueFull: 新任务加上未结束的任务超过上限
+        """
+        submitted = []
+        with self._lock:
+            active = {key for key, job in self._jobs.items() if not job.finished}
+            new_keys = {key for key, _, _ in tasks} - active
+            if len(active) + len(new_keys) > self.max_pending:
+                raise RenderQueueFull(f"渲染队列已满（{len(active)} 个任务），请稍后再试")
+            jobs = []
+            for key, func, args in tasks:
+                job = self._jobs.get(key)
+                if job is None or job.finished:
+                    job, future = self._submit_locked(key, func, args)
+                    submitted.append((job, future))
+                jobs.append(job)
+        for job, future in submitted:
+            future.add_done_callback(lambda future, job=job: self._finish(job, future))
+        return jobs
+
+    def _submit_locked(self, key, func, args):
+        """把任务交给进程池（调用方持有锁），返回 (RenderJob, Future)"""
+        job = self._jobs[key] = RenderJob(key)
+        self._jobs.move_to_end(key)
+        try:
+            future = self._get_executor().submit(_run_job, func, args, self._progress_path(key))
+        except BrokenProcessPool:
+            # 进程池在上一次检查之后才损坏：丢弃它，在新的进程池中重试一次
+            self._discard_executor()
+            try:
+                future = self._get_executor().submit(_run_job, func, args, self._progress_path(key))
+            except BaseException:
+                del self._jobs[key]
+                raise
+        except BaseException:
+            del self._jobs[key]
+            raise
+        return job, future
+
+    def _get_executor(self):
+        """当前的进程池；第一次提交或上一个进程池损坏后创建（调用方持有锁）"""
+        if self._executor is not None and getattr(self._executor, "_broken", False):
+            self._discard_executor()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def _discard_executor(self):
+        """丢弃损坏的进程池（调用方持有锁），其中未结束的任务由 _finish 标记为失败"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finish(self, job, future):
+        """任务结束后记录结果，并清理多余的已结束任务"""
+        with self._lock:
+            try:
+                job.result = future.result()
+                job.status = DONE
+            except BrokenProcessPool:
+                # 工作进程崩溃，进程池中所有未结束的任务都以此结束；下一次提交时重建进程池
+                job.error = "BrokenProcessPool: 渲染进程意外退出"
+                job.status = FAILED
+            except Exception as exc:  # 工作进程中的任何异常都只影响这个任务
+                job.error = f"{type(exc).__name__}: {exc}"
+                job.status = FAILED
+            job.finished_at = time.time()
+            try:
+                os.unlink(self._progress_path(job.key))
+            except OSError:
+                pass
+            finished = [key for key, j in self._jobs.items() if j.finished]
+            for key in finished[:max(0, len(finished) - FINISHED_JOBS_KEPT)]:
+                del self._jobs[key]
+
+    def get(self, key):
+        """获取任务的最新状态，没有该任务时返回 None"""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.finished:
+                return job
+            progress = read_progress(self._progress_path(key))
+            if progress is not None:
+                job.status = RUNNING
+                job.frames_done, job.frames_total = progress
+            return job
+
+    def stats(self):
+        """各状态的任务数"""
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def shutdown(self, wait=True):
+        """关闭进程池并删除进度文件"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+        shutil.rmtree(self._progress_dir, ignore_errors=True)
+
+def _run_job(func, args, progress_path):
+    """工作进程：创建进度报告器并执行任务"""
+    return func(*args, ProgressReporter(progress_path))
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_render_queue():
+    """获取进程级共享的渲染队列（所有会话共用同一个并发上限）"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = RenderQueue()
+        return _queue
@@ -0,0 +1,276 @@
+"""
+启动性能分析
+
+设置环境变量 STREAMLIT_MATH_STARTUP_PROFILE 后启用（值为报告文件路径，
+设为 1 时写入当前目录下的 startup_profile.json），记录：
+
+1. 每个模块首次导入的耗时（累计与自身）和常驻内存增量
+2. configure_matplotlib_defaults() 等设置钩子的每次调用
+3. 每个页面处理函数的首次渲染
+
+报告为 JSON，每次记录一个区段后刷新；未启用时各接口都是空操作。
+"""
+import atexit
+import importlib.abc
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 报告格式版本，字段有不兼容的变化时递增
+REPORT_VERSION = 1
+
+# 最多保留的区段记录数，超出后只计数（设置钩子在每次绘图时都会调用）
+MAX_SECTIONS = 2000
+
+_PAGE_SIZE_KB = os.sysconf("SC_PAGE_SIZE") // 1024 if hasattr(os, "sysconf") else 4
+
+_profiler = None
+_install_lock = threading.Lock()
+
+def _rss_kb():
+    """当前进程的常驻内存（KB）
+
+    Linux 上读取 /proc/self/statm；其他平台退化为峰值常驻内存。
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE_KB
+    except OSError:
+        if resource is None:
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 的单位是字节
+        return peak // 1024 if sys.platform == "darwin" else peak
+
+class _TimingLoader:
+    """包装模块加载器，计时 exec_module
+
+    执行前把模块的 __loader__ 与 __spec__.loader 还原为原加载器，
+    导入完成后的模块与未启用分析时完全相同。
+    """
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        with self._profiler.measure_import(module.__name__):
+            self._loader.exec_module(module)
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """位于 sys.meta_path 首位，把其余查找器找到的加载器替换为计时加载器"""
+
+    def __init__(self, profiler):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimingLoader(spec.loader, self._profiler)
+            return spec
+        return None
+
+class StartupProfiler:
+    """收集导入与区段耗时，并写出 JSON 报告"""
+
+    def __init__(self, report_path):
+        self.report_path = report_path
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._imports = []
+        self._sections = []
+        self._dropped_sections = 0
+        self._seen_sections = set()
+        self._finder = _TimingFinder(self)
+
+    def _elapsed_ms(self):
+        return (time.perf_counter() - self._origin) * 1000
+
+    @contextmanager
+    def measure_import(self, module_name):
+        """记录一个模块的导入；嵌套导入的耗时从父模块的自身耗时中扣除"""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        parent = stack[-1]["module"] if stack else None
+        frame = {"module": module_name, "children_ms": 0.0}
+        stack.append(frame)
+        rss_before = _rss_kb()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cumulative = (time.perf_counter() - start) * 1000
+            stack.pop()
+            if stack:
+                stack[-1]["children_ms"] += cumulative
+            with self._lock:
+                self._imports.append({
+                    "module": module_name,
+                    "parent": parent,
+                    "start_ms": round(self._elapsed_ms() - cumulative, 3),
+                    "cumulative_ms": round(cumulative, 3),
+                    "self_ms": round(cumulative - frame["children_ms"], 3),
+                    "rss_delta_kb": _rss_kb() - rss_before,
+                })
+
+    @contextmanager
+    def measure_section(self, name, kind, once=False, flush=True):
+        """记录一个代码区段
+
+        Args:
+            name: 区段名称
+            kind: 区段类别，如 "setup"、"first_render"
+            once: 为 True 时同名区段只记录第一次
+            flush: 结束后是否立即刷新报告文件
+        """
+        with self._lock:
+            if once and name in self._seen_sections:
+                once_skip = True
+            else:
+                once_skip = False
+                self._seen_sections.add(name)
+        if once_skip:
+            yield
+            return
+
+        rss_before = _rss_kb()
+        imports_before = len(self._imports)
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = repr(e)
+            raise
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with self._lock:
+                if len(self._sections) < MAX_SECTIONS:
+                    self._sections.append({
+                        "name": name,
+                        "kind": kind,
+                        "start_ms": round(self._elapsed_ms() - elapsed, 3),
+                        "elapsed_ms": round(elapsed, 3),
+                        "rss_delta_kb": _rss_kb() - rss_before,
+                        "imports": len(self._imports) - imports_before,
+                        "error": error,
+                    })
+                else:
+                    self._dropped_sections += 1
+            if flush:
+                self.write_report()
+
+    def install(self):
+        sys.meta_path.insert(0, self._finder)
+        atexit.register(self.write_report)
+
+    def uninstall(self):
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+
+    def get_report(self):
+        """返回报告字典"""
+        with self._lock:
+            imports = list(self._imports)
+            sections = list(self._sections)
+            dropped = self._dropped_sections
+        top_level = [record for record in imports if record["parent"] is None]
+        return {
+            "version": REPORT_VERSION,
+            "started_at": self.started_at,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pid": os.getpid(),
+            "rss_kb": _rss_kb(),
+            "summary": {
+                "modules": len(imports),
+                "import_ms": round(sum(record["cumulative_ms"] for record in top_level), 3),
+                "first_render_ms": {section["name"]: section["elapsed_ms"]
+                                    for section in sections if section["kind"] == "first_render"},
+                "dropped_sections": dropped,
+            },
+            "imports": imports,
+            "sections": sections,
+        }
+
+    def write_report(self, path=None):
+        """写出 JSON 报告（先写临时文件再替换，读取方不会看到半个文件）"""
+        path = path or self.report_path
+        if not path:
+            return
+        report = self.get_report()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+def install(report_path="startup_profile.json"):
+    """启用启动分析（重复调用返回同一个实例）"""
+    global _profiler
+    with _install_lock:
+        if _profiler is None:
+            _profiler = StartupProfiler(report_path)
+            _profiler.install()
+        return _profiler
+
+def install_from_env():
+    """按环境变量 STREAMLIT_MATH_STARTUP_PROFILE 决定是否启用"""
+    value = os.environ.get("STREAMLIT_MATH_STARTUP_PROFILE", "")
+    if not value or value == "0":
+        return None
+    return install("startup_profile.json" if value == "1" else value)
+
+def get_profiler():
+    """获取当前的分析器，未启用时返回 None"""
+    return _profiler
+
+@contextmanager
+def section(name, kind="section", once=False):
+    """记录一个代码区段的耗时与内存变化；未启用时不做任何事"""
+    if _profiler is None:
+        yield
+        return
+    with _profiler.measure_section(name, kind, once=once):
+        yield
+
+def profiled(kind):
+    """装饰器：把函数的每次调用记录为一个区段"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return func(*args, **kwargs)
+            with _profiler.measure_section(func.__name__, kind, flush=False):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,46 @@
+"""
+静态文件目录
+
+Streamlit 的静态文件服务（.streamlit/config.toml 中 server.enableStaticServing = true）
+以 app/static/ 为 URL 前缀提供与 main.py 同级的 static 目录中的文件。文件由 Tornado
+按块从磁盘读取后发送，大文件不经过会话内存（st.download_button 则会把整个文件读入内存）。
+单个文件不能超过 MAX_STATIC_FILE_BYTES，图片以外的文件一律以 text/plain 返回。
+
+生成的文件按任务放在 static/<类别>/<任务>/ 子目录中，超过保留时间后在同类别
+新建任务时删除；会话结束或从不再次访问的文件也会被清理。
+"""
+import shutil
+import time
+from pathlib import Path
+
+import streamlit as st
+
+STATIC_ROOT = Path(__file__).resolve().parents[2] / "static"
+
+# Streamlit 静态文件服务允许的单个文件大小上限（超过时返回 404）
+MAX_STATIC_FILE_BYTES = 200 * 1024 * 1024
+
+def task_directory(category, name, retention_s):
+    """任务的静态文件目录（不创建），同时删除该类别下超过保留时间的旧目录
+
+    Args:
+        category: 类别子目录，如 "streams"、"exports"
+        name: 任务名
+        retention_s: 保留时间（秒），按目录的修改时间计算
+    """
+    root = STATIC_ROOT / category
+    if root.is_dir():
+        cutoff = time.time() - retention_s
+        for path in root.iterdir():
+            try:
+                if path.is_dir() and path.stat().st_mtime < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                continue
+    return root / name
+
+def static_url(path):
+    """static 目录中的文件或目录对应的 URL（以 / 开头）"""
+    base = st.get_option("server.baseUrlPath").strip("/")
+    relative = Path(path).resolve().relative_to(STATIC_ROOT).as_posix()
+    return "/" + "/".join(part for part in (base, "app/static", relative) if part)
@@ -0,0 +1,105 @@
+"""
+共享的 TeX 公式缓存
+
+Manim 把 MathTex/Tex 的公式经 LaTeX 与 dvisvgm 编译为 SVG，这是渲染
+FunctionScene 时最慢的步骤之一。Manim 自带的缓存放在 {media_dir}/Tex 中，
+而每个渲染任务使用独立的临时媒体目录（见 manim_demo.isolated_media_dir），
+所以每个任务、每个工作进程都会重新编译相同的公式。
+
+本模块用共享目录替换 Manim 的公式编译函数：
+- 缓存目录默认为 CACHE_ROOT/tex，可用 STREAMLIT_MATH_TEX_CACHE_DIR 修改，
+  按 Manim 版本分子目录
+- 文件名是完整 TeX 源码（含模板导言区）与编译器的摘要，与 Manim 的命名方式一致
+- 编译在临时子目录中进行，完成后用 os.replace 原子发布 SVG：其他进程要么看不到
+  文件，要么看到完整的文件；Manim 自带的缓存只检查文件是否存在，可能读到写了一半的文件
+- 编译时持有该公式自己的文件锁（<摘要>.lock），多个工作进程同时请求同一个公式时只编译一次，
+  不同公式可以并行编译；锁文件很小且不删除（删除正被等待的锁文件会让两个进程各持有一把锁）
+
+本模块只在调用时导入 manim，未安装 manim 时也可以导入。
+"""
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.utils.cache_paths import get_cache_dir
+
+try:
+    import fcntl
+except ImportError:  # Windows：没有文件锁，同一公式可能被重复编译，但发布仍然是原子的
+    fcntl = None
+
+TEX_CACHE_ROOT = os.environ.get("STREAMLIT_MATH_TEX_CACHE_DIR", get_cache_dir("tex"))
+
+_original_tex_to_svg_file = None
+_install_lock = threading.Lock()
+
+def tex_cache_dir():
+    """当前 Manim 版本的公式缓存目录"""
+    import manim
+    return Path(TEX_CACHE_ROOT) / f"manim-{manim.__version__}"
+
+@contextmanager
+def _file_lock(path):
+    """以 path 为锁文件的进程间互斥锁"""
+    if fcntl is None:
+        yield
+        return
+    with open(path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _compile(expression, environment, tex_template, result):
+    """在临时子目录中编译公式，把 SVG 原子移动到 result"""
+    from manim import config
+
+    work_dir = tempfile.mkdtemp(dir=result.parent, prefix=".work-")
+    original_tex_dir = config.tex_dir
+    config.tex_dir = work_dir
+    try:
+        svg_file = _original_tex_to_svg_file(expression, environment=environment, tex_template=tex_template)
+        os.replace(svg_file, result)
+    finally:
+        config.tex_dir = original_tex_dir
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def cached_tex_to_svg_file(expression, environment=None, tex_template=None):
+    """与 manim.utils.tex_file_writing.tex_to_svg_file 参数相同，结果保存在共享缓存中
+
+    Returns:
+        Path: SVG 文件路径
+    """
+    from manim import config
+    from manim.utils.tex_file_writing import tex_hash
+
+    if tex_template is None:
+        tex_template = config["tex_template"]
+    if environment is not None:
+        code = tex_template.get_texcode_for_expression_in_env(expression, environment)
+    else:
+        code = tex_template.get_texcode_for_expression(expression)
+    directory = tex_cache_dir()
+    result = directory / f"{tex_hash(code + tex_template.tex_compiler + tex_template.output_format)}.svg"
+    if result.exists():
+        return result
+    directory.mkdir(parents=True, exist_ok=True)
+    with _file_lock(result.with_suffix(".lock")):
+        # 等待锁期间其他进程可能已经编译完成
+        if not result.exists():
+            _compile(expression, environment, tex_template, result)
+    return result
+
+def install_tex_cache():
+    """让当前进程中的 MathTex/Tex 使用共享的公式缓存（重复调用无副作用）"""
+    global _original_tex_to_svg_file
+    from manim.mobject.text import tex_mobject
+
+    with _install_lock:
+        if _original_tex_to_svg_file is None:
+            _original_tex_to_svg_file = tex_mobject.tex_to_svg_file
+            tex_mobject.tex_to_svg_file = cached_tex_to_svg_file
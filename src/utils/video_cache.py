@@ -0,0 +1,150 @@
+"""
+动画视频缓存
+
+Manim 场景的渲染需要数秒到数分钟，而相同场景、相同参数的输出完全相同。
+以 (场景类源码, 闭包参数, 质量预设, Manim 版本) 作为内容地址，把渲染得到的
+MP4 存放在磁盘缓存中（复用 figure_cache.DiskByteCache：原子写入，超过容量上限时
+按最近访问时间淘汰），重复请求直接返回缓存的视频，不再调用 Manim。
+
+场景类通常定义在方法内部，参数（如 func_type、shape_type）以闭包变量的形式
+被 construct 引用，因此从场景类各方法的闭包中提取参数；方法按名称引用的模块级
+数据（如 manim_demo.FUNCTION_LABELS）也计入键。场景调用的模块级函数不在键中，
+修改这些函数时需要递增 VIDEO_CACHE_VERSION。
+本模块不导入 manim，Manim 版本与渲染函数由调用方传入。
+"""
+import hashlib
+import inspect
+import os
+import threading
+
+from src.utils.cache_paths import get_cache_dir
+from src.utils.figure_cache import DiskByteCache, normalize_key_arg
+
+# 视频磁盘缓存的容量上限（MB）
+VIDEO_CACHE_MB = int(os.environ.get("STREAMLIT_MATH_VIDEO_CACHE_MB", "1024"))
+
+# 缓存格式版本：修改渲染流程、缓存布局或场景调用的模块级函数时递增
+VIDEO_CACHE_VERSION = 1
+
+# 第一次使用时创建，导入本模块不会创建缓存目录
+_video_cache = None
+_video_cache_lock = threading.Lock()
+
+def _get_video_cache():
+    """获取进程级共享的视频缓存（第一次调用时创建）"""
+    global _video_cache
+    with _video_cache_lock:
+        if _video_cache is None:
+            _video_cache = DiskByteCache(get_cache_dir("videos"), VIDEO_CACHE_MB * 1024 * 1024,
+                                         version=VIDEO_CACHE_VERSION)
+        return _video_cache
+
+def scene_parameters(scene_class):
+    """提取场景类各方法引用的闭包变量
+
+    Returns:
+        tuple: 按名称排序的 (变量名, 规范化的值)
+    """
+    params = {}
+    for name, member in vars(scene_class).items():
+        code = getattr(member, "__code__", None)
+        if code is None or not member.__closure__:
+            continue
+        for var, cell in zip(code.co_freevars, member.__closure__):
+            if var == "__class__":  # super() 引用的类本身
+                continue
+            value = cell.cell_contents
+            # 对象的 repr 通常包含内存地址，只保留其类型，避免键在每次运行时都不同
+            if not isinstance(value, (bool, int, float, str, type(None), list, tuple, dict)):
+                value = f"<{type(value).__qualname__}>"
+            params[var] = normalize_key_arg(value)
+    return tuple(sorted(params.items()))
+
+# 计入缓存键的模块级数据类型（函数、类、模块等按源码或版本区分，不在此列）
+_DATA_TYPES = (bool, int, float, str, list, tuple, dict)
+
+def _referenced_names(code):
+    """代码对象（含嵌套的 lambda 与内部函数）按名称引用的全局变量"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if hasattr(const, "co_names"):
+            names |= _referenced_names(const)
+    return names
+
+def scene_globals(scene_class):
+    """提取场景类各方法引用的模块级数据
+
+    Returns:
+        tuple: 按名称排序的 (变量名, 规范化的值)
+    """
+    values = {}
+    for member in vars(scene_class).values():
+        code = getattr(member, "__code__", None)
+        if code is None:
+            continue
+        namespace = member.__globals__
+        for name in _referenced_names(code):
+            value = namespace.get(name)
+            if isinstance(value, _DATA_TYPES):
+                values[name] = normalize_key_arg(value)
+    return tuple(sorted(values.items()))
+
+def make_scene_key(scene_class, quality, version):
+    """计算场景视频的内容地址
+
+    Args:
+        scene_class: Manim Scene 子类
+        quality: 质量预设，如 "low_quality"、"medium_quality"
+        version: Manim 版本号
+
+    Returns:
+        str: sha256 十六进制摘要
+    """
+    try:
+        source = inspect.getsource(scene_class)
+    except (OSError, TypeError):
+        source = scene_class.__qualname__
+    payload = "|".join([
+        f"{scene_class.__module__}.{scene_class.__qualname__}",
+        hashlib.sha256(source.encode("utf-8")).hexdigest(),
+        repr(scene_parameters(scene_class)),
+        repr(scene_globals(scene_class)),
+        quality,
+        str(version),
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def get_video(key):
+    """读取缓存的视频，未命中时返回 None"""
+    return _get_video_cache().get(key, "mp4")
+
+def put_video(key, data):
+    """写入视频缓存"""
+    _get_video_cache().put(key, "mp4", data)
+
+def render_video(scene_class, render, quality, version):
+    """通过缓存渲染场景视频
+
+    Args:
+        scene_class: Manim Scene 子类
+        render: 渲染函数 render(scene_class, quality)，返回 MP4 视频字节
+        quality: 质量预设
+        version: Manim 版本号
+
+    Returns:
+        bytes: MP4 视频字节
+    """
+    key = make_scene_key(scene_class, quality, version)
+    data = get_video(key)
+    if data is None:
+        data = render(scene_class, quality)
+        put_video(key, data)
+    return data
+
+def get_video_cache_stats():
+    """获取视频缓存的命中/未命中/淘汰计数"""
+    return _get_video_cache().stats()
+
+def clear_video_cache():
+    """删除全部缓存的视频"""
+    _get_video_cache().clear()
@@ -1,5 +1,64 @@
+import gc
+import os
+import threading
+import warnings
+import weakref
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable
+
 import streamlit as st
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from src.utils.plot_utils import DEFAULT_STYLE, configure_matplotlib_defaults
+from src.i18n.language_manager import get_language
+from src.utils.blit_renderer import enable_blitting
+
+# 调试模式：统计每个会话的活动图形数，持续增长时发出警告
+FIGURE_DEBUG = os.environ.get("STREAMLIT_MATH_FIGURE_DEBUG", "") not in ("", "0")
+
+# 活动图形数连续增长多少次运行后发出警告
+FIGURE_LEAK_RUNS = 3
+
+# 模板池最多保留的空闲图形数（所有会话、模板与语言共用）；每个图形连同 Agg 画布
+# 与位块传输的背景约占数 MB，超出时淘汰最久未使用的图形
+TEMPLATE_POOL_SIZE = int(os.environ.get("STREAMLIT_MATH_TEMPLATE_POOL", "4"))
+
+class FigureLeakWarning(RuntimeWarning):
+    """活动图形数随页面重新运行持续增长"""
+
+@dataclass(frozen=True)
+class FigureTemplate:
+    """可复用的图形模板
+
+    build() 创建图形以及不随参数变化的部分（坐标轴、标题、图例、网格），
+    返回 (fig, artists)，artists 是之后需要更新的艺术家对象；
+    update(artists, *args, **kwargs) 只修改这些艺术家的数据
+    （set_data、set_xy、set_text 等），不新建对象。
+    blit 为 True 时，artists 之外的部分只栅格化一次，之后渲染 PNG
+    只重绘 artists（见 blit_renderer）；此时 artists 的变化不能影响布局。
+    """
+    name: str
+    build: Callable
+    update: Callable
+    blit: bool = False
+
+_tracker_lock = threading.Lock()
+_live_figures = defaultdict(weakref.WeakSet)  # 会话ID -> 由 new_figure 创建且尚未回收的图形
+_figure_history = defaultdict(lambda: deque(maxlen=FIGURE_LEAK_RUNS + 1))  # 会话ID -> 最近几次运行结束时的图形数
+_pool_lock = threading.Lock()
+_idle_templates = OrderedDict()  # (模板名, 语言) -> [fig, ...]，按最近归还的顺序
+_idle_count = 0
+_checked_out = weakref.WeakSet()  # 已取出、尚未归还的模板图形
+_pinned_figures = weakref.WeakSet()  # 由模板创建的图形，release_figure 不清空
+
+def _session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
 
 def set_page_config():
     """设置 Streamlit 页面配置"""
@@ -11,24 +70,179 @@ def set_page_config():
     )
 
 def setup_matplotlib_defaults():
-    """设置 Matplotlib 的默认样式"""
-    plt.style.use('seaborn')
-    plt.rcParams['figure.figsize'] = [10, 6]
-    plt.rcParams['axes.grid'] = True
-    plt.rcParams['font.size'] = 12
+    """设置 Matplotlib 的默认样式
+
+    全局 rcParams 统一由 configure_matplotlib_defaults() 设置一次；
+    网格、字号等单个图形的样式通过 StyleProfile 传给 create_figure。
+    """
+    configure_matplotlib_defaults()
+
+def new_figure(figsize=None, style=DEFAULT_STYLE):
+    """用面向对象接口创建图形，不经过 pyplot
+
+    图形不登记到 pyplot 的全局图形列表，不需要 plt.close，
+    不再引用后由垃圾回收释放；多个线程可以同时创建和渲染。
 
-def create_figure(figsize=(4, 4)):
+    Args:
+        figsize: 图形大小，默认取样式中的大小
+        style: StyleProfile 样式
+
+    Returns:
+        Figure: Matplotlib图形对象
+    """
+    configure_matplotlib_defaults()
+    fig = Figure(figsize=figsize or style.figsize, dpi=style.dpi, facecolor=style.facecolor)
+    FigureCanvasAgg(fig)
+    if FIGURE_DEBUG:
+        with _tracker_lock:
+            _live_figures[_session_id()].add(fig)
+    return fig
+
+def create_figure(figsize=(4, 4), nrows=1, ncols=1, style=DEFAULT_STYLE, subplot_kw=None):
     """创建一个新的图形对象
     
     Args:
         figsize: 图形大小，默认为 (4, 4)
+        nrows, ncols: 子图的行数与列数
+        style: StyleProfile 样式
+        subplot_kw: 传给每个子图的参数，如 {'projection': '3d'}
         
     Returns:
-        tuple: (fig, ax) Matplotlib图形对象和坐标轴对象
+        tuple: (fig, ax) Matplotlib图形对象和坐标轴对象（多个子图时为坐标轴数组）
     """
-    fig, ax = plt.subplots(figsize=figsize)
+    fig = new_figure(figsize, style)
+    ax = fig.subplots(nrows, ncols, subplot_kw=subplot_kw)
+    for axis in np.atleast_1d(ax).flat:
+        style.apply_to_axes(axis)
     return fig, ax
 
+def release_figure(fig):
+    """释放图形：从 pyplot 注销（如果由 pyplot 创建），并清空其中的坐标轴与艺术家对象
+
+    清空后图形与画布之间只剩很小的引用环，大块的数据（图像、路径）立即释放。
+    从模板池取出的图形不清空，归还模板池供之后的运行复用（重复释放不会重复归还）。
+    """
+    if _return_template(fig) or fig in _pinned_figures:
+        return
+    plt.close(fig)
+    fig.clear()
+
+@contextmanager
+def managed_figure(figsize=(4, 4), nrows=1, ncols=1, style=DEFAULT_STYLE, subplot_kw=None):
+    """创建图形，并保证离开上下文时释放
+
+    用法：
+        with managed_figure(figsize=(4, 4)) as (fig, ax):
+            ax.plot(...)
+            emit_figure(fig)
+
+    image_output.emit_figure 在调用时就把图形编码为图像，离开上下文后不再需要图形对象。
+    参数与 create_figure 相同。
+    """
+    fig, ax = create_figure(figsize, nrows, ncols, style, subplot_kw)
+    try:
+        yield fig, ax
+    finally:
+        release_figure(fig)
+
+def _return_template(fig):
+    """把取出的模板图形归还模板池，超出容量时淘汰最久未使用的空闲图形
+
+    Returns:
+        bool: fig 是否是从模板池取出的图形
+    """
+    global _idle_count
+    with _pool_lock:
+        if fig not in _checked_out:
+            return False
+        _checked_out.discard(fig)
+        key = fig._template_key
+        _idle_templates.setdefault(key, []).append(fig)
+        _idle_templates.move_to_end(key)
+        _idle_count += 1
+        while _idle_count > TEMPLATE_POOL_SIZE:
+            oldest = next(iter(_idle_templates))
+            # 淘汰的图形不再被引用，连同画布与背景一起由垃圾回收释放
+            _idle_templates[oldest].pop(0)
+            if not _idle_templates[oldest]:
+                del _idle_templates[oldest]
+            _idle_count -= 1
+        return True
+
+def get_template_figure(template, *args, **kwargs):
+    """从模板池取出图形，按参数更新数据后返回
+
+    模板池是进程级的，按 (模板, 语言) 保存空闲的图形，总数不超过 TEMPLATE_POOL_SIZE。
+    没有空闲图形时调用 build() 创建，否则只调用 update()，省去创建 Figure、Axes、
+    刻度与文字对象的开销。取出的图形在归还前只由调用方使用，多个会话（线程）
+    不会同时修改同一个图形。调用方不要修改其结构；交给 show_figure、emit_figure
+    渲染后由 release_figure 归还，没有归还的图形不再被引用后由垃圾回收释放。
+
+    Args:
+        template: FigureTemplate 模板
+        *args, **kwargs: 传给 update 的参数
+
+    Returns:
+        Figure: 更新后的图形
+    """
+    global _idle_count
+    key = (template.name, get_language())
+    with _pool_lock:
+        idle = _idle_templates.get(key)
+        fig = idle.pop() if idle else None
+        if fig is not None:
+            _idle_count -= 1
+            if not idle:
+                del _idle_templates[key]
+    if fig is None:
+        fig, artists = template.build()
+        # 保存在图形自身上：弱引用容器的值若引用图形，图形永远不会被回收
+        fig._template_key, fig._template_artists = key, artists
+        _pinned_figures.add(fig)
+        if template.blit:
+            enable_blitting(fig, artists)
+    template.update(fig._template_artists, *args, **kwargs)
+    with _pool_lock:
+        _checked_out.add(fig)
+    return fig
+
+def template_pool_size():
+    """模板池中空闲的图形数"""
+    with _pool_lock:
+        return _idle_count
+
+def live_figure_count(session_id=None):
+    """会话中由 new_figure 创建且尚未回收的图形数（只在调试模式下统计）"""
+    with _tracker_lock:
+        return len(_live_figures.get(session_id, ()))
+
+def check_figure_leaks():
+    """在每次运行结束时调用：统计活动图形数，连续增长时发出警告
+
+    先执行一次垃圾回收，排除只是还没有被回收的图形；
+    统计当前会话的活动图形与 pyplot 管理的图形（后者为进程级）。
+    非调试模式下不做任何事。
+
+    Returns:
+        int: 活动图形数，非调试模式下为 None
+    """
+    if not FIGURE_DEBUG:
+        return None
+    gc.collect()
+    session_id = _session_id()
+    count = live_figure_count(session_id) + len(plt.get_fignums())
+    with _tracker_lock:
+        history = _figure_history[session_id]
+        history.append(count)
+        counts = list(history)
+    growing = len(counts) > FIGURE_LEAK_RUNS and all(a < b for a, b in zip(counts, counts[1:]))
+    if growing:
+        message = f"活动图形数在最近 {FIGURE_LEAK_RUNS} 次运行中持续增长：{counts}，可能有图形没有释放"
+        warnings.warn(message, FigureLeakWarning, stacklevel=2)
+        st.sidebar.warning(message)
+    st.sidebar.caption(f"活动图形：{count}")
+    return count
+
 def setup_coordinate_system(ax, xlim=(-6, 10), ylim=(-6, 10)):
     """设置坐标系"""
     ax.set_xlim(xlim)
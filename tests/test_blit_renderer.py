@@ -0,0 +1,27 @@
+"""
+测试位块传输渲染
+"""
+import numpy as np
+
+from src.components.angle_drawer import ANGLE
+from src.utils.blit_renderer import BlitRenderer, get_blit_renderer
+from src.utils.figure_cache import figure_to_bytes
+from src.utils.visualization import get_template_figure
+
+def test_frames_do_not_leave_traces():
+    """背景只栅格化一次，之前的帧不会残留在之后的帧中"""
+    first = figure_to_bytes(get_template_figure(ANGLE, 45), dpi=50)
+    figure_to_bytes(get_template_figure(ANGLE, 200), dpi=50)
+    again = figure_to_bytes(get_template_figure(ANGLE, 45), dpi=50)
+    assert again == first
+    assert get_blit_renderer(get_template_figure(ANGLE, 45)).backgrounds == 1
+
+def test_blitted_frame_matches_full_redraw():
+    """逐帧渲染的结果与完整重绘一致，只有动态部分与坐标轴边框叠放次序造成的差别"""
+    fig, artists = ANGLE.build()
+    ANGLE.update(artists, -120)
+    # 没有动态艺术家的渲染器每帧都是完整重绘，裁剪方式相同
+    full = BlitRenderer(fig, []).render_rgba(dpi=50)[..., :3].astype(float)
+    blitted = get_blit_renderer(get_template_figure(ANGLE, -120)).render_rgba(dpi=50)[..., :3].astype(float)
+    assert blitted.shape == full.shape
+    assert np.mean(np.abs(blitted - full).max(axis=2) > 25) < 0.01
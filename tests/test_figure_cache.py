@@ -0,0 +1,117 @@
+"""
+测试图形渲染缓存
+"""
+import os
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import pytest
+
+from src.utils import cache_paths, figure_cache
+from src.utils.figure_cache import DiskByteCache, LRUByteCache, make_figure_key, render_figure
+from src.utils.visualization import FigureTemplate
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """磁盘层建在 tmp_path 中，不写入用户的 ~/.cache"""
+    monkeypatch.setattr(cache_paths, "CACHE_ROOT", str(tmp_path / "cache"))
+    monkeypatch.setattr(figure_cache, "_disk_cache", None)
+
+def test_lru_byte_budget_eviction():
+    """超出字节预算时按最近最少使用顺序淘汰"""
+    cache = LRUByteCache(max_bytes=10)
+    cache.put("a", b"xxxx")
+    cache.put("b", b"yyyy")
+    assert cache.get("a") == b"xxxx"  # a 变为最近使用
+    cache.put("c", b"zzzz")           # 淘汰 b
+
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.hits == 1
+    assert stats.size_bytes == 8
+
+def test_key_normalizes_arguments():
+    """位置参数、关键字参数和默认值得到相同的键"""
+    def draw(radius, mode="a"):
+        return None
+
+    key1 = make_figure_key(draw, (2.0,), {}, "zh", "light")
+    key2 = make_figure_key(draw, (), {"radius": 2.0, "mode": "a"}, "zh", "light")
+    key3 = make_figure_key(draw, (0.1 + 0.2 + 1.7,), {}, "zh", "light")
+    assert key1 == key2 == key3
+    assert key1 != make_figure_key(draw, (2.0,), {}, "en", "light")
+    assert key1 != make_figure_key(draw, (2.0,), {}, "zh", "light", dpi=100)
+
+def test_disk_cache_persists_and_evicts(tmp_path):
+    """磁盘缓存跨实例可读，超出容量时删除最久未访问的文件"""
+    cache = DiskByteCache(str(tmp_path), max_bytes=100)
+    cache.put("aa01", "png", b"x" * 40)
+    cache.put("bb02", "png", b"y" * 40)
+
+    # 模拟进程重启：新实例仍能读到之前写入的文件
+    restarted = DiskByteCache(str(tmp_path), max_bytes=100)
+    assert restarted.get("aa01", "png") == b"x" * 40
+    assert not list(tmp_path.rglob("*.tmp"))
+
+    # 让 bb02 成为最久未访问的条目，再写入触发淘汰
+    os.utime(restarted._path("bb02", "png"), (0, 0))
+    restarted.put("cc03", "png", b"z" * 40)
+    assert restarted.get("bb02", "png") is None
+    assert restarted.get("cc03", "png") == b"z" * 40
+    assert restarted.stats().evictions == 1
+
+def test_disk_cache_overwrite_counts_size_once(tmp_path):
+    """覆盖已有条目时总大小不重复计入，不会提前触发淘汰"""
+    cache = DiskByteCache(str(tmp_path), max_bytes=100)
+    cache.put("aa01", "png", b"x" * 40)
+    cache.put("bb02", "png", b"y" * 40)
+    cache.put("aa01", "png", b"z" * 50)
+    assert cache.stats().size_bytes == 90
+    assert cache.get("bb02", "png") == b"y" * 40
+    assert cache.stats().evictions == 0
+
+def test_key_follows_template_source():
+    """绘图函数引用的图形模板的 build/update 源码也计入缓存键"""
+    def draw(n):
+        return TEMPLATE
+
+    global TEMPLATE
+    TEMPLATE = FigureTemplate("t", lambda: None, lambda artists, n: None)
+    key = make_figure_key(draw, (1,), {}, "zh", "light")
+    figure_cache._source_digest.cache_clear()
+    TEMPLATE = FigureTemplate("t", lambda: None, lambda artists, n: n)
+    assert make_figure_key(draw, (1,), {}, "zh", "light") != key
+
+def test_disk_cache_version_invalidates(tmp_path):
+    """缓存版本变化后旧目录被清理"""
+    DiskByteCache(str(tmp_path), max_bytes=100, version=1).put("aa01", "png", b"x")
+    cache = DiskByteCache(str(tmp_path), max_bytes=100, version=2)
+    assert cache.get("aa01", "png") is None
+    assert not (tmp_path / "v1").exists()
+
+def test_render_figure_hits_cache(tmp_path):
+    """重复参数直接返回缓存字节，不再调用绘图函数"""
+    calls = []
+
+    def draw(n):
+        calls.append(n)
+        fig, ax = plt.subplots(figsize=(1, 1))
+        ax.plot([0, n], [0, n])
+        return fig
+
+    figure_cache.clear_figure_cache()
+    first = render_figure(draw, 3, lang="zh", theme="light", dpi=50)
+    second = render_figure(draw, n=3, lang="zh", theme="light", dpi=50)
+
+    assert first == second
+    assert first.startswith(b"\x89PNG")
+    assert calls == [3]
+
+    # 清空内存层后从磁盘层读取
+    figure_cache.clear_figure_cache()
+    assert render_figure(draw, 3, lang="zh", theme="light", dpi=50) == first
+    assert calls == [3]
+    assert figure_cache.get_disk_cache_dir().startswith(str(tmp_path))
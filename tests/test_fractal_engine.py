@@ -0,0 +1,72 @@
+"""
+测试分形计算引擎
+"""
+import numpy as np
+
+from src.utils.fractal_engine import (
+    BARNSLEY_FERN,
+    TileKey,
+    escape_time,
+    escape_time_perturbation,
+    ifs_density,
+    ifs_points,
+    render_escape_time,
+    render_viewport,
+    split_tiles,
+    tile_bounds,
+)
+
+def test_escape_time_known_points():
+    """原点属于曼德博集合，远处的点第一步就逃逸"""
+    image = escape_time((-20.0, 0.0, 0.0, 0.0), 2, 1, max_iter=50)
+    assert image[0, 1] == 0        # c = 0
+    assert 0 < image[0, 0] < 2     # c = -20
+
+def test_tiles_cover_viewport():
+    """图块恰好覆盖整个视口"""
+    tiles = split_tiles((-2, 1, -1.5, 1.5), 300, 200, tile_size=128)
+    covered = np.zeros((200, 300), dtype=int)
+    for row0, row1, col0, col1, _ in tiles:
+        covered[row0:row1, col0:col1] += 1
+    assert np.all(covered == 1)
+
+def test_tiled_render_matches_direct():
+    """分块计算与整幅计算结果一致"""
+    bounds = (-2.0, 0.5, -1.25, 1.25)
+    direct = escape_time(bounds, 90, 70, max_iter=60)
+    tiled = render_escape_time(bounds, 90, 70, max_iter=60, tile_size=32, workers=1)
+    assert np.allclose(direct, tiled)
+
+    julia = render_escape_time(bounds, 90, 70, max_iter=60, julia_c=-0.8 + 0.156j, tile_size=32, workers=1)
+    assert np.allclose(julia, escape_time(bounds, 90, 70, max_iter=60, julia_c=-0.8 + 0.156j))
+
+def test_ifs_points_and_density():
+    """巴恩斯利蕨的点落在已知范围内，密度图保持纵横比"""
+    points = ifs_points(BARNSLEY_FERN, 20000)
+    assert points[:, 0].min() > -3 and points[:, 0].max() < 3
+    assert points[:, 1].min() >= 0 and points[:, 1].max() < 10.1
+
+    image, (xmin, xmax, ymin, ymax) = ifs_density(points, 200)
+    assert max(image.shape) == 200
+    assert abs(image.shape[1] / image.shape[0] - (xmax - xmin) / (ymax - ymin)) < 0.05
+
+def test_viewport_reuses_tiles_when_panning():
+    """视口由图块拼成，平移后只计算新进入视口的图块"""
+    image, bounds, computed, total = render_viewport(2, -40, 3, 96, 64, max_iter=40, tile_size=32, workers=1)
+    assert image.shape == (64, 96) and computed == total
+    step = 4.0 / 2 ** 2 / 32
+    direct = escape_time((bounds[0] + step / 2, bounds[1] - step / 2, bounds[2] + step / 2, bounds[3] - step / 2),
+                         96, 64, max_iter=40)
+    assert np.allclose(image, direct, atol=1e-4)
+
+    _, _, computed, total = render_viewport(2, -40 + 32, 3, 96, 64, max_iter=40, tile_size=32, workers=1)
+    assert computed == 3 and total == 12
+
+def test_perturbation_matches_direct_iteration():
+    """微扰算法与直接迭代的结果一致"""
+    for julia_c in (None, -0.8 + 0.156j):
+        key = TileKey(zoom=6, tx=-48, ty=-9, max_iter=200, julia_c=julia_c, tile_size=64)
+        direct = escape_time(tile_bounds(key), 64, 64, key.max_iter, julia_c)
+        perturbed = escape_time_perturbation(key)
+        assert np.mean((direct == 0) == (perturbed == 0)) > 0.999
+        assert np.mean(np.abs(direct - perturbed) < 1e-2) > 0.99
@@ -0,0 +1,105 @@
+"""
+测试分形生成
+"""
+import io
+import os
+
+import numpy as np
+
+from src.pages.geometry.fractals import (
+    FractalLevelCache,
+    effective_order,
+    export_fractal,
+    iter_koch_segments,
+    iter_sierpinski_triangles,
+    koch_refine,
+    koch_snowflake,
+    sierpinski_chaos_game,
+    sierpinski_triangle,
+    write_chunks,
+)
+
+def test_koch_snowflake_shape_and_closure():
+    """顶点数为 3·4^n+1，且首尾相接"""
+    for order in range(6):
+        points = koch_snowflake(order, size=1.5)
+        assert points.shape == (3 * 4 ** order + 1, 2)
+        assert np.allclose(points[0], points[-1])
+
+def test_koch_snowflake_first_order():
+    """一阶时每条边被替换为四条等长线段"""
+    points = koch_snowflake(1, size=3)
+    lengths = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    assert np.allclose(lengths, 1.0)
+    # 原三角形的顶点保留在每条边的起点
+    assert np.allclose(points[::4], koch_snowflake(0, size=3))
+
+def test_sierpinski_triangle_matches_subdivision():
+    """批量细分得到 3^n 个边长减半 n 次的三角形"""
+    triangles = sierpinski_triangle(4, size=2)
+    assert triangles.shape == (81, 3, 2)
+    sides = np.linalg.norm(triangles[:, 1] - triangles[:, 0], axis=1)
+    assert np.allclose(sides, 2 / 2 ** 4)
+    # 第一个子三角形保留初始三角形的第一个顶点
+    assert np.allclose(triangles[0, 0], sierpinski_triangle(0, size=2)[0, 0])
+
+def test_sierpinski_chaos_game_stays_inside():
+    """点云位于初始三角形内，且固定种子结果可复现"""
+    points = sierpinski_chaos_game(10, size=1, n_points=1000)
+    assert points.shape == (1000, 2)
+    assert np.all(points[:, 1] >= -np.sqrt(3) / 6 - 1e-12)
+    assert np.array_equal(points, sierpinski_chaos_game(10, size=1, n_points=1000))
+
+def test_effective_order_caps_to_pixel_budget():
+    """细节小于一个像素时不再细分，画布越小上限越低"""
+    assert effective_order("koch", 3) == 3
+    capped = effective_order("koch", 20, figsize=(10, 10), dpi=200)
+    assert capped < 20
+    # 上限对应的最小线段至少有一个像素
+    assert 10 * 200 * 0.775 / 1.1 / 3 ** capped >= 1
+    assert effective_order("koch", 20, figsize=(2, 2), dpi=100) < capped
+
+def test_level_cache_refines_incrementally():
+    """逐级缓存与直接生成一致，升一级只细分一次，改变大小只做缩放"""
+    calls = []
+
+    def counting_refine(points):
+        calls.append(len(points))
+        return koch_refine(points)
+
+    cache = FractalLevelCache(koch_snowflake(0), counting_refine)
+    assert np.allclose(cache.get(4), koch_snowflake(4))
+    assert len(calls) == 4
+
+    assert np.allclose(cache.get(5, size=1.7), koch_snowflake(5, size=1.7))
+    assert len(calls) == 5
+    assert np.allclose(cache.get(2, size=0.5), koch_snowflake(2, size=0.5))
+    assert len(calls) == 5
+
+def test_streaming_matches_batch_generation():
+    """分块生成与一次性生成的结果和顺序一致"""
+    points = koch_snowflake(4, size=1.2)
+    segments = np.concatenate(list(iter_koch_segments(4, size=1.2, chunk_size=100)))
+    assert np.allclose(segments[:, 0], points[:-1])
+    assert np.allclose(segments[:, 1], points[1:])
+
+    triangles = np.concatenate(list(iter_sierpinski_triangles(5, size=1.2, chunk_size=50)))
+    assert np.allclose(triangles, sierpinski_triangle(5, size=1.2))
+
+def test_write_chunks_formats():
+    """二进制与CSV导出的行数与几何个数一致"""
+    binary = io.BytesIO()
+    assert write_chunks(iter_sierpinski_triangles(3, chunk_size=10), binary, "bin") == 27
+    assert len(binary.getvalue()) == 27 * 6 * 4
+
+    text = io.BytesIO()
+    write_chunks(iter_koch_segments(2, chunk_size=7), text, "csv")
+    lines = text.getvalue().decode("utf-8").splitlines()
+    assert lines[0] == "x0,y0,x1,y1"
+    assert len(lines) == 1 + 3 * 4 ** 2
+
+def test_export_writes_complete_file_only(tmp_path):
+    """导出文件写完后才出现在目录中，不残留临时文件"""
+    path = export_fractal("sierpinski", 3, fmt="bin", directory=str(tmp_path))
+    assert [p.name for p in tmp_path.iterdir()] == ["sierpinski_order3.bin"]
+    assert os.path.getsize(path) == 27 * 6 * 4
@@ -0,0 +1,38 @@
+"""
+测试几何场景与 Vega-Lite 规格
+"""
+import json
+
+import numpy as np
+
+from src.utils.geometry_scene import Scene, scene_to_vega_lite
+from src.pages.geometry.polygons import regular_polygon_scene
+from src.pages.geometry.triangles import special_triangles_scene
+
+def test_scene_spec_keeps_geometry():
+    """规格固定坐标范围、保持等比例，折线按顶点顺序绘制，闭合图形首尾相连"""
+    scene = Scene((-2, 2), (-1, 1))
+    scene.polyline([[0, 0], [1, 0], [0, 1]], color='r', closed=True, fill='blue', fill_opacity=0.2, label="三角形")
+    scene.points([[0, 0]], label="原点")
+    scene.text(0.5, 0.5, "A")
+    spec = scene_to_vega_lite(scene, width=400)
+
+    assert spec["height"] == 200
+    assert spec["encoding"]["x"]["scale"]["domain"] == [-2, 2]
+    line, points, text = spec["layer"]
+    assert line["encoding"]["order"]["field"] == "i"
+    assert [(row["x"], row["y"]) for row in line["data"]["values"]] == [(0, 0), (1, 0), (0, 1), (0, 0)]
+    assert line["mark"]["fill"] == "blue"
+    # 有标签的图元共用一个颜色比例尺，颜色按标签顺序对应
+    assert line["encoding"]["color"]["scale"] == {"domain": ["三角形", "原点"], "range": ["red", "black"]}
+    assert text["data"]["values"][0]["t"] == "A"
+
+def test_page_scenes_are_compact():
+    """页面场景可序列化为几 KB 的 JSON，多个场景并排显示"""
+    spec = scene_to_vega_lite(regular_polygon_scene(36, 2.0))
+    assert len(json.dumps(spec)) < 4096
+    assert len(spec["layer"][0]["data"]["values"]) == 37
+
+    spec = scene_to_vega_lite(special_triangles_scene())
+    assert len(spec["hconcat"]) == 3
+    assert np.isclose(spec["hconcat"][0]["layer"][0]["data"]["values"][2]["y"], np.sqrt(3) / 2, atol=1e-4)
@@ -0,0 +1,48 @@
+"""
+测试 HLS 流式输出
+"""
+import os
+
+import pytest
+
+from src.utils.hls_stream import (PLAYLIST_NAME, STATIC_ROOT, HLSWriter, first_segment_time, hls_command,
+                                  read_playlist, stream_player_html, stream_url)
+
+def test_command_starts_every_segment_with_keyframe(tmp_path):
+    """关键帧间隔等于一个分段的帧数，输出 fMP4 分段的事件流"""
+    command = hls_command(tmp_path, 854, 480, 15, segment_seconds=1)
+    assert command[command.index("-s") + 1] == "854x480"
+    assert command[command.index("-g") + 1] == command[command.index("-keyint_min") + 1] == "15"
+    assert command[command.index("-hls_segment_type") + 1] == "fmp4"
+    assert command[command.index("-hls_playlist_type") + 1] == "event"
+    assert command[-1] == str(tmp_path / PLAYLIST_NAME)
+
+def test_playlist_tracks_completed_segments(tmp_path):
+    """只列出已完成的分段，结束标记出现后流结束；播放器不残留占位符"""
+    assert read_playlist(tmp_path) == ([], False)
+    assert first_segment_time(tmp_path) is None
+
+    (tmp_path / "seg0000.m4s").write_bytes(b"x")
+    os.utime(tmp_path / "seg0000.m4s", (1000, 1000))
+    playlist = "#EXTM3U\n#EXT-X-MAP:URI=\"init.mp4\"\n#EXTINF:1.0,\nseg0000.m4s\n"
+    (tmp_path / PLAYLIST_NAME).write_text(playlist)
+    assert read_playlist(tmp_path) == (["seg0000.m4s"], False)
+    assert first_segment_time(tmp_path) == 1000
+
+    (tmp_path / PLAYLIST_NAME).write_text(playlist + "#EXTINF:0.5,\nseg0001.m4s\n#EXT-X-ENDLIST\n")
+    assert read_playlist(tmp_path) == (["seg0000.m4s", "seg0001.m4s"], True)
+
+    url = stream_url(STATIC_ROOT / "streams" / "abc")
+    assert url.endswith("/app/static/streams/abc/")
+    assert "__" not in stream_player_html(url)
+
+def test_encoder_log_stays_out_of_stream_directory(tmp_path):
+    """ffmpeg 的错误输出不写入对外提供的流目录，失败时随异常返回"""
+    ffmpeg = tmp_path / "ffmpeg"
+    ffmpeg.write_text("#!/bin/sh\necho 'encoder failed' >&2\nexit 1\n")
+    ffmpeg.chmod(0o755)
+    directory = tmp_path / "stream"
+    writer = HLSWriter(directory, 2, 2, 1, ffmpeg=str(ffmpeg))
+    with pytest.raises(RuntimeError, match="encoder failed"):
+        writer.close()
+    assert list(directory.iterdir()) == []
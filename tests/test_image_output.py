@@ -0,0 +1,36 @@
+"""
+测试图像输出策略
+"""
+import io
+
+import numpy as np
+from PIL import Image
+
+from src.pages.geometry.fractals import draw_fractal
+from src.pages.geometry.polygons import plot_regular_polygon
+from src.utils.figure_cache import figure_to_bytes
+from src.utils.image_output import MAX_DPI, MAX_IMAGE_WIDTH, detect_format, encode_png, resolve_dpi, target_width_px
+
+def test_palette_png_is_lossless_for_few_colors():
+    """不超过 256 种颜色的图像转为调色板 PNG 后逐像素不变，颜色更多时误差有限"""
+    rng = np.random.default_rng(0)
+    colors = rng.integers(0, 256, size=(200, 3), dtype=np.uint8)
+    rgb = colors[rng.integers(0, len(colors), size=(60, 80))]
+    with Image.open(io.BytesIO(encode_png(rgb))) as image:
+        assert image.mode == "P"
+        assert np.array_equal(np.asarray(image.convert("RGB")), rgb)
+
+    gradient = np.dstack(np.meshgrid(np.arange(256), np.arange(256)) + [np.full((256, 256), 128)]).astype(np.uint8)
+    with Image.open(io.BytesIO(encode_png(gradient))) as image:
+        assert np.abs(np.asarray(image.convert("RGB")).astype(int) - gradient).max() <= 32
+
+def test_resolution_and_format_follow_container_and_content():
+    """分辨率按列数与宽度上限计算；低阶分形输出为 SVG，带坐标轴的图形保持 PNG"""
+    assert target_width_px(1) <= MAX_IMAGE_WIDTH
+    assert target_width_px(3) < target_width_px(2) < target_width_px(1)
+    assert resolve_dpi(0.5) == MAX_DPI
+    assert resolve_dpi(8, columns=2) < resolve_dpi(8)
+
+    assert detect_format(figure_to_bytes(draw_fractal("koch", 1, 1))) == "svg"
+    assert detect_format(figure_to_bytes(plot_regular_polygon(6, 1))) == "png"
+    assert detect_format(figure_to_bytes(plot_regular_polygon(6, 1), fmt="webp")) == "webp"
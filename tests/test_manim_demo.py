@@ -0,0 +1,166 @@
+"""
+测试 Manim 动画组件（用假的 manim 模块，不需要安装 manim）
+"""
+import importlib
+import os
+import sys
+import types
+from contextlib import contextmanager
+
+import pytest
+
+from src.utils.render_queue import FAILED, RenderJob
+from src.utils.video_cache import make_scene_key
+
+def make_fake_manim():
+    """只提供 manim_demo 渲染时用到的名称：config、tempconfig、CairoRenderer"""
+    manim = types.ModuleType("manim")
+    manim.__version__ = "0.0.test"
+    manim.config = {}
+
+    @contextmanager
+    def tempconfig(values):
+        saved = dict(manim.config)
+        manim.config.update(values)
+        try:
+            yield
+        finally:
+            manim.config.clear()
+            manim.config.update(saved)
+
+    class CairoRenderer:
+        def __init__(self, skip_animations=False):
+            self.skip_animations = skip_animations
+            self.file_writer = types.SimpleNamespace(movie_file_path=None)
+
+    manim.tempconfig = tempconfig
+    manim.CairoRenderer = CairoRenderer
+    return manim
+
+@pytest.fixture
+def manim_demo(monkeypatch):
+    """在假的 manim 模块上导入 manim_demo，测试结束后移除"""
+    manim = make_fake_manim()
+    monkeypatch.setitem(sys.modules, "manim", manim)
+    sys.modules.pop("src.components.manim_demo", None)
+    module = importlib.import_module("src.components.manim_demo")
+    monkeypatch.setattr(module, "install_tex_cache", lambda: None)
+    yield module
+    sys.modules.pop("src.components.manim_demo", None)
+
+def make_render_scene(media_dirs, fail=False):
+    """渲染时把视频写到当前媒体目录下、记录目录的假场景"""
+    class RenderScene:
+        def __init__(self, renderer):
+            self.renderer = renderer
+
+        def render(self):
+            media_dir = sys.modules["manim"].config["media_dir"]
+            media_dirs.append(media_dir)
+            path = os.path.join(media_dir, "videos", "480p15", "RenderScene.mp4")
+            os.makedirs(os.path.dirname(path))
+            with open(path, "wb") as f:
+                f.write(b"mp4:" + media_dir.encode())
+            if fail:
+                raise RuntimeError("render failed")
+            self.renderer.file_writer.movie_file_path = path
+    return RenderScene
+
+def test_each_render_uses_its_own_media_dir(manim_demo):
+    """每次渲染使用新的媒体目录，按 movie_file_path 读取视频，结束后删除目录"""
+    media_dirs = []
+    first = manim_demo.render_to_bytes(make_render_scene(media_dirs), "low_quality")
+    second = manim_demo.render_to_bytes(make_render_scene(media_dirs), "low_quality")
+
+    assert len(set(media_dirs)) == 2
+    assert [first, second] == [b"mp4:" + media_dir.encode() for media_dir in media_dirs]
+    assert not any(os.path.exists(media_dir) for media_dir in media_dirs)
+    assert "media_dir" not in sys.modules["manim"].config
+
+def test_failed_render_removes_media_dir(manim_demo):
+    """渲染失败时异常照常抛出，媒体目录同样被删除"""
+    media_dirs = []
+    with pytest.raises(RuntimeError, match="render failed"):
+        manim_demo.render_to_bytes(make_render_scene(media_dirs, fail=True), "low_quality")
+
+    assert len(media_dirs) == 1 and not os.path.exists(media_dirs[0])
+    assert "media_dir" not in sys.modules["manim"].config
+
+class FakeQueue:
+    """记录提交的任务，任务状态由测试修改"""
+
+    def __init__(self):
+        self.tasks = []
+        self.jobs = {}
+
+    def submit_all(self, tasks):
+        self.tasks.extend(tasks)
+        for key, _, _ in tasks:
+            self.jobs[key] = RenderJob(key)
+        return [self.jobs[key] for key, _, _ in tasks]
+
+    def get(self, key):
+        return self.jobs.get(key)
+
+def make_scene(shape_type):
+    """与 geometry_scene 相同的写法：场景类定义在函数内部"""
+    class DemoScene:
+        def construct(self):
+            return shape_type
+    return DemoScene
+
+@pytest.fixture
+def fake_queue(manim_demo, monkeypatch):
+    """假的渲染队列与视频缓存（字典），并记录 show_animation 显示的内容"""
+    queue = FakeQueue()
+    queue.videos = {}
+    queue.shown = []
+    monkeypatch.setattr(manim_demo, "get_render_queue", lambda: queue)
+    monkeypatch.setattr(manim_demo, "get_video", queue.videos.get)
+    monkeypatch.setattr(manim_demo, "_render_status", lambda key, label: queue.shown.append(("status", key, label)))
+    monkeypatch.setattr(manim_demo.st, "video", lambda data, format: queue.shown.append(("video", data)))
+    monkeypatch.setattr(manim_demo.st, "caption", lambda text: None)
+    return queue
+
+def test_preview_is_queued_before_final(manim_demo, fake_queue):
+    """预览使用 PREVIEW_QUALITY 的键，与最终质量一起提交且排在前面"""
+    request = manim_demo.ManimDemo().submit_animation(make_scene, "high_quality", shape_type="square")
+
+    assert request.preview_key == make_scene_key(make_scene("square"), manim_demo.PREVIEW_QUALITY, "0.0.test")
+    assert request.final_key == make_scene_key(make_scene("square"), "high_quality", "0.0.test")
+    assert [key for key, _, _ in fake_queue.tasks] == [request.preview_key, request.final_key]
+    assert [args[-1] for _, _, args in fake_queue.tasks] == [manim_demo.PREVIEW_QUALITY, "high_quality"]
+
+def test_no_preview_at_preview_quality(manim_demo, fake_queue):
+    """请求的质量就是预览质量时只提交一个任务"""
+    request = manim_demo.ManimDemo().submit_animation(make_scene, manim_demo.PREVIEW_QUALITY, shape_type="square")
+
+    assert request.preview_key is None
+    assert [key for key, _, _ in fake_queue.tasks] == [request.final_key]
+
+def test_preview_shown_until_final_lands(manim_demo, fake_queue):
+    """预览完成后播放预览并轮询最终质量，最终质量完成后替换预览"""
+    demo = manim_demo.ManimDemo()
+    request = demo.submit_animation(make_scene, "high_quality", shape_type="square")
+
+    demo.show_animation(request)
+    assert fake_queue.shown == [("status", request.preview_key, "预览")]
+
+    fake_queue.shown.clear()
+    fake_queue.videos[request.preview_key] = b"preview"
+    demo.show_animation(request)
+    assert fake_queue.shown == [("video", b"preview"), ("status", request.final_key, "1080p60")]
+
+    fake_queue.shown.clear()
+    fake_queue.videos[request.final_key] = b"final"
+    demo.show_animation(request)
+    assert fake_queue.shown == [("video", b"final")]
+
+def test_failed_preview_waits_for_final(manim_demo, fake_queue):
+    """预览失败且没有视频时直接显示最终质量的进度"""
+    demo = manim_demo.ManimDemo()
+    request = demo.submit_animation(make_scene, "high_quality", shape_type="square")
+    fake_queue.jobs[request.preview_key].status = FAILED
+
+    demo.show_animation(request)
+    assert fake_queue.shown == [("status", request.final_key, "1080p60")]
@@ -0,0 +1,22 @@
+"""
+测试页面注册表
+"""
+import sys
+
+from src.utils import page_config
+from src.utils.page_config import PAGES, PageID, get_page_handler, get_page_id_by_display_name
+
+def test_display_name_lookup():
+    """显示名称与页面ID一一对应"""
+    for page_id, info in PAGES.items():
+        assert get_page_id_by_display_name(info.display_name) is page_id
+    assert get_page_id_by_display_name("不存在的页面") is None
+
+def test_handler_is_imported_once_and_cached():
+    """页面模块只在首次访问时导入，之后返回同一个处理函数"""
+    handler = get_page_handler(PageID.HOME)
+    assert f"src.{PAGES[PageID.HOME].file_path}" in sys.modules
+    assert get_page_handler(PageID.HOME) is handler
+
+    records = [r for r in page_config.get_import_report() if r.page_id is PageID.HOME]
+    assert len(records) == 1 and records[0].seconds >= 0
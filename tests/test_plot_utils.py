@@ -0,0 +1,27 @@
+"""
+测试Matplotlib字体与样式配置
+"""
+import os
+import platform
+
+from matplotlib import font_manager as fm
+
+from src.utils import plot_utils
+
+def test_font_resolution_is_indexed_on_disk(tmp_path, monkeypatch):
+    """第一次按路径探测字体并写入索引，之后直接读取索引"""
+    font_path = fm.findfont("DejaVu Sans")
+    monkeypatch.setitem(plot_utils.FONT_PATHS, platform.system(), ["/nonexistent/font.ttc", font_path])
+    monkeypatch.setattr(plot_utils, "_font_index_path", lambda: str(tmp_path / "font_index.json"))
+
+    plot_utils.resolve_chinese_font.cache_clear()
+    try:
+        first = plot_utils.resolve_chinese_font()
+        assert first.source == "path" and first.path == font_path and first.family == "DejaVu Sans"
+        assert os.path.exists(tmp_path / "font_index.json")
+
+        plot_utils.resolve_chinese_font.cache_clear()
+        second = plot_utils.resolve_chinese_font()
+        assert second.source == "index" and second.path == font_path
+    finally:
+        plot_utils.resolve_chinese_font.cache_clear()
@@ -0,0 +1,48 @@
+"""
+测试图形预渲染命令行工具
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils import cache_paths, figure_cache, prerender
+from src.utils.figure_cache import DEFAULT_FORMAT, make_figure_key, render_figure
+from src.utils.image_output import target_width_px
+from src.utils.page_config import PageID
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """磁盘层建在 tmp_path 中，不写入用户的 ~/.cache"""
+    monkeypatch.setattr(cache_paths, "CACHE_ROOT", str(tmp_path / "cache"))
+    monkeypatch.setattr(figure_cache, "_disk_cache", None)
+
+def test_single_page_grid_fills_figure_cache(monkeypatch):
+    """预渲染一个页面网格的前几项后，页面显示时用的键都在磁盘缓存中，不再调用 Matplotlib"""
+    collect_page_grids = prerender.collect_page_grids
+    monkeypatch.setattr(prerender, "collect_page_grids",
+                        lambda page_ids: [(page_id, grid[:3]) for page_id, grid in collect_page_grids(page_ids)])
+    # 在当前进程中执行，不启动工作进程
+    monkeypatch.setattr(prerender, "ProcessPoolExecutor", ThreadPoolExecutor)
+
+    [report] = prerender.prerender_pages([PageID.GEOMETRY_ANGLE], languages=["zh", "en"], workers=2)
+    assert report.page_id == PageID.GEOMETRY_ANGLE
+    assert report.figures == report.rendered == 6 and report.size_bytes > 0
+
+    [(_, grid)] = collect_page_grids([PageID.GEOMETRY_ANGLE])
+    disk_cache = figure_cache._get_disk_cache()
+    for func, kwargs in grid[:3]:
+        width = f"w{target_width_px(getattr(func, 'display_columns', 1))}"
+        for lang in ("zh", "en"):
+            key = make_figure_key(func, (), kwargs, lang, "light", width, DEFAULT_FORMAT)
+            assert disk_cache.get(key, DEFAULT_FORMAT) is not None
+
+    def fail(*args):
+        raise AssertionError("预渲染过的图形不应重新绘制")
+
+    monkeypatch.setattr(figure_cache, "_render_to_bytes", fail)
+    func, kwargs = grid[0]
+    assert render_figure(func, lang="en", theme="light", **kwargs)
+
+    # 再次执行时全部命中缓存
+    [report] = prerender.prerender_pages([PageID.GEOMETRY_ANGLE], languages=["zh", "en"], workers=2)
+    assert report.rendered == 0
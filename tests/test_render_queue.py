@@ -0,0 +1,114 @@
+"""
+测试后台渲染队列
+"""
+import os
+import time
+
+import pytest
+
+from src.utils.render_queue import DONE, FAILED, ProgressReporter, RenderQueue, RenderQueueFull, read_progress
+
+def frames_job(frames, progress):
+    """逐帧报告进度的任务"""
+    progress.set_total(frames)
+    for _ in range(frames):
+        time.sleep(0.01)
+        progress.advance()
+    return b"video"
+
+def failing_job(progress):
+    raise ValueError("boom")
+
+def caching_job(path, progress):
+    """把结果写入"缓存"文件的任务"""
+    with open(path, "wb") as f:
+        f.write(b"video")
+    return 5
+
+def crashing_job(progress):
+    """模拟工作进程被 OOM 终止"""
+    os._exit(1)
+
+def wait_finished(queue, *keys, timeout=60):
+    deadline = time.monotonic() + timeout
+    while not all(queue.get(key).finished for key in keys):
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+def test_progress_reporter_writes_frames(tmp_path):
+    """进度文件记录已完成帧数与总帧数，按时间间隔节流写入"""
+    path = str(tmp_path / "job")
+    assert read_progress(path) is None
+    progress = ProgressReporter(path)
+    progress.set_total(100)
+    assert read_progress(path) == (0, 100)
+    progress.advance(5)
+    assert read_progress(path) == (0, 100)  # 距上次写入不足间隔
+    progress._last_write = 0
+    progress.advance(5)
+    assert read_progress(path) == (10, 100)
+
+def test_queue_deduplicates_and_bounds_jobs():
+    """相同任务只执行一次；未结束的任务数有上限；失败只影响自身"""
+    queue = RenderQueue(max_workers=1, max_pending=2)
+    try:
+        job = queue.submit("a", frames_job, 30)
+        assert queue.submit("a", frames_job, 30) is job
+        queue.submit("b", failing_job)
+        with pytest.raises(RenderQueueFull):
+            queue.submit("c", frames_job, 1)
+
+        wait_finished(queue, "a", "b")
+        assert job.status == DONE and job.result == b"video" and job.progress == 1.0
+        failed = queue.get("b")
+        assert failed.status == FAILED and "boom" in failed.error
+        assert queue.submit("c", frames_job, 1) is not None
+    finally:
+        queue.shutdown()
+
+def test_queue_recovers_from_crashed_worker():
+    """工作进程崩溃后任务标记为失败，之后提交的任务在新的进程池中正常执行"""
+    queue = RenderQueue(max_workers=1, max_pending=1)
+    try:
+        queue.submit("crash", crashing_job)
+        wait_finished(queue, "crash")
+        crashed = queue.get("crash")
+        assert crashed.status == FAILED and "BrokenProcessPool" in crashed.error
+
+        job = queue.submit("a", frames_job, 3)
+        wait_finished(queue, "a")
+        assert job.status == DONE and job.result == b"video"
+    finally:
+        queue.shutdown()
+
+def test_finished_job_is_rendered_again_after_eviction(tmp_path):
+    """已完成任务的产物被淘汰后再次提交，会重新执行而不是返回过期的已完成任务"""
+    path = str(tmp_path / "video.mp4")
+    queue = RenderQueue(max_workers=1, max_pending=1)
+    try:
+        first = queue.submit("a", caching_job, path)
+        wait_finished(queue, "a")
+        assert first.status == DONE
+        os.unlink(path)  # 视频缓存淘汰了这个视频
+
+        second = queue.submit("a", caching_job, path)
+        assert second is not first
+        wait_finished(queue, "a")
+        assert second.status == DONE and os.path.exists(path)
+    finally:
+        queue.shutdown()
+
+def test_submit_all_is_all_or_nothing():
+    """容量不足以放下全部新任务时一个也不提交；已在执行的任务按去重计算"""
+    queue = RenderQueue(max_workers=1, max_pending=2)
+    try:
+        running = queue.submit("a", frames_job, 30)
+        with pytest.raises(RenderQueueFull):
+            queue.submit_all([("preview", frames_job, (1,)), ("final", frames_job, (1,))])
+        assert queue.get("preview") is None and queue.get("final") is None
+
+        jobs = queue.submit_all([("a", frames_job, (30,)), ("final", frames_job, (1,))])
+        assert jobs[0] is running
+        wait_finished(queue, "a", "final")
+    finally:
+        queue.shutdown()
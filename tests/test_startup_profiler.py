@@ -0,0 +1,43 @@
+"""
+测试启动性能分析
+"""
+import importlib
+import json
+import sys
+
+from src.utils.startup_profiler import StartupProfiler
+
+def test_records_nested_imports(tmp_path, monkeypatch):
+    """嵌套导入分别记录，父模块的自身耗时不含子模块；导入后的模块与原来一致"""
+    (tmp_path / "profiled_outer.py").write_text("import time\nimport profiled_inner\ntime.sleep(0.01)\n")
+    (tmp_path / "profiled_inner.py").write_text("import time\ntime.sleep(0.02)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    profiler = StartupProfiler(str(tmp_path / "report.json"))
+    profiler.install()
+    try:
+        module = importlib.import_module("profiled_outer")
+    finally:
+        profiler.uninstall()
+        sys.modules.pop("profiled_outer", None)
+        sys.modules.pop("profiled_inner", None)
+
+    assert type(module.__loader__).__name__ == "SourceFileLoader"
+    records = {record["module"]: record for record in profiler.get_report()["imports"]}
+    inner, outer = records["profiled_inner"], records["profiled_outer"]
+    assert inner["parent"] == "profiled_outer" and outer["parent"] is None
+    assert inner["cumulative_ms"] >= 20
+    assert outer["cumulative_ms"] >= inner["cumulative_ms"] + 10
+    assert 10 <= outer["self_ms"] < outer["cumulative_ms"] - 15
+
+def test_sections_and_report(tmp_path):
+    """once 区段只记录第一次，报告以 JSON 写出"""
+    path = tmp_path / "report.json"
+    profiler = StartupProfiler(str(path))
+    for _ in range(3):
+        with profiler.measure_section("home", "first_render", once=True):
+            pass
+
+    report = json.loads(path.read_text(encoding="utf-8"))
+    assert [section["name"] for section in report["sections"]] == ["home"]
+    assert "home" in report["summary"]["first_render_ms"]
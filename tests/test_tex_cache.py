@@ -0,0 +1,119 @@
+"""
+测试共享的 TeX 公式缓存（用假的 manim 模块与编译函数，不需要 manim 与 LaTeX）
+"""
+import hashlib
+import sys
+import threading
+import types
+
+import pytest
+
+from src.utils import tex_cache
+
+class FakeTemplate:
+    tex_compiler = "latex"
+    output_format = ".dvi"
+
+    def get_texcode_for_expression(self, expression):
+        return f"\\begin{{document}}{expression}\\end{{document}}"
+
+class FakeConfig:
+    def __init__(self):
+        self.tex_dir = "media/Tex"
+        self.tex_template = FakeTemplate()
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+@pytest.fixture
+def fake_manim(tmp_path, monkeypatch):
+    """假的 manim 模块；编译函数在 config.tex_dir 中写出 SVG，并记录编译过的公式"""
+    config = FakeConfig()
+    manim = types.ModuleType("manim")
+    manim.__version__ = "0.0.test"
+    manim.config = config
+    tex_file_writing = types.ModuleType("manim.utils.tex_file_writing")
+    tex_file_writing.tex_hash = lambda code: hashlib.sha256(code.encode()).hexdigest()[:16]
+    tex_mobject = types.ModuleType("manim.mobject.text.tex_mobject")
+    for name, module in [("manim", manim), ("manim.utils", types.ModuleType("manim.utils")),
+                         ("manim.utils.tex_file_writing", tex_file_writing),
+                         ("manim.mobject", types.ModuleType("manim.mobject")),
+                         ("manim.mobject.text", types.ModuleType("manim.mobject.text")),
+                         ("manim.mobject.text.tex_mobject", tex_mobject)]:
+        monkeypatch.setitem(sys.modules, name, module)
+    manim.mobject = sys.modules["manim.mobject"]
+    manim.mobject.text = sys.modules["manim.mobject.text"]
+    manim.mobject.text.tex_mobject = tex_mobject
+
+    compiled = []
+
+    def tex_to_svg_file(expression, environment=None, tex_template=None):
+        compiled.append(expression)
+        if expression == "fail":
+            # 写了一半后失败
+            with open(f"{config.tex_dir}/partial.svg", "w") as f:
+                f.write("<svg")
+            raise RuntimeError("latex error")
+        path = f"{config.tex_dir}/out.svg"
+        with open(path, "w") as f:
+            f.write(f"<svg>{expression}</svg>")
+        return path
+
+    tex_mobject.tex_to_svg_file = tex_to_svg_file
+    monkeypatch.setattr(tex_cache, "TEX_CACHE_ROOT", str(tmp_path / "tex"))
+    monkeypatch.setattr(tex_cache, "_original_tex_to_svg_file", None)
+    tex_cache.install_tex_cache()
+    tex_cache.install_tex_cache()  # 重复调用不会把缓存函数包装两次
+    assert tex_mobject.tex_to_svg_file is tex_cache.cached_tex_to_svg_file
+    return compiled
+
+def test_same_formula_compiles_once(fake_manim):
+    """同一公式第二次请求直接返回缓存的 SVG，config.tex_dir 恢复原值"""
+    first = tex_cache.cached_tex_to_svg_file("x^2")
+    second = tex_cache.cached_tex_to_svg_file("x^2")
+    assert first == second and first.read_text() == "<svg>x^2</svg>"
+    assert fake_manim == ["x^2"]
+    assert sys.modules["manim"].config.tex_dir == "media/Tex"
+
+def _result_path(expression):
+    """公式在缓存目录中的 SVG 路径（与 cached_tex_to_svg_file 的命名方式相同）"""
+    template = FakeTemplate()
+    code = template.get_texcode_for_expression(expression)
+    digest = sys.modules["manim.utils.tex_file_writing"].tex_hash(code + template.tex_compiler + template.output_format)
+    return tex_cache.tex_cache_dir() / f"{digest}.svg"
+
+def test_waiting_request_reuses_compiled_formula(fake_manim):
+    """等待同一公式的锁期间另一个进程完成了编译时，不再重复编译"""
+    target = _result_path("x^2")
+    target.parent.mkdir(parents=True)
+    result = {}
+    with tex_cache._file_lock(target.with_suffix(".lock")):
+        thread = threading.Thread(target=lambda: result.update(svg=tex_cache.cached_tex_to_svg_file("x^2")))
+        thread.start()
+        thread.join(0.3)
+        assert thread.is_alive()  # 同一公式在等待锁
+        target.write_text("<svg>by another worker</svg>")
+    thread.join(5)
+    assert result["svg"] == target and fake_manim == []
+
+def test_different_formulas_do_not_wait_for_each_other(fake_manim):
+    """持有一个公式的锁时，其他公式照常编译"""
+    held = _result_path("x^2").with_suffix(".lock")
+    held.parent.mkdir(parents=True)
+    result = {}
+    with tex_cache._file_lock(held):
+        thread = threading.Thread(target=lambda: result.update(svg=tex_cache.cached_tex_to_svg_file("y^3")))
+        thread.start()
+        thread.join(5)
+        assert not thread.is_alive()
+    assert result["svg"] == _result_path("y^3") and fake_manim == ["y^3"]
+
+def test_failed_compile_leaves_no_partial_file(fake_manim):
+    """编译失败时缓存目录中没有 SVG 或临时目录，之后可以重新编译"""
+    with pytest.raises(RuntimeError, match="latex error"):
+        tex_cache.cached_tex_to_svg_file("fail")
+    assert not list(tex_cache.tex_cache_dir().glob("*.svg"))
+    assert not list(tex_cache.tex_cache_dir().glob(".work-*"))
+    with pytest.raises(RuntimeError):
+        tex_cache.cached_tex_to_svg_file("fail")
+    assert fake_manim == ["fail", "fail"]
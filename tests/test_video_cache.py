@@ -0,0 +1,50 @@
+"""
+测试动画视频缓存
+"""
+from src.utils import video_cache
+from src.utils.figure_cache import DiskByteCache
+from src.utils.video_cache import make_scene_key, render_video
+
+LABELS = {"square": "正方形"}
+
+def make_scene(shape_type):
+    """与 ManimDemo 相同的写法：场景类定义在函数内部，参数是闭包变量"""
+    class GeometryScene:
+        def construct(self):
+            return shape_type
+    return GeometryScene
+
+def test_key_follows_closure_parameters():
+    """每次新建的场景类参数相同时键相同，参数、质量或 Manim 版本不同时键不同"""
+    key = make_scene_key(make_scene("square"), "low_quality", "0.17.3")
+    assert key == make_scene_key(make_scene("square"), "low_quality", "0.17.3")
+    assert key != make_scene_key(make_scene("circle"), "low_quality", "0.17.3")
+    assert key != make_scene_key(make_scene("square"), "high_quality", "0.17.3")
+    assert key != make_scene_key(make_scene("square"), "low_quality", "0.18.0")
+
+def make_labeled_scene(shape_type):
+    """construct 引用模块级数据的场景"""
+    class LabeledScene:
+        def construct(self):
+            return LABELS[shape_type]
+    return LabeledScene
+
+def test_key_follows_module_data(monkeypatch):
+    """场景引用的模块级数据修改后键随之改变"""
+    key = make_scene_key(make_labeled_scene("square"), "low_quality", "0.17.3")
+    monkeypatch.setitem(LABELS, "square", "square")
+    assert make_scene_key(make_labeled_scene("square"), "low_quality", "0.17.3") != key
+
+def test_repeat_requests_skip_rendering(tmp_path, monkeypatch):
+    """相同场景只渲染一次，之后直接返回缓存的视频"""
+    monkeypatch.setattr(video_cache, "_video_cache", DiskByteCache(str(tmp_path / "videos"), 1024 * 1024))
+    rendered = []
+
+    def render(scene_class, quality):
+        rendered.append(scene_class().construct())
+        return b"mp4:" + rendered[-1].encode()
+
+    assert render_video(make_scene("square"), render, "low_quality", "0.17.3") == b"mp4:square"
+    assert render_video(make_scene("square"), render, "low_quality", "0.17.3") == b"mp4:square"
+    assert render_video(make_scene("circle"), render, "low_quality", "0.17.3") == b"mp4:circle"
+    assert rendered == ["square", "circle"]
@@ -0,0 +1,109 @@
+"""
+测试图形工厂
+"""
+import gc
+import io
+import weakref
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from src.utils.plot_utils import DEFAULT_STYLE
+from src.utils import visualization
+from src.utils.figure_cache import figure_to_bytes
+from src.utils.visualization import create_figure
+
+STYLES = [
+    DEFAULT_STYLE.replace(grid=True, tick_label_size=6),
+    DEFAULT_STYLE.replace(grid=False, tick_label_size=14, facecolor='#eeeeee'),
+]
+
+def _render(style, seed):
+    fig, ax = create_figure(figsize=(3, 3), style=style)
+    ax.plot(np.random.default_rng(seed).normal(size=50))
+    ax.set_xlabel('x')
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+def test_create_figure_does_not_touch_pyplot():
+    """工厂创建的图形不登记到 pyplot，也不修改全局 rcParams"""
+    fignums_before = plt.get_fignums()
+    fig, ax = create_figure(style=STYLES[0])
+    rc_before = dict(matplotlib.rcParams)
+    _render(STYLES[1], 0)
+    assert plt.get_fignums() == fignums_before
+    assert dict(matplotlib.rcParams) == rc_before
+    assert ax.xaxis.get_gridlines()[0].get_visible()
+
+def test_concurrent_rendering_matches_serial():
+    """不同样式的图形在多个线程中同时渲染，结果与逐个渲染相同"""
+    jobs = [(STYLES[i % 2], i) for i in range(8)]
+    serial = [_render(style, seed) for style, seed in jobs]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        concurrent = list(pool.map(lambda job: _render(*job), jobs))
+    assert concurrent == serial
+    assert serial[0] != serial[1]
+
+def test_managed_figures_are_released(monkeypatch):
+    """managed_figure 离开上下文后图形被释放，不会随重复绘图累积"""
+    monkeypatch.setattr(visualization, "FIGURE_DEBUG", True)
+    for _ in range(20):
+        with visualization.managed_figure(figsize=(2, 2)) as (fig, ax):
+            ax.plot([0, 1], [1, 0])
+            fig.savefig(io.BytesIO(), format='png')
+    del fig, ax
+    gc.collect()
+    assert visualization.live_figure_count() == 0
+
+def test_growing_figure_count_warns(monkeypatch):
+    """活动图形数连续增长时发出警告"""
+    monkeypatch.setattr(visualization, "FIGURE_DEBUG", True)
+    monkeypatch.setattr(visualization, "_figure_history", defaultdict(
+        lambda: deque(maxlen=visualization.FIGURE_LEAK_RUNS + 1)))
+    leaked = []
+    with pytest.warns(visualization.FigureLeakWarning):
+        for _ in range(visualization.FIGURE_LEAK_RUNS + 1):
+            leaked.append(visualization.new_figure())
+            visualization.check_figure_leaks()
+
+def test_template_figure_matches_scratch_render():
+    """模板池复用图形只更新数据，渲染结果与每次重新创建相同"""
+    from src.pages.geometry import circles
+
+    def scratch(template, *args):
+        fig, artists = template.build()
+        template.update(artists, *args)
+        return fig
+
+    for template, draw, args in [
+        (circles.CIRCLE_CALCULATOR, circles.draw_circle_calculator, [(2.0,), (0.5,), (7.3,)]),
+        (circles.CONCENTRIC_CIRCLES, circles.draw_concentric_circles, [(3.0, 1.5), (0.6, 0.2), (4.8, 4.1)]),
+    ]:
+        pooled_figures = set()
+        for params in args:
+            pooled = draw(*params)
+            pooled_figures.add(id(pooled))
+            assert figure_to_bytes(pooled, dpi=50) == figure_to_bytes(scratch(template, *params), dpi=50)
+        assert len(pooled_figures) == 1
+
+def test_template_pool_is_bounded(monkeypatch):
+    """取出的图形由调用方独占，归还后复用；空闲图形超过容量时淘汰最久未使用的"""
+    from src.pages.geometry import circles
+
+    monkeypatch.setattr(visualization, "TEMPLATE_POOL_SIZE", 2)
+    figures = [circles.draw_circle_calculator(float(r)) for r in (1, 2, 3)]
+    assert len({id(fig) for fig in figures}) == 3
+    for fig in figures:
+        visualization.release_figure(fig)
+        visualization.release_figure(fig)  # 重复归还不会让同一图形出现两次
+    assert visualization.template_pool_size() == 2
+    assert circles.draw_circle_calculator(4.0) is figures[2]
+    # 淘汰的图形（连同画布）不再被模板池或位块传输渲染器引用，可以被回收
+    evicted = weakref.ref(figures.pop(0))
+    gc.collect()
+    assert evicted() is None